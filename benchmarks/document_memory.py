@@ -0,0 +1,128 @@
+"""Measures the memory held by a course's documents as `Document`s vs compacted.
+
+Usage:
+    python benchmarks/document_memory.py [--files 500] [--pages 100] [--chars 1500]
+
+Builds synthetic PDF pages and caption chunks with the same metadata the
+loaders produce, then compares the memory retained by a list of `Document`s
+with a `CompactDocumentStore` holding the same documents. Memory is measured
+with tracemalloc.
+"""
+
+import argparse
+import gc
+import random
+import string
+import tracemalloc
+from typing import Iterator
+
+from canvas_langchain.utils.compact import CompactDocumentStore
+from canvas_langchain.utils.document_ids import get_document_id, set_document_id
+from langchain.docstore.document import Document
+
+COURSE_API = "https://canvas.example.edu/api/v1/courses/12345/"
+CAPTION_CHUNKS_PER_FILE = 20
+
+
+def generate_items(files: int, pages: int, chars: int) -> Iterator[list[Document]]:
+    """Yields each item's documents: every page of a pdf, then its caption chunks"""
+    words = [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 9)))
+        for _ in range(2000)
+    ]
+    text = " ".join(random.choices(words, k=chars // 6))[:chars]
+    for file_id in range(files):
+        filename = f"Lecture {file_id}.pdf"
+        docs = []
+        for page in range(1, pages + 1):
+            # unique text per page, as real pages have
+            page_text = f"{page} {text}"
+            doc = Document(
+                page_content=page_text,
+                metadata={
+                    "filename": filename,
+                    "source": f"{COURSE_API}files/{file_id}",
+                    "kind": "file",
+                    "id": file_id,
+                    "page": page,
+                },
+            )
+            docs.append(set_document_id(doc, get_document_id("file", file_id, page)))
+        yield docs
+
+        media_id = f"1_{file_id:08d}"
+        captions = []
+        for chunk in range(CAPTION_CHUNKS_PER_FILE):
+            doc = Document(
+                page_content=f"{chunk} {text[: chars // 2]}",
+                metadata={
+                    "filename": filename,
+                    "course_context": f"{COURSE_API}files/{file_id}",
+                    "media_id": media_id,
+                    "source": f"https://mivideo.example.edu/media/{media_id}?t={chunk}",
+                },
+            )
+            captions.append(
+                set_document_id(doc, get_document_id("mivideo", media_id, chunk))
+            )
+        yield captions
+
+
+def measure(build) -> tuple[int, object]:
+    """Returns the bytes still allocated after `build()` and its result"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def build_documents(args) -> list[Document]:
+    docs = []
+    for item_docs in generate_items(args.files, args.pages, args.chars):
+        docs.extend(item_docs)
+    return docs
+
+
+def build_store(args) -> CompactDocumentStore:
+    store = CompactDocumentStore()
+    for item_docs in generate_items(args.files, args.pages, args.chars):
+        store.append(item_docs)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=100, help="pages per pdf")
+    parser.add_argument("--chars", type=int, default=1500, help="characters per page")
+    args = parser.parse_args()
+
+    random.seed(0)
+    documents_bytes, documents = measure(lambda: build_documents(args))
+    count = len(documents)
+    text_bytes = sum(len(doc.page_content) for doc in documents)
+    del documents
+
+    random.seed(0)
+    store_bytes, store = measure(lambda: build_store(args))
+    assert len(store) == count
+
+    mib = 1024 * 1024
+    print(f"Documents:        {count}")
+    print(f"Text:             {text_bytes / mib:.1f} MiB")
+    print(f"list[Document]:   {documents_bytes / mib:.1f} MiB")
+    print(f"Compact store:    {store_bytes / mib:.1f} MiB")
+    print(f"Saved:            {(documents_bytes - store_bytes) / mib:.1f} MiB")
+    overhead = documents_bytes - text_bytes
+    compact_overhead = store_bytes - text_bytes
+    print(
+        f"Per-document overhead: {overhead / count:.0f} -> "
+        f"{compact_overhead / count:.0f} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
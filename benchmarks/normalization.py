@@ -0,0 +1,57 @@
+"""Measures how much text normalization shrinks a course's documents.
+
+Usage:
+    python benchmarks/normalization.py API_URL API_KEY COURSE_ID
+"""
+
+import argparse
+import re
+import time
+
+from canvas_langchain.canvas import CanvasLoader
+from canvas_langchain.utils.normalize import TextNormalizer
+
+
+def count_tokens(texts: list[str]) -> int:
+    """Counts tokens with tiktoken when installed, otherwise approximates them"""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return sum(len(encoding.encode(text)) for text in texts)
+    except ImportError:
+        # words, punctuation marks and whitespace runs each cost roughly a token
+        return sum(len(re.findall(r"\w+|[^\w\s]|\s+", text)) for text in texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("api_url")
+    parser.add_argument("api_key")
+    parser.add_argument("course_id", type=int)
+    args = parser.parse_args()
+
+    loader = CanvasLoader(
+        api_url=args.api_url,
+        api_key=args.api_key,
+        course_id=args.course_id,
+        normalize_text=False,
+    )
+    raw_texts = [doc.page_content for doc in loader.load()]
+
+    normalizer = TextNormalizer.from_settings()
+    start = time.perf_counter()
+    normalized_texts = [normalizer.normalize(text) for text in raw_texts]
+    elapsed = time.perf_counter() - start
+
+    raw_tokens = count_tokens(raw_texts)
+    normalized_tokens = count_tokens(normalized_texts)
+    print(f"Documents:  {len(raw_texts)}")
+    print(f"Characters: {normalizer.chars_in} -> {normalizer.chars_out}")
+    print(f"Tokens:     {raw_tokens} -> {normalized_tokens}")
+    print(f"Normalization time: {elapsed:.3f}s")
+    print(normalizer.get_summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Compares PDF extraction backends on a local corpus of PDFs.
+
+Usage:
+    python benchmarks/pdf_backends.py [CORPUS_DIR] [--backends pypdf2 pypdf pypdfium2]
+
+Each subdirectory of CORPUS_DIR is reported as its own category, e.g.
+`slides/`, `textbooks/` and `scanned/`. Without CORPUS_DIR, a small sample
+corpus with those three categories is generated in a temporary directory;
+real course PDFs give more representative numbers. Peak memory is measured
+with tracemalloc, so allocations made inside native libraries (PDFium) are
+not included.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from canvas_langchain.utils.pdf_backends import (
+    PDF_BACKENDS,
+    EncryptedPdfError,
+    get_pdf_backend,
+)
+
+WORDS = (
+    "lecture syllabus assignment reading chapter exam figure equation result "
+    "method analysis theory example problem solution week module review"
+).split()
+
+
+def write_pdf(path: Path, pages: list[list[str] | None], rng: random.Random):
+    """Writes a PDF with a page of text lines per list, or a grey image per None"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # the page tree, once the page numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for lines in pages:
+        if lines is None:
+            pixels = rng.randbytes(200 * 200)
+            objects.append(
+                b"<< /Type /XObject /Subtype /Image /Width 200 /Height 200 "
+                b"/ColorSpace /DeviceGray /BitsPerComponent 8 /Length %d >>\n"
+                b"stream\n%s\nendstream" % (len(pixels), pixels)
+            )
+            resources = b"<< /XObject << /Im0 %d 0 R >> >>" % len(objects)
+            content = b"q 400 0 0 400 100 200 cm /Im0 Do Q"
+        else:
+            resources = b"<< /Font << /F1 3 0 R >> >>"
+            content = b"BT /F1 11 Tf 14 TL 72 760 Td %s ET" % b" ".join(
+                b"(%s) '" % line.encode("latin-1") for line in lines
+            )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources %s /Contents %d 0 R >>" % (resources, len(objects))
+        )
+        page_numbers.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % number for number in page_numbers),
+        len(page_numbers),
+    )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_offset,
+    )
+    path.write_bytes(bytes(output))
+
+
+def build_sample_corpus(corpus_dir: Path):
+    """Generates slide decks, long text documents and scanned files"""
+    rng = random.Random(0)
+
+    def text_page(line_count: int) -> list[str]:
+        return [
+            " ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(line_count)
+        ]
+
+    categories = {
+        "slides": (8, lambda: [text_page(8) for _ in range(20)]),
+        "textbooks": (2, lambda: [text_page(50) for _ in range(150)]),
+        "scanned": (4, lambda: [None] * 10),
+    }
+    for category, (file_count, get_pages) in categories.items():
+        (corpus_dir / category).mkdir()
+        for index in range(file_count):
+            write_pdf(corpus_dir / category / f"{index}.pdf", get_pages(), rng)
+
+
+def benchmark_backend(backend_name: str, pdf_paths: list[Path], corpus_dir: Path):
+    """Returns per-category totals for one backend"""
+    extract_pages = get_pdf_backend(backend_name)
+    results = defaultdict(
+        lambda: {
+            "files": 0,
+            "pages": 0,
+            "empty_pages": 0,
+            "chars": 0,
+            "seconds": 0.0,
+            "peak_bytes": 0,
+            "failures": 0,
+        }
+    )
+    for pdf_path in pdf_paths:
+        relative_path = pdf_path.relative_to(corpus_dir)
+        category = relative_path.parts[0] if len(relative_path.parts) > 1 else "."
+        totals = results[category]
+        file_contents = pdf_path.read_bytes()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            for page_text in extract_pages(file_contents):
+                totals["pages"] += 1
+                totals["chars"] += len(page_text.strip())
+                totals["empty_pages"] += not page_text.strip()
+        except EncryptedPdfError:
+            totals["failures"] += 1
+        except ImportError:
+            tracemalloc.stop()
+            raise
+        except Exception as err:
+            print(f"  {backend_name} failed on {relative_path}: {err}")
+            totals["failures"] += 1
+        totals["seconds"] += time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        totals["files"] += 1
+        totals["peak_bytes"] = max(totals["peak_bytes"], peak)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus_dir", type=Path, nargs="?")
+    parser.add_argument("--backends", nargs="+", default=list(PDF_BACKENDS))
+    args = parser.parse_args()
+
+    if args.corpus_dir is None:
+        with tempfile.TemporaryDirectory() as sample_dir:
+            args.corpus_dir = Path(sample_dir)
+            build_sample_corpus(args.corpus_dir)
+            run_benchmarks(args.corpus_dir, args.backends)
+    else:
+        run_benchmarks(args.corpus_dir, args.backends)
+
+
+def run_benchmarks(corpus_dir: Path, backends: list[str]):
+    pdf_paths = sorted(corpus_dir.rglob("*.pdf"))
+    print(f"{len(pdf_paths)} PDFs in {corpus_dir}\n")
+    print(
+        f"{'backend':<10} {'category':<14} {'pages':>7} {'pages/s':>9} "
+        f"{'peak MB':>8} {'chars':>10} {'empty':>6} {'failed':>6}"
+    )
+    for backend_name in backends:
+        try:
+            results = benchmark_backend(backend_name, pdf_paths, corpus_dir)
+        except ImportError as err:
+            print(f"{backend_name:<10} not installed ({err})")
+            continue
+        for category, totals in sorted(results.items()):
+            pages_per_second = (
+                totals["pages"] / totals["seconds"] if totals["seconds"] else 0
+            )
+            print(
+                f"{backend_name:<10} {category:<14} {totals['pages']:>7} "
+                f"{pages_per_second:>9.1f} {totals['peak_bytes'] / 2**20:>8.1f} "
+                f"{totals['chars']:>10} {totals['empty_pages']:>6} {totals['failures']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import Optional
+from functools import partial
+from typing import Callable, Iterable, Iterator, Optional
 
 from canvas_langchain.client_getters import CanvasClientGetters
 from canvas_langchain.sections.mivideo import MiVideoLoader
+from canvas_langchain.sinks import SinkWriter
+from canvas_langchain.utils.budget import ContentBudget
+from canvas_langchain.utils.checkpoint import LoadCheckpoint
+from canvas_langchain.utils.compact import CompactDocumentStore
+from canvas_langchain.utils.deadline import LoadDeadline
+from canvas_langchain.utils.dedupe import ContentDeduplicator
+from canvas_langchain.utils.document_ids import get_document_id, set_document_id
 from canvas_langchain.utils.embedded_media import parse_html_for_text_and_urls
 from canvas_langchain.utils.logging import Logger
+from canvas_langchain.utils.normalize import TextNormalizer
+from canvas_langchain.utils.profiling import LoadProfiler
+from canvas_langchain.utils.scheduler import WorkScheduler
 from canvas_langchain.utils.process_data import load_embed_urls
 from canvasapi.assignment import Assignment
 from canvasapi.discussion_topic import DiscussionTopic
@@ -22,6 +36,16 @@ class BaseSectionLoaderVars:
     logger: Logger
     mivideo_loader: MiVideoLoader
     should_load_mivideo: bool
+    deduplicator: Optional[ContentDeduplicator] = None
+    normalizer: Optional[TextNormalizer] = None
+    deadline: Optional[LoadDeadline] = None
+    scheduler: Optional[WorkScheduler] = None
+    profiler: Optional[LoadProfiler] = None
+    sink_writer: Optional[SinkWriter] = None
+    content_budget: Optional[ContentBudget] = None
+    item_workers: int = 1
+    checkpoint: Optional[LoadCheckpoint] = None
+    document_store: Optional[CompactDocumentStore] = None
 
 
 class BaseSectionLoader(ABC):
@@ -33,6 +57,16 @@ class BaseSectionLoader(ABC):
         self.logger = baseSectionVars.logger
         self.mivideo_loader = baseSectionVars.mivideo_loader
         self.should_load_mivideo = baseSectionVars.should_load_mivideo
+        self.deduplicator = baseSectionVars.deduplicator
+        self.normalizer = baseSectionVars.normalizer
+        self.deadline = baseSectionVars.deadline
+        self.scheduler = baseSectionVars.scheduler
+        self.profiler = baseSectionVars.profiler
+        self.sink_writer = baseSectionVars.sink_writer
+        self.content_budget = baseSectionVars.content_budget
+        self.item_workers = baseSectionVars.item_workers
+        self.checkpoint = baseSectionVars.checkpoint
+        self.document_store = baseSectionVars.document_store
 
     @abstractmethod
     def load_section(self) -> list[Document]:
@@ -49,6 +83,148 @@ class BaseSectionLoader(ABC):
             "This optional method should be implemented in subclass"
         )
 
+    def _load_items(
+        self,
+        items: Iterable,
+        get_key: Callable[[object], str],
+        per_item_timeout: bool = True,
+        max_workers: int | None = None,
+        checkpoint_items: bool = True,
+    ) -> Iterator[list[Document]]:
+        """Loads items with `_load_item`, stopping once the time budget is spent.
+
+        Yields each item's documents, so callers keep what was loaded if a later page
+        of the item listing raises.
+        """
+        return self._run_items(
+            ((get_key(item), partial(self._load_item, item)) for item in items),
+            per_item_timeout=per_item_timeout,
+            max_workers=max_workers,
+            checkpoint_items=checkpoint_items,
+        )
+
+    def _run_items(
+        self,
+        item_loads: Iterable[tuple[str, Callable[[], list[Document]]]],
+        per_item_timeout: bool = True,
+        max_workers: int | None = None,
+        checkpoint_items: bool = True,
+    ) -> Iterator[list[Document]]:
+        """Runs (key, load_fn) pairs on up to `item_workers` threads, yielding
+        each item's documents in the original item order.
+
+        Items completed by an earlier, interrupted load are skipped. Containers whose
+        children are checkpointed themselves pass `checkpoint_items=False`.
+        """
+        max_workers = max_workers or self.item_workers
+        checkpoint = self.checkpoint if checkpoint_items else None
+        if max_workers <= 1:
+            for key, load_fn in item_loads:
+                if checkpoint and checkpoint.is_completed(key):
+                    continue
+                if self.deadline and self.deadline.expired():
+                    self.deadline.skip(key, "time_budget_exhausted")
+                    break
+                yield self._run_item(
+                    key,
+                    load_fn,
+                    per_item_timeout=per_item_timeout,
+                    checkpoint_item=checkpoint_items,
+                )
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="canvas-item"
+        ) as executor:
+            in_flight = deque()
+            for key, load_fn in item_loads:
+                if checkpoint and checkpoint.is_completed(key):
+                    continue
+                if self.deadline and self.deadline.expired():
+                    self.deadline.skip(key, "time_budget_exhausted")
+                    break
+                # the window bounds how far loading runs ahead of the slowest item
+                if len(in_flight) >= 2 * max_workers:
+                    key_done, future = in_flight.popleft()
+                    yield self._finish_item(key_done, future.result(), checkpoint_items)
+                future = executor.submit(
+                    self._run_item_load,
+                    key,
+                    self._wrap_item(key, load_fn),
+                    per_item_timeout,
+                )
+                in_flight.append((key, future))
+            while in_flight:
+                key_done, future = in_flight.popleft()
+                yield self._finish_item(key_done, future.result(), checkpoint_items)
+
+    def _run_item(
+        self,
+        key: str,
+        load_fn: Callable[[], list[Document]],
+        per_item_timeout: bool = True,
+        checkpoint_item: bool = True,
+    ) -> list[Document]:
+        """Runs a single item load within the load deadline, if one is set"""
+        return self._finish_item(
+            key,
+            self._run_item_load(key, self._wrap_item(key, load_fn), per_item_timeout),
+            checkpoint_item,
+        )
+
+    def _finish_item(
+        self, key: str, docs: list[Document], checkpoint_item: bool = True
+    ) -> list[Document]:
+        """Deduplicates and checkpoints a completed item, then emits its documents.
+
+        Runs on the section's thread in item order, so with `item_workers` > 1 the
+        same copy of duplicated content is kept as in a sequential load.
+        """
+        if self.content_budget:
+            docs = self.content_budget.limit_item_documents(key, docs)
+        docs = self.deduplicate(docs)
+        # items abandoned by a timeout are not complete and load again on resume
+        if (
+            checkpoint_item
+            and self.checkpoint
+            and not (self.deadline and key in self.deadline.skipped_keys)
+        ):
+            self.checkpoint.complete_item(key, docs)
+        return self.emit(docs)
+
+    def _wrap_item(
+        self, key: str, load_fn: Callable[[], list[Document]]
+    ) -> Callable[[], list[Document]]:
+        """Opens the item's profiling span; called on the section's own thread"""
+        if self.profiler:
+            return self.profiler.wrap(key, "item", load_fn)
+        return load_fn
+
+    def _run_item_load(
+        self,
+        key: str,
+        load_fn: Callable[[], list[Document]],
+        per_item_timeout: bool = True,
+    ) -> list[Document]:
+        if self.deadline is None:
+            return load_fn()
+        return self.deadline.run(
+            key, load_fn, per_item=per_item_timeout, claims=self.indexed_items
+        )
+
+    def emit(self, docs: list[Document]) -> list[Document]:
+        """Streams an item's documents to the sink, or stores them compactly, if either
+        is set, instead of returning them"""
+        if self.sink_writer is None and self.document_store is None:
+            return docs
+        if self.content_budget:
+            docs = self.content_budget.admit(docs)
+        if self.sink_writer:
+            self.sink_writer.put(docs)
+        else:
+            self.document_store.append(docs)
+        return []
+
     def load_from_module(
         self,
         item: File | Assignment | Page,
@@ -63,38 +239,80 @@ class BaseSectionLoader(ABC):
 
     def parse_html(self, html: str):
         """Extracts text and a list of embedded urls from HTML content"""
-        return parse_html_for_text_and_urls(
-            canvas_client_extractor=self.canvas_client_extractor,
-            html=html,
-            logger=self.logger,
-            should_load_mivideo=self.should_load_mivideo,
-        )
+        with self._span("parse_html", "parse"):
+            return parse_html_for_text_and_urls(
+                canvas_client_extractor=self.canvas_client_extractor,
+                html=html,
+                logger=self.logger,
+                should_load_mivideo=self.should_load_mivideo,
+            )
+
+    def _span(self, name: str, category: str):
+        """Times a block when profiling is enabled"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name, category)
 
     def process_data(
         self, metadata: dict, embed_urls: Optional[list[str]] = None
     ) -> list[Document]:
         """Process metadata on a single 'page'"""
         document_arr = []
-        if metadata["content"]:
+        content = self.normalize_text(metadata["content"] or "")
+        if content:
+            document = Document(
+                page_content=content,
+                metadata=self._remove_null_bytes(metadata["data"]),
+            )
             document_arr.append(
-                Document(
-                    page_content=self._remove_null_bytes(metadata["content"]),
-                    metadata=self._remove_null_bytes(metadata["data"]),
-                )
+                set_document_id(document, self._get_document_id(metadata["data"]))
             )
         if embed_urls and self.should_load_mivideo:
-            document_arr.extend(
-                load_embed_urls(
-                    metadata=metadata,
-                    embed_urls=embed_urls,
-                    mivideo_loader=self.mivideo_loader,
-                )
+            load_media = partial(
+                load_embed_urls,
+                metadata=metadata,
+                embed_urls=embed_urls,
+                mivideo_loader=self.mivideo_loader,
             )
+            if self.deadline and self.deadline.cancelled():
+                # an abandoned item loads no media, now or later
+                return document_arr
+            if self.scheduler and self.scheduler.defer_expensive:
+                # captions are slow to fetch, so they wait in the expensive lane
+                self.scheduler.defer(
+                    key=f"EmbeddedMedia:{self._get_document_id(metadata['data'])}",
+                    cost=len(embed_urls) * self.scheduler.embedded_media_cost,
+                    load_fn=lambda: self.deduplicate(load_media()),
+                )
+            else:
+                document_arr.extend(load_media())
         return document_arr
 
+    def normalize_text(self, text: str) -> str:
+        """Normalizes document text, or only strips NUL bytes when normalization is off"""
+        if self.normalizer is None:
+            return self._remove_null_bytes(text)
+        return self.normalizer.normalize(text)
+
+    def deduplicate(self, docs: list[Document]) -> list[Document]:
+        """Drops documents with already emitted content when deduplication is enabled"""
+        if self.deduplicator is None:
+            return docs
+        return self.deduplicator.filter(docs)
+
+    def _get_document_id(self, data: dict) -> str:
+        """Builds a stable document id from item kind, Canvas id and page number"""
+        return get_document_id(
+            kind=data["kind"],
+            item_id=data.get("id", data["source"]),
+            index=data.get("page", 0),
+        )
+
     def _remove_null_bytes(self, metadata_item: str | dict) -> str | dict:
         """Recursively remove NUL bytes from string or dict of strings"""
         if isinstance(metadata_item, str):
+            if "\x00" not in metadata_item:
+                return metadata_item
             return metadata_item.replace("\x00", "")
         elif isinstance(metadata_item, dict):
             return {
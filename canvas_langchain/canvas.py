@@ -1,7 +1,31 @@
-from typing import Literal
+import hashlib
+from contextlib import nullcontext
+from typing import Callable, Iterator, Literal
 
 from canvas_langchain.client import CanvasClient
+from canvas_langchain.distributed import CourseCoordinator, QueueWorker, WorkQueue
+from canvas_langchain.estimate import CourseEstimate, CourseEstimator
+from canvas_langchain.events import CanvasEventProcessor, EventSource, IndexUpdate
+from canvas_langchain.shared import SharedCourseStore, VisibilityFilter
+from canvas_langchain.sinks import (
+    BATCH_SIZE_DEFAULT,
+    MAX_PENDING_BATCHES_DEFAULT,
+    DocumentSink,
+    SinkError,
+    SinkWriter,
+)
+from canvas_langchain.snapshot import write_snapshot
+from canvas_langchain.utils.budget import ContentBudget
+from canvas_langchain.utils.checkpoint import LoadCheckpoint
+from canvas_langchain.utils.compact import CompactDocumentStore
+from canvas_langchain.utils.deadline import LoadDeadline
+from canvas_langchain.utils.dedupe import ContentDeduplicator
 from canvas_langchain.utils.logging import Logger
+from canvas_langchain.utils.normalize import TextNormalizer
+from canvas_langchain.utils.office_pool import OfficeProcessPool
+from canvas_langchain.utils.pdf_backends import get_pdf_backend
+from canvas_langchain.utils.profiling import LoadProfiler
+from canvas_langchain.utils.scheduler import WorkScheduler, order_tabs
 from langchain.docstore.document import Document
 from langchain.document_loaders.base import BaseLoader
 from pydantic import BaseModel
@@ -13,6 +37,8 @@ try:
 except ImportError:
     import settings
 
+PROFILE_TOP_ITEMS = 10
+
 
 # Prevents conflicts with other classes in UMGPT - Happy to refactor as needed
 class LogStatement(BaseModel):
@@ -35,41 +61,468 @@ class CanvasLoader(BaseLoader):
         api_key: str,
         course_id: int,
         index_external_urls: bool = False,
+        deduplicate_content: bool = False,
+        normalize_text: bool = False,
+        office_process_pool: bool = False,
+        probe_pdfs: bool = False,
+        prioritize_content: bool = False,
+        use_graphql: bool = False,
+        graphql_transport: Callable[[str, dict], dict] | None = None,
+        profile: bool = False,
+        profile_sample_rate: float = 0.0,
+        response_cache_dir: str | None = None,
+        content_budget: dict | None = None,
+        item_workers: int | None = None,
+        checkpoint_path: str | None = None,
+        shared_store_dir: str | None = None,
     ):
         self.should_load_mivideo = True  # Turn into feature flag in next PR
         self.logger = Logger()
+        # the user's own key decides what they may see of shared content
+        user_api_key = api_key
         api_key = getattr(
             settings, "CANVAS_ADMIN_API_KEY", api_key
         )  # override for mivideo caption access
-        self.canvas_client = CanvasClient(api_url, api_key, course_id, self.logger)
+        self.canvas_client = CanvasClient(
+            api_url,
+            api_key,
+            course_id,
+            self.logger,
+            use_graphql=use_graphql,
+            graphql_transport=graphql_transport,
+        )
         self.index_external_urls = index_external_urls
+        self.deduplicate_content = deduplicate_content
+        self.normalizer = TextNormalizer.from_settings() if normalize_text else None
         self.course_id = course_id
+        self.office_process_pool = office_process_pool
+        self.probe_pdfs = probe_pdfs
+        self.prioritize_content = prioritize_content
+        # a misconfigured CANVAS_PDF_BACKEND fails here, not midway through a load
+        get_pdf_backend()
+        self.skipped_items = []
+        self.content_budget = content_budget
+        self.truncated_items = []
+        self.duplicate_sources = {}
+        self.item_workers = item_workers or getattr(settings, "CANVAS_ITEM_WORKERS", 1)
+        self.checkpoint_path = checkpoint_path or getattr(
+            settings, "CANVAS_CHECKPOINT_PATH", None
+        )
+        shared_store_dir = shared_store_dir or getattr(
+            settings, "CANVAS_SHARED_STORE_DIR", None
+        )
+        # content is only the same for every user when loaded with the admin key
+        self.shared_store = (
+            SharedCourseStore.from_settings(shared_store_dir)
+            if shared_store_dir and api_key != user_api_key
+            else None
+        )
+        self.user_canvas_client = (
+            CanvasClient(api_url, user_api_key, course_id, self.logger)
+            if self.shared_store
+            else None
+        )
+        self.load_completed = False
+        self.profile = profile
+        self.profile_sample_rate = profile_sample_rate
+        self.profiler = None
+        self.response_cache = None
+        response_cache_dir = response_cache_dir or getattr(
+            settings, "CANVAS_RESPONSE_CACHE_DIR", None
+        )
+        if response_cache_dir:
+            self.response_cache = self.canvas_client.enable_response_cache(
+                response_cache_dir
+            )
 
-    def load(self) -> list[Document]:
-        """Loads all available content from Canvas course"""
+    def load(
+        self, time_budget: float | None = None, item_timeout: float | None = None
+    ) -> list[Document]:
+        """Loads all available content from Canvas course.
+
+        With `time_budget` (seconds for the whole load) or `item_timeout` (seconds per
+        file, page, assignment, etc.), items still running when their time runs out are
+        abandoned. The documents completed so far are returned, and what was left out
+        is listed in `skipped_items`.
+
+        With `profile=True`, the load is recorded in `profiler` as nested
+        section/item/download/parse/caption spans (see `LoadProfiler.export`).
+
+        With `checkpoint_path`, progress is saved as items finish. A load that was
+        interrupted resumes from there: the documents already loaded are returned
+        again and only the remaining items are fetched. The checkpoint is cleared
+        once a load completes with nothing skipped.
+
+        With `shared_store_dir` and an admin key, the course is crawled once and
+        its content reused by every user until it expires. Each user gets the
+        documents of the items they can see, checked with their own key.
+        """
+        if self.shared_store:
+            return self._load_shared(time_budget=time_budget, item_timeout=item_timeout)
+        return list(
+            self._load(time_budget=time_budget, item_timeout=item_timeout).drain()
+        )
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Loads the course like `load`, then hands out documents one at a time,
+        so the whole course is never held as `Document` objects at once"""
+        if self.shared_store:
+            yield from self._load_shared()
+            return
+        yield from self._load().drain()
+
+    def load_to_sink(
+        self,
+        sink: DocumentSink,
+        batch_size: int = BATCH_SIZE_DEFAULT,
+        max_pending_batches: int = MAX_PENDING_BATCHES_DEFAULT,
+        time_budget: float | None = None,
+        item_timeout: float | None = None,
+    ) -> int:
+        """Loads the course like `load`, streaming documents to `sink` as items finish.
+
+        Documents are delivered in batches of `batch_size` on a background thread.
+        Once `max_pending_batches` batches are waiting for the sink, loading blocks
+        until it catches up. Returns the number of documents written. An error
+        raised by the sink stops the load and is re-raised here as `SinkError`.
+        """
+        sink_writer = SinkWriter(
+            sink, batch_size=batch_size, max_pending_batches=max_pending_batches
+        )
+        try:
+            if self.shared_store:
+                sink_writer.put(
+                    self._load_shared(
+                        time_budget=time_budget, item_timeout=item_timeout
+                    )
+                )
+            else:
+                self._load(
+                    time_budget=time_budget,
+                    item_timeout=item_timeout,
+                    sink_writer=sink_writer,
+                )
+        finally:
+            sink_writer.close()
+        return sink_writer.documents_written
+
+    def _load_shared(
+        self, time_budget: float | None = None, item_timeout: float | None = None
+    ) -> list[Document]:
+        """Takes the course from the shared store, crawling it on a miss, and
+        keeps the documents visible to this loader's user"""
+        self.skipped_items = []
+        self.truncated_items = []
+        # time spent waiting for another user's load counts against the budget
+        deadline = LoadDeadline(time_budget=time_budget)
+
+        def load_course() -> tuple[list[Document], bool]:
+            docs = list(
+                self._load(
+                    time_budget=deadline.remaining(), item_timeout=item_timeout
+                ).drain()
+            )
+            # partial loads serve this user but are not shared
+            return docs, self.load_completed and not self.skipped_items
+
+        docs = self.shared_store.get_or_load(
+            self.course_id,
+            load_course,
+            variant=self._get_shared_variant(),
+            time_budget=time_budget,
+        )
+        visible_docs = VisibilityFilter.from_client(
+            self.user_canvas_client, self.logger
+        ).apply(docs)
+        self.logger.logStatement(
+            message=f"{len(visible_docs)} of {len(docs)} shared documents visible.",
+            level="DEBUG",
+        )
+        return visible_docs
+
+    def _get_shared_variant(self) -> str:
+        """Identifies the loader options that change the content of a course"""
+        options = (
+            self.index_external_urls,
+            self.deduplicate_content,
+            self.normalizer is not None,
+            self.content_budget,
+            self.probe_pdfs,
+            self.should_load_mivideo,
+            self.prioritize_content,
+        )
+        return hashlib.sha256(repr(options).encode("utf-8")).hexdigest()[:12]
+
+    def _load(
+        self,
+        time_budget: float | None = None,
+        item_timeout: float | None = None,
+        sink_writer: SinkWriter | None = None,
+    ) -> CompactDocumentStore:
+        """Loads the course, returning documents or streaming them to `sink_writer`"""
         self.logger.logStatement(
             message="Starting document loading process. \n", level="INFO"
         )
-        docs = []
+        # documents wait here, compacted per item, until the load hands them out
+        docs = CompactDocumentStore()
+        budget = (
+            ContentBudget(**self.content_budget)
+            if self.content_budget
+            else ContentBudget.from_settings()
+        )
+        self.truncated_items = budget.truncated_items if budget else []
+        deduplicator = ContentDeduplicator() if self.deduplicate_content else None
+        self.duplicate_sources = deduplicator.duplicate_sources if deduplicator else {}
+        if self.normalizer:
+            # the summary logged at the end describes this load only
+            self.normalizer.reset_counts()
+
+        def collect(new_docs: list[Document]):
+            if budget:
+                new_docs = budget.admit(new_docs)
+            # items emit their own documents to the sink or store; sections return the rest
+            if sink_writer:
+                sink_writer.put(new_docs)
+            else:
+                docs.append(new_docs)
+
+        deadline = LoadDeadline(time_budget=time_budget, item_timeout=item_timeout)
+        self.skipped_items = deadline.skipped_items
+        checkpoint = (
+            LoadCheckpoint.from_settings(self.checkpoint_path, self.course_id)
+            if self.checkpoint_path
+            else None
+        )
+        # deferred work outlives the item that deferred it, so it could not be
+        # resumed; with a checkpoint, large files and captions load in place
+        scheduler = (
+            WorkScheduler.from_settings(defer_expensive=checkpoint is None)
+            if self.prioritize_content
+            else None
+        )
+        office_pool = (
+            OfficeProcessPool.from_settings() if self.office_process_pool else None
+        )
+        pdf_probe = self.canvas_client.create_pdf_probe() if self.probe_pdfs else None
+        if self.profile:
+            self.profiler = LoadProfiler(cprofile_sample_rate=self.profile_sample_rate)
+        if item_timeout:
+            self.canvas_client.set_request_timeout(item_timeout)
+        completed = False
         try:
+            if checkpoint and checkpoint.has_progress():
+                self.logger.logStatement(
+                    message="Resuming interrupted course load.", level="DEBUG"
+                )
+                self.canvas_client.indexed_items.update(checkpoint.indexed_item_keys())
+                replayed = list(checkpoint.documents())
+                if deduplicator:
+                    # content emitted before the interruption is not emitted twice
+                    deduplicator.seed(replayed)
+                collect(replayed)
             available_tabs = self.canvas_client.get_available_tabs()
+            if scheduler:
+                available_tabs = order_tabs(available_tabs)
             loaders = self.canvas_client.get_loaders(
-                index_external_urls=self.index_external_urls
+                index_external_urls=self.index_external_urls,
+                deduplicate_content=self.deduplicate_content,
+                normalizer=self.normalizer,
+                deadline=deadline,
+                scheduler=scheduler,
+                office_pool=office_pool,
+                pdf_probe=pdf_probe,
+                profiler=self.profiler,
+                sink_writer=sink_writer,
+                content_budget=budget,
+                # budget reservations happen inside items, so cuts are only
+                # deterministic when items load one at a time
+                item_workers=1 if budget else self.item_workers,
+                checkpoint=checkpoint,
+                document_store=None if sink_writer else docs,
+                deduplicator=deduplicator,
             )
 
+            if budget and budget.max_download_bytes is not None and "Files" in loaders:
+                loaders["Files"].plan_downloads()
             for tab_name in available_tabs:
-                if tab_name in loaders:
-                    docs.extend(loaders[tab_name].load_section())
+                if tab_name not in loaders:
+                    continue
+                if checkpoint and checkpoint.is_section_completed(tab_name):
+                    continue
+                if deadline.expired():
+                    deadline.skip(f"Section:{tab_name}", "time_budget_exhausted")
+                    continue
+                skipped_before = len(deadline.skipped_items)
+                with self._span(tab_name, "section"):
+                    collect(loaders[tab_name].load_section())
+                if deadline.expired():
+                    # section was cut short
+                    deadline.skip(f"Section:{tab_name}", "time_budget_exhausted")
+                elif checkpoint and len(deadline.skipped_items) == skipped_before:
+                    # sections with timed out items run again to retry them
+                    checkpoint.complete_section(tab_name)
+
+            # large files and media captions, smallest first
+            if scheduler:
+                with self._span("Deferred", "section"):
+                    for key, load_fn in scheduler.drain():
+                        if self.profiler:
+                            load_fn = self.profiler.wrap(key, "item", load_fn)
+                        collect(deadline.run(key, load_fn))
+            completed = True
 
+        except SinkError:
+            raise
         except Exception as err:
             self.logger.logStatement(
                 message=f"Error loading Canvas materials {err}", level="WARNING"
             )
+        finally:
+            self.load_completed = completed
+            deadline.close()
+            if office_pool:
+                office_pool.close()
+            if pdf_probe:
+                pdf_probe.close()
+            if checkpoint:
+                if completed and not deadline.skipped_items:
+                    checkpoint.clear()
+                checkpoint.close()
+        if self.normalizer:
+            self.logger.logStatement(
+                message=self.normalizer.get_summary(), level="DEBUG"
+            )
+        if self.profiler:
+            slowest = ", ".join(
+                f"{key} ({seconds:.2f}s)"
+                for key, seconds in self.profiler.top_items(PROFILE_TOP_ITEMS)
+            )
+            self.logger.logStatement(message=f"Slowest items: {slowest}", level="DEBUG")
         self.logger.logStatement(
             message="Canvas course processing finished.", level="INFO"
         )
         return docs
 
+    def estimate(self) -> CourseEstimate:
+        """Projects the size and API cost of `load` from list endpoints only,
+        without downloading or parsing anything"""
+        return CourseEstimator(self.canvas_client, self.logger).estimate()
+
+    def enqueue(self, work_queue: WorkQueue) -> int:
+        """Lists the course's content onto `work_queue` as one work item per
+        file, page, assignment, etc. Returns the number of items added."""
+        coordinator = CourseCoordinator(
+            self.canvas_client,
+            self.logger,
+            index_external_urls=self.index_external_urls,
+        )
+        return work_queue.put(self.course_id, coordinator.get_work_items())
+
+    def work(
+        self,
+        work_queue: WorkQueue,
+        worker_id: str | None = None,
+        max_items: int | None = None,
+        idle_timeout: float | None = None,
+        item_timeout: float | None = None,
+    ) -> int:
+        """Loads work items of this course from `work_queue` until it is drained,
+        writing their documents back to the queue. Returns the number of items handled.
+
+        Any number of workers, in other processes or on other nodes, may run at once;
+        `work_queue.documents(course_id)` returns the combined result.
+
+        With `deduplicate_content`, content is claimed in the queue's claim store,
+        so each copy is emitted by one worker only. Which copy is kept then depends
+        on which worker gets to it first, and `duplicate_sources` only lists the
+        copies this worker dropped itself.
+        """
+        claim_store = work_queue.get_claim_store(self.course_id)
+        indexed_items = self.canvas_client.indexed_items
+        # deduplicate against every worker, not only this process
+        self.canvas_client.indexed_items = claim_store
+        deadline = LoadDeadline(item_timeout=item_timeout)
+        self.skipped_items = deadline.skipped_items
+        deduplicator = (
+            ContentDeduplicator(claims=claim_store)
+            if self.deduplicate_content
+            else None
+        )
+        self.duplicate_sources = deduplicator.duplicate_sources if deduplicator else {}
+        if item_timeout:
+            self.canvas_client.set_request_timeout(item_timeout)
+        office_pool = (
+            OfficeProcessPool.from_settings() if self.office_process_pool else None
+        )
+        pdf_probe = self.canvas_client.create_pdf_probe() if self.probe_pdfs else None
+        try:
+            loaders = self.canvas_client.get_loaders(
+                index_external_urls=self.index_external_urls,
+                deduplicate_content=self.deduplicate_content,
+                normalizer=self.normalizer,
+                deadline=deadline,
+                office_pool=office_pool,
+                pdf_probe=pdf_probe,
+                deduplicator=deduplicator,
+            )
+            worker = QueueWorker(
+                work_queue=work_queue,
+                course_id=self.course_id,
+                loaders=loaders,
+                canvas_client=self.canvas_client,
+                claim_store=claim_store,
+                logger=self.logger,
+                worker_id=worker_id,
+            )
+            return worker.run(max_items=max_items, idle_timeout=idle_timeout)
+        finally:
+            deadline.close()
+            if office_pool:
+                office_pool.close()
+            if pdf_probe:
+                pdf_probe.close()
+            claim_store.close()
+            self.canvas_client.indexed_items = indexed_items
+
+    def process_events(
+        self,
+        source: EventSource,
+        max_events: int | None = None,
+        idle_timeout: float | None = None,
+    ) -> Iterator[IndexUpdate]:
+        """Re-indexes only the items named by Canvas change events from `source`.
+
+        Yields one `IndexUpdate` per handled event: stored documents whose `doc_id`
+        starts with one of `deleted_id_prefixes`, and captions whose `embedded_in` is
+        one of `deleted_embedded_in`, should be replaced by `documents`.
+        """
+        loaders = self.canvas_client.get_loaders(
+            index_external_urls=self.index_external_urls,
+            deduplicate_content=self.deduplicate_content,
+            normalizer=self.normalizer,
+        )
+        processor = CanvasEventProcessor(
+            loaders=loaders,
+            canvas_client_extractor=self.canvas_client.rest_extractor,
+            indexed_items=self.canvas_client.indexed_items,
+            logger=self.logger,
+        )
+        return processor.run(source, max_events=max_events, idle_timeout=idle_timeout)
+
+    def export_snapshot(
+        self, path: str, documents: list[Document], append: bool = True
+    ) -> int:
+        """Writes loaded documents to a compressed snapshot that
+        `CanvasSnapshotLoader` can reload without contacting Canvas"""
+        return write_snapshot(
+            path=path, documents=documents, course_id=self.course_id, append=append
+        )
+
+    def _span(self, name: str, category: str):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name, category)
+
     def get_details(self, level="INFO") -> list:
         if level == "INFO":
             return self.logger._filtered_statements_by_level(level=level)
@@ -1,7 +1,9 @@
+from typing import Callable
 from urllib.parse import urljoin
 
 from canvas_langchain.base import BaseSectionLoader, BaseSectionLoaderVars
 from canvas_langchain.client_getters import CanvasClientGetters
+from canvas_langchain.client_graphql import CanvasGraphQLGetters
 from canvas_langchain.sections.announcements import AnnouncementLoader
 from canvas_langchain.sections.assignments import AssignmentLoader
 from canvas_langchain.sections.files import FileLoader
@@ -9,7 +11,21 @@ from canvas_langchain.sections.mivideo import MiVideoLoader
 from canvas_langchain.sections.modules import ModuleLoader
 from canvas_langchain.sections.pages import PageLoader
 from canvas_langchain.sections.syllabus import SyllabusLoader
+from canvas_langchain.utils.budget import ContentBudget
+from canvas_langchain.utils.checkpoint import LoadCheckpoint
+from canvas_langchain.utils.claims import ClaimSet
+from canvas_langchain.utils.compact import CompactDocumentStore
+from canvas_langchain.utils.deadline import LoadDeadline
+from canvas_langchain.utils.dedupe import ContentDeduplicator
+from canvas_langchain.utils.http import TimeoutHTTPAdapter
+from canvas_langchain.utils.http_cache import CachingHTTPAdapter
 from canvas_langchain.utils.logging import Logger
+from canvas_langchain.utils.normalize import TextNormalizer
+from canvas_langchain.utils.office_pool import OfficeProcessPool
+from canvas_langchain.utils.pdf_probe import PdfProbe
+from canvas_langchain.sinks import SinkWriter
+from canvas_langchain.utils.profiling import LoadProfiler
+from canvas_langchain.utils.scheduler import WorkScheduler
 from canvasapi import Canvas
 from canvasapi.course import Course
 from canvasapi.exceptions import Forbidden
@@ -21,15 +37,35 @@ class UnpublishedCourseException(Exception):
 
 
 class CanvasClient:
-    def __init__(self, api_url: str, api_key: str, course_id: int, logger: Logger):
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        course_id: int,
+        logger: Logger,
+        use_graphql: bool = False,
+        graphql_transport: Callable[[str, dict], dict] | None = None,
+    ):
         self._canvas = Canvas(api_url, api_key)
         self.api_url = api_url
         self._course = self.get_course(course_id)
         self.logger = logger
-        self.content_extractor = CanvasClientGetters(
+        # single-item lookups (e.g. for change events) always go through REST
+        self.rest_extractor = CanvasClientGetters(
             canvas=self._canvas, course=self._course, logger=logger
         )
-        self.indexed_items = set()
+        self.content_extractor = (
+            CanvasGraphQLGetters(
+                canvas=self._canvas,
+                course=self._course,
+                logger=logger,
+                transport=graphql_transport,
+            )
+            if use_graphql
+            else self.rest_extractor
+        )
+        self.indexed_items = ClaimSet()
+        self._http_adapter = None
 
     def get_course(self, course_id: int) -> Course:
         try:
@@ -41,18 +77,71 @@ class CanvasClient:
             )
             raise UnpublishedCourseException(message=exception_message)
 
+    def get_session(self):
+        """The requests session shared by all Canvas API calls"""
+        return self._canvas._Canvas__requester._session
+
+    def set_request_timeout(self, timeout: float):
+        """Applies a default timeout to every Canvas API request and file download"""
+        if self._http_adapter is not None:
+            self._http_adapter.timeout = timeout
+        else:
+            self._mount_adapter(TimeoutHTTPAdapter(timeout=timeout))
+
+    def enable_response_cache(self, cache_dir: str) -> CachingHTTPAdapter:
+        """Caches and revalidates Canvas API responses on disk under `cache_dir`"""
+        adapter = CachingHTTPAdapter.from_settings(
+            cache_dir=cache_dir,
+            base_url=self._canvas._Canvas__requester.base_url,
+            timeout=self._http_adapter.timeout if self._http_adapter else None,
+        )
+        self._mount_adapter(adapter)
+        return adapter
+
+    def create_pdf_probe(self) -> PdfProbe:
+        """A probe that range-requests file downloads with this client's session"""
+        return PdfProbe.from_settings(
+            session=self.get_session(),
+            access_token=self._canvas._Canvas__requester.access_token,
+        )
+
+    def _mount_adapter(self, adapter: TimeoutHTTPAdapter):
+        session = self.get_session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._http_adapter = adapter
+
     def get_available_tabs(self) -> list[str]:
+        """Returns tab labels in Canvas order"""
         return [tab.label for tab in self._course.get_tabs()]
 
     def get_loaders(
         self,
         index_external_urls: bool,
         should_load_mivideo: bool = True,
+        deduplicate_content: bool = False,
+        normalizer: TextNormalizer | None = None,
+        deadline: LoadDeadline | None = None,
+        scheduler: WorkScheduler | None = None,
+        office_pool: OfficeProcessPool | None = None,
+        pdf_probe: PdfProbe | None = None,
+        profiler: LoadProfiler | None = None,
+        sink_writer: SinkWriter | None = None,
+        content_budget: ContentBudget | None = None,
+        item_workers: int = 1,
+        checkpoint: LoadCheckpoint | None = None,
+        document_store: CompactDocumentStore | None = None,
+        deduplicator: ContentDeduplicator | None = None,
     ) -> dict[str, BaseSectionLoader]:
+        if deduplicate_content and deduplicator is None:
+            deduplicator = ContentDeduplicator()
         mivideo_loader = MiVideoLoader(
             canvas_content_extractor=self.content_extractor,
             indexed_items=self.indexed_items,
             logger=self.logger,
+            deadline=deadline,
+            profiler=profiler,
+            content_budget=content_budget,
         )
         base_vars = BaseSectionLoaderVars(
             canvas_client_extractor=self.content_extractor,
@@ -60,12 +149,27 @@ class CanvasClient:
             logger=self.logger,
             mivideo_loader=mivideo_loader,
             should_load_mivideo=should_load_mivideo,
+            deduplicator=deduplicator if deduplicate_content else None,
+            normalizer=normalizer,
+            deadline=deadline,
+            scheduler=scheduler,
+            profiler=profiler,
+            sink_writer=sink_writer,
+            content_budget=content_budget,
+            item_workers=item_workers,
+            checkpoint=checkpoint,
+            document_store=document_store,
         )
         course_api = urljoin(self.api_url, f"courses/{self._course.id}/")
 
         assignment_loader = AssignmentLoader(baseSectionVars=base_vars)
         page_loader = PageLoader(baseSectionVars=base_vars, course_api=course_api)
-        file_loader = FileLoader(baseSectionVars=base_vars, course_api=course_api)
+        file_loader = FileLoader(
+            baseSectionVars=base_vars,
+            course_api=course_api,
+            office_pool=office_pool,
+            pdf_probe=pdf_probe,
+        )
 
         return {
             "Announcements": AnnouncementLoader(baseSectionVars=base_vars),
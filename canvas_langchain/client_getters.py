@@ -3,8 +3,10 @@ from datetime import date
 from canvas_langchain.utils.logging import Logger
 from canvasapi.assignment import Assignment
 from canvasapi.course import Course
+from canvasapi.discussion_topic import DiscussionTopic
 from canvasapi.exceptions import CanvasException
 from canvasapi.file import File
+from canvasapi.module import Module
 from canvasapi.page import Page
 from canvasapi.paginated_list import PaginatedList
 
@@ -28,6 +30,9 @@ class CanvasClientGetters:
     def get_assignment(self, assignment_id) -> Assignment:
         return self._course.get_assignment(assignment_id)
 
+    def get_discussion_topic(self, topic_id) -> DiscussionTopic:
+        return self._course.get_discussion_topic(topic_id)
+
     def get_files(self) -> PaginatedList:
         return self._course.get_files()
 
@@ -37,15 +42,28 @@ class CanvasClientGetters:
     def get_modules(self) -> PaginatedList:
         return self._course.get_modules()
 
+    def get_module(self, module_id) -> Module:
+        return self._course.get_module(module_id)
+
     def get_pages(self) -> PaginatedList:
         return self._course.get_pages(published=True, include=["body"])
 
+    def get_page_list(self) -> PaginatedList:
+        """Published pages without their bodies, for cheap visibility checks"""
+        return self._course.get_pages(published=True)
+
     def get_page(self, url) -> Page:
         return self._course.get_page(url)
 
     def get_syllabus(self) -> str:
         return self._course.syllabus_body
 
+    def refresh_course(self):
+        """Re-fetches the course so course-level fields like the syllabus are current"""
+        self._course = self._canvas.get_course(
+            self._course.id, include=["syllabus_body"]
+        )
+
     def get_url_from_canvas(self, uuid: str) -> str:
         endpoint = f"courses/{self._course.id}/lti_resource_links/lookup_uuid:{uuid}"
         url = None
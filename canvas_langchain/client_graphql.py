@@ -0,0 +1,229 @@
+"""Content getters backed by Canvas GraphQL bulk queries.
+
+Assignments (with descriptions), modules (with their items) and pages (with
+bodies) are each fetched in a handful of paginated GraphQL queries instead of
+one REST call per list page plus one per module item. The returned objects
+expose the attributes the section loaders read from canvasapi objects, so
+the loaders work unchanged. Everything else falls back to REST.
+"""
+
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable
+
+from canvas_langchain.client_getters import CanvasClientGetters
+from canvas_langchain.utils.logging import Logger
+from canvasapi.course import Course
+from canvasapi.exceptions import CanvasException
+
+PAGE_SIZE = 100
+
+ASSIGNMENTS_QUERY = """
+query CourseAssignments($courseId: ID!, $first: Int!, $cursor: String) {
+  course(id: $courseId) {
+    assignmentsConnection(first: $first, after: $cursor) {
+      nodes { _id name dueAt pointsPossible description htmlUrl }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+MODULES_QUERY = """
+query CourseModules($courseId: ID!, $first: Int!, $cursor: String) {
+  course(id: $courseId) {
+    modulesConnection(first: $first, after: $cursor) {
+      nodes {
+        _id
+        name
+        unlockAt
+        moduleItems {
+          _id
+          content {
+            __typename
+            ... on Assignment { _id name }
+            ... on Page { _id title url }
+            ... on File { _id displayName }
+            ... on ExternalUrl { _id title url }
+          }
+        }
+      }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+PAGES_QUERY = """
+query CoursePages($courseId: ID!, $first: Int!, $cursor: String) {
+  course(id: $courseId) {
+    pagesConnection(first: $first, after: $cursor) {
+      nodes { _id title url body published lockInfo { isLocked } }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+
+class GraphQLObject(SimpleNamespace):
+    """A GraphQL node shaped like the canvasapi object it stands in for"""
+
+
+class GraphQLModule(GraphQLObject):
+    def get_module_items(self) -> list[GraphQLObject]:
+        return self.items
+
+
+class RecordedGraphQLTransport:
+    """Serves recorded GraphQL responses, e.g. for developing without a Canvas instance.
+
+    The recording is a JSON list of `{"operation", "cursor", "response"}` entries,
+    matched on the query's operation name and pagination cursor.
+    """
+
+    def __init__(self, path: str):
+        with open(path) as recording:
+            self.responses = {
+                (entry["operation"], entry.get("cursor")): entry["response"]
+                for entry in json.load(recording)
+            }
+
+    def __call__(self, query: str, variables: dict) -> dict:
+        operation = query.split("query ", 1)[1].split("(", 1)[0].strip()
+        return self.responses[(operation, variables.get("cursor"))]
+
+
+def _to_rest_timestamp(value: str | None) -> str | None:
+    """Converts a GraphQL ISO 8601 timestamp (with offset) to the REST UTC format"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _page_slug(url: str | None, page_id: str) -> str:
+    """Returns the page's URL slug, as REST `page.url` does"""
+    return url.rstrip("/").rsplit("/", 1)[-1] if url else page_id
+
+
+class CanvasGraphQLGetters(CanvasClientGetters):
+    def __init__(
+        self,
+        canvas,
+        course: Course,
+        logger: Logger,
+        transport: Callable[[str, dict], dict] | None = None,
+    ):
+        super().__init__(canvas=canvas, course=course, logger=logger)
+        self.transport = transport or canvas.graphql
+        self.graphql_requests = 0
+        self._assignments = None
+        self._modules = None
+        self._pages = None
+        self._page_list = []
+
+    def get_assignments(self) -> list[GraphQLObject]:
+        return list(self._get_assignments_by_id().values())
+
+    def get_assignment(self, assignment_id) -> GraphQLObject:
+        assignment = self._get_assignments_by_id().get(str(assignment_id))
+        return assignment or super().get_assignment(assignment_id)
+
+    def get_modules(self) -> list[GraphQLModule]:
+        if self._modules is None:
+            self._modules = [
+                self._to_module(node)
+                for node in self._fetch_all(MODULES_QUERY, "modulesConnection")
+            ]
+        return self._modules
+
+    def get_pages(self) -> list[GraphQLObject]:
+        self._get_pages()
+        return self._page_list
+
+    def get_page(self, url) -> GraphQLObject:
+        return self._get_pages().get(str(url)) or super().get_page(url)
+
+    def _get_assignments_by_id(self) -> dict[str, GraphQLObject]:
+        if self._assignments is None:
+            self._assignments = {}
+            for node in self._fetch_all(ASSIGNMENTS_QUERY, "assignmentsConnection"):
+                self._assignments[node["_id"]] = GraphQLObject(
+                    id=int(node["_id"]),
+                    name=node["name"],
+                    due_at=_to_rest_timestamp(node.get("dueAt")),
+                    points_possible=node.get("pointsPossible"),
+                    description=node.get("description"),
+                    html_url=node.get("htmlUrl"),
+                )
+        return self._assignments
+
+    def _get_pages(self) -> dict[str, GraphQLObject]:
+        """Published pages, keyed by both URL slug and id"""
+        if self._pages is None:
+            self._pages = {}
+            for node in self._fetch_all(PAGES_QUERY, "pagesConnection"):
+                if not node.get("published", True):
+                    continue
+                page = GraphQLObject(
+                    page_id=int(node["_id"]),
+                    title=node["title"],
+                    url=_page_slug(node.get("url"), node["_id"]),
+                    body=node.get("body"),
+                    locked_for_user=bool(
+                        (node.get("lockInfo") or {}).get("isLocked", False)
+                    ),
+                )
+                self._page_list.append(page)
+                self._pages[page.url] = page
+                self._pages[node["_id"]] = page
+        return self._pages
+
+    def _to_module(self, node: dict) -> GraphQLModule:
+        items = []
+        for item in node.get("moduleItems") or []:
+            content = item.get("content") or {}
+            content_id = content.get("_id")
+            items.append(
+                GraphQLObject(
+                    id=int(item["_id"]),
+                    type=content.get("__typename"),
+                    title=content.get("name")
+                    or content.get("title")
+                    or content.get("displayName"),
+                    content_id=int(content_id) if content_id else None,
+                    # pages are cached by id as well as slug
+                    page_url=content_id,
+                    external_url=content.get("url"),
+                )
+            )
+        return GraphQLModule(
+            id=int(node["_id"]),
+            name=node["name"],
+            unlock_at=_to_rest_timestamp(node.get("unlockAt")),
+            items=items,
+        )
+
+    def _fetch_all(self, query: str, connection: str) -> list[dict]:
+        """Follows a connection's cursors until every node has been fetched"""
+        nodes = []
+        cursor = None
+        while True:
+            self.graphql_requests += 1
+            response = self.transport(
+                query,
+                {
+                    "courseId": str(self.get_course_id()),
+                    "first": PAGE_SIZE,
+                    "cursor": cursor,
+                },
+            )
+            if response.get("errors"):
+                raise CanvasException(f"GraphQL errors: {response['errors']}")
+            page = response["data"]["course"][connection]
+            nodes.extend(page["nodes"])
+            if not page["pageInfo"]["hasNextPage"]:
+                return nodes
+            cursor = page["pageInfo"]["endCursor"]
@@ -0,0 +1,495 @@
+"""Sharding one course load across processes and machines through a work queue.
+
+A coordinator (`CanvasLoader.enqueue`) lists the course's content and puts
+one `WorkItem` per file, page, assignment, announcement, module item, the
+syllabus and the media gallery on a pluggable `WorkQueue`. Any number of
+workers (`CanvasLoader.work`), on any node that can reach the queue, claim
+items under a lease, load them with the regular section loaders and write
+the documents back. Items whose worker died are claimed again once their
+lease expires. Workers deduplicate items, and with `deduplicate_content` also
+content, through the queue's shared claim store instead of the per-process
+`indexed_items` set.
+
+`SQLiteWorkQueue` keeps everything in one SQLite file, which is enough for
+workers on one machine or on a shared filesystem.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from canvas_langchain.base import BaseSectionLoader
+from canvas_langchain.client import CanvasClient
+from canvas_langchain.sections.files import LOADED_CONTENT_TYPES
+from canvas_langchain.utils.claims import SQLiteClaimStore
+from canvas_langchain.utils.logging import Logger
+from canvasapi.exceptions import CanvasException
+from langchain.docstore.document import Document
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+LEASE_SECONDS_DEFAULT = 10 * 60
+MAX_ATTEMPTS_DEFAULT = 3
+POLL_SECONDS = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER,
+    key TEXT,
+    kind TEXT,
+    payload TEXT,
+    status TEXT DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER DEFAULT 0,
+    error TEXT,
+    UNIQUE (course_id, key)
+);
+CREATE TABLE IF NOT EXISTS results (
+    course_id INTEGER,
+    key TEXT,
+    position INTEGER,
+    page_content TEXT,
+    metadata TEXT,
+    PRIMARY KEY (course_id, key, position)
+);
+"""
+
+
+@dataclass
+class WorkItem:
+    """One unit of loading work, e.g. a single file or module item"""
+
+    key: str
+    kind: str
+    payload: dict = field(default_factory=dict)
+    attempts: int = 0
+
+
+class WorkQueue(ABC):
+    """Work items and their results, shared by a coordinator and its workers"""
+
+    @abstractmethod
+    def put(self, course_id: int, items: list[WorkItem]) -> int:
+        """Adds items not queued yet, returning how many were added"""
+        pass
+
+    @abstractmethod
+    def claim(self, course_id: int, worker_id: str) -> WorkItem | None:
+        """Leases the next pending item, or one whose lease has expired"""
+        pass
+
+    @abstractmethod
+    def complete(self, course_id: int, item: WorkItem, documents: list[Document]):
+        """Stores an item's documents and marks it done"""
+        pass
+
+    @abstractmethod
+    def fail(self, course_id: int, item: WorkItem, error: str):
+        """Returns an item to the queue, or marks it failed after its last attempt"""
+        pass
+
+    @abstractmethod
+    def counts(self, course_id: int) -> dict[str, int]:
+        """Number of items per status: pending, claimed, done and failed"""
+        pass
+
+    @abstractmethod
+    def documents(self, course_id: int) -> Iterator[Document]:
+        """The documents of completed items, in the order the items were queued"""
+        pass
+
+    @abstractmethod
+    def get_claim_store(self, course_id: int):
+        """A claim store shared by all workers of the course, used as `indexed_items`"""
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteWorkQueue(WorkQueue):
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = LEASE_SECONDS_DEFAULT,
+        max_attempts: int = MAX_ATTEMPTS_DEFAULT,
+        timeout: float = 30,
+    ):
+        """Opens or creates the queue at `path`; `timeout` is how long to wait on locks"""
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_settings(cls, path: str) -> "SQLiteWorkQueue":
+        return cls(
+            path,
+            lease_seconds=getattr(
+                settings, "CANVAS_WORK_LEASE_SECONDS", LEASE_SECONDS_DEFAULT
+            ),
+            max_attempts=getattr(
+                settings, "CANVAS_WORK_MAX_ATTEMPTS", MAX_ATTEMPTS_DEFAULT
+            ),
+        )
+
+    def put(self, course_id: int, items: list[WorkItem]) -> int:
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO work (course_id, key, kind, payload) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (course_id, item.key, item.kind, json.dumps(item.payload))
+                    for item in items
+                ],
+            )
+            return connection.total_changes - before
+
+    def claim(self, course_id: int, worker_id: str) -> WorkItem | None:
+        now = time.time()
+        with self._transaction() as connection:
+            while True:
+                row = connection.execute(
+                    "SELECT seq, key, kind, payload, attempts FROM work "
+                    "WHERE course_id = ? AND (status = 'pending' "
+                    "OR (status = 'claimed' AND lease_until < ?)) "
+                    "ORDER BY seq LIMIT 1",
+                    (course_id, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                seq, key, kind, payload, attempts = row
+                if attempts < self.max_attempts:
+                    break
+                # its workers kept dying before finishing it
+                connection.execute(
+                    "UPDATE work SET status = 'failed', error = 'lease expired' "
+                    "WHERE seq = ?",
+                    (seq,),
+                )
+            connection.execute(
+                "UPDATE work SET status = 'claimed', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE seq = ?",
+                (worker_id, now + self.lease_seconds, seq),
+            )
+        return WorkItem(
+            key=key, kind=kind, payload=json.loads(payload), attempts=attempts + 1
+        )
+
+    def complete(self, course_id: int, item: WorkItem, documents: list[Document]):
+        with self._transaction() as connection:
+            # a worker whose lease ran out may finish after its replacement
+            connection.execute(
+                "DELETE FROM results WHERE course_id = ? AND key = ?",
+                (course_id, item.key),
+            )
+            connection.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        course_id,
+                        item.key,
+                        position,
+                        doc.page_content,
+                        json.dumps(doc.metadata, default=str),
+                    )
+                    for position, doc in enumerate(documents)
+                ],
+            )
+            connection.execute(
+                "UPDATE work SET status = 'done', error = NULL "
+                "WHERE course_id = ? AND key = ?",
+                (course_id, item.key),
+            )
+
+    def fail(self, course_id: int, item: WorkItem, error: str):
+        status = "failed" if item.attempts >= self.max_attempts else "pending"
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE work SET status = ?, error = ? "
+                "WHERE course_id = ? AND key = ? AND status = 'claimed'",
+                (status, error, course_id, item.key),
+            )
+
+    def counts(self, course_id: int) -> dict[str, int]:
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0}
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM work WHERE course_id = ? GROUP BY status",
+                (course_id,),
+            ).fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def documents(self, course_id: int) -> Iterator[Document]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT results.page_content, results.metadata FROM results "
+                "JOIN work ON work.course_id = results.course_id "
+                "AND work.key = results.key "
+                "WHERE results.course_id = ? ORDER BY work.seq, results.position",
+                (course_id,),
+            ).fetchall()
+        for page_content, metadata in rows:
+            doc = Document(page_content=page_content, metadata=json.loads(metadata))
+            if hasattr(doc, "id"):
+                doc.id = doc.metadata.get("doc_id")
+            yield doc
+
+    def get_claim_store(self, course_id: int) -> SQLiteClaimStore:
+        return SQLiteClaimStore(self.path, course_id, timeout=self.timeout)
+
+    def close(self):
+        self._connection.close()
+
+    def _transaction(self):
+        return _Transaction(self._connection, self._lock)
+
+
+class _Transaction:
+    """Serializes a write transaction across threads and, via SQLite, processes"""
+
+    def __init__(self, connection: sqlite3.Connection, lock: threading.Lock):
+        self.connection = connection
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.lock.acquire()
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.lock.release()
+            raise
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+class CourseCoordinator:
+    """Lists a course's content as work items, one per separately loadable item"""
+
+    def __init__(
+        self,
+        canvas_client: CanvasClient,
+        logger: Logger,
+        index_external_urls: bool = False,
+    ):
+        self.canvas_client = canvas_client
+        self.extractor = canvas_client.content_extractor
+        self.logger = logger
+        self.index_external_urls = index_external_urls
+
+    def get_work_items(self) -> list[WorkItem]:
+        items = []
+        # module items that point at content already queued from its own section
+        seen = set()
+        for tab_name in self.canvas_client.get_available_tabs():
+            try:
+                items.extend(self._get_section_items(tab_name, seen))
+            except CanvasException as err:
+                self.logger.logStatement(
+                    message=f"Canvas exception listing {tab_name}: {err}",
+                    level="WARNING",
+                )
+        return items
+
+    def _get_section_items(self, tab_name: str, seen: set) -> Iterator[WorkItem]:
+        if tab_name == "Syllabus":
+            yield WorkItem(key="Syllabus", kind="syllabus")
+        elif tab_name == "Media Gallery":
+            yield WorkItem(key="MediaGallery", kind="media_gallery")
+        elif tab_name == "Announcements":
+            for announcement in self.extractor.get_announcements():
+                yield WorkItem(
+                    key=f"Announcement:{announcement.id}",
+                    kind="announcement",
+                    payload={"topic_id": announcement.id},
+                )
+        elif tab_name == "Pages":
+            for page in self.extractor.get_pages():
+                seen.add(f"PageUrl:{page.url}")
+                yield WorkItem(
+                    key=f"Page:{page.page_id}", kind="page", payload={"url": page.url}
+                )
+        elif tab_name == "Assignments":
+            for assignment in self.extractor.get_assignments():
+                seen.add(f"Assignment:{assignment.id}")
+                yield WorkItem(
+                    key=f"Assignment:{assignment.id}",
+                    kind="assignment",
+                    payload={"assignment_id": assignment.id},
+                )
+        elif tab_name == "Files":
+            for file in self.extractor.get_files():
+                if getattr(file, "content-type", None) not in LOADED_CONTENT_TYPES:
+                    continue
+                seen.add(f"File:{file.id}")
+                yield WorkItem(
+                    key=f"File:{file.id}", kind="file", payload={"file_id": file.id}
+                )
+        elif tab_name == "Modules":
+            for module in self.extractor.get_modules():
+                for item in module.get_module_items():
+                    if work_item := self._get_module_work_item(module, item, seen):
+                        yield work_item
+
+    def _get_module_work_item(self, module, item, seen: set) -> WorkItem | None:
+        if item.type == "Page":
+            content_key = f"PageUrl:{item.page_url}"
+        elif item.type in ("File", "Assignment"):
+            content_key = f"{item.type}:{item.content_id}"
+        elif item.type == "ExternalUrl" and self.index_external_urls:
+            content_key = f"ExtUrl:{item.external_url}"
+        else:
+            return None
+        if content_key in seen:
+            return None
+        seen.add(content_key)
+        return WorkItem(
+            key=f"ModuleItem:{item.id}",
+            kind="module_item",
+            payload={"module_id": module.id, "item_id": item.id},
+        )
+
+
+class QueueWorker:
+    """Claims work items of one course and loads them with the section loaders"""
+
+    def __init__(
+        self,
+        work_queue: WorkQueue,
+        course_id: int,
+        loaders: dict[str, BaseSectionLoader],
+        canvas_client: CanvasClient,
+        claim_store,
+        logger: Logger,
+        worker_id: str | None = None,
+    ):
+        self.work_queue = work_queue
+        self.course_id = course_id
+        self.loaders = loaders
+        self.extractor = canvas_client.rest_extractor
+        self.claim_store = claim_store
+        self.logger = logger
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._modules = {}
+
+    def run(
+        self, max_items: int | None = None, idle_timeout: float | None = None
+    ) -> int:
+        """Loads items until the queue is drained, `max_items` are done, or nothing
+        can be claimed for `idle_timeout` seconds while other workers hold items"""
+        handled = 0
+        idle_since = None
+        while max_items is None or handled < max_items:
+            item = self.work_queue.claim(self.course_id, self.worker_id)
+            if item is None:
+                counts = self.work_queue.counts(self.course_id)
+                if not counts["pending"] and not counts["claimed"]:
+                    break
+                # another worker may die and leave its items to be reclaimed
+                idle_since = idle_since or time.monotonic()
+                if (
+                    idle_timeout is not None
+                    and time.monotonic() - idle_since >= idle_timeout
+                ):
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+            idle_since = None
+            self.handle(item)
+            handled += 1
+        return handled
+
+    def handle(self, item: WorkItem):
+        """Loads one item and reports its documents, or its error, to the queue"""
+        self.logger.logStatement(
+            message=f"Loading work item {item.key} (attempt {item.attempts})",
+            level="DEBUG",
+        )
+        # keys claimed by an earlier attempt of this item can be claimed again
+        self.claim_store.owner = item.key
+        try:
+            section, load_fn = self._get_load(item)
+            loader = self.loaders[section]
+            # the media gallery loader has no per-item timeout of its own
+            if isinstance(loader, BaseSectionLoader):
+                documents = loader._run_item(item.key, load_fn)
+            else:
+                documents = load_fn()
+        except Exception as err:
+            self.logger.logStatement(
+                message=f"Error loading work item {item.key}: {err}", level="WARNING"
+            )
+            self.work_queue.fail(self.course_id, item, str(err))
+            return
+        self.work_queue.complete(self.course_id, item, documents)
+
+    def _get_load(self, item: WorkItem) -> tuple[str, Callable[[], list[Document]]]:
+        """The section loader and single-item load for a work item"""
+        payload = item.payload
+        if item.kind == "syllabus":
+            return "Syllabus", self.loaders["Syllabus"]._load_item
+        if item.kind == "media_gallery":
+            return "Media Gallery", self.loaders["Media Gallery"].load_section
+        if item.kind == "announcement":
+            topic = self.extractor.get_discussion_topic(payload["topic_id"])
+            return "Announcements", lambda: self.loaders["Announcements"]._load_item(
+                topic
+            )
+        if item.kind == "page":
+            page = self.extractor.get_page(payload["url"])
+            return "Pages", lambda: self.loaders["Pages"]._load_item(page)
+        if item.kind == "assignment":
+            assignment = self.extractor.get_assignment(payload["assignment_id"])
+            return "Assignments", lambda: (
+                self.loaders["Assignments"]._load_item(assignment)
+                if self.claim_store.claim(f"Assignment:{assignment.id}")
+                else []
+            )
+        if item.kind == "file":
+            file = self.extractor.get_file(payload["file_id"])
+            return "Files", lambda: self.loaders["Files"]._load_item(file)
+        if item.kind == "module_item":
+            return "Modules", lambda: self._load_module_item(payload)
+        raise ValueError(f"Unknown work item kind {item.kind}")
+
+    def _load_module_item(self, payload: dict) -> list[Document]:
+        module_loader = self.loaders["Modules"]
+        module = self._modules.get(payload["module_id"])
+        if module is None:
+            module = self.extractor.get_module(payload["module_id"])
+            self._modules[payload["module_id"]] = module
+        item = module.get_module_item(payload["item_id"])
+        locked, formatted_datetime = module_loader._get_module_metadata(
+            module.unlock_at
+        )
+        return module_loader._load_module_item(
+            item=item,
+            module_name=module.name,
+            locked=locked,
+            formatted_datetime=formatted_datetime,
+        )
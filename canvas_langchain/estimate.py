@@ -0,0 +1,155 @@
+"""Dry-run cost estimate of a course load.
+
+Walks only the list endpoints a load starts from (tabs, pages, assignments,
+announcements, files and modules with their items) and projects what a full
+`CanvasLoader.load` would fetch, without downloading or parsing any file.
+"""
+
+from dataclasses import asdict, dataclass, field
+
+from canvas_langchain.client import CanvasClient
+from canvas_langchain.sections.files import LOADED_CONTENT_TYPES
+from canvas_langchain.utils.embedded_media import count_embedded_media
+from canvas_langchain.utils.logging import Logger
+from canvasapi.exceptions import CanvasException
+
+# module items that a full load fetches again by id
+MODULE_ITEM_FETCHES = {"Page", "File", "Assignment"}
+
+
+@dataclass
+class CourseEstimate:
+    course_id: int
+    item_counts: dict[str, int] = field(default_factory=dict)
+    bytes_by_content_type: dict[str, int] = field(default_factory=dict)
+    files_by_content_type: dict[str, int] = field(default_factory=dict)
+    download_bytes: int = 0
+    downloads: int = 0
+    # module files missing from the file list, so their size is unknown
+    unsized_downloads: int = 0
+    embedded_media: int = 0
+    media_gallery: bool = False
+    api_calls: int = 0
+    estimate_api_calls: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class CourseEstimator:
+    def __init__(self, canvas_client: CanvasClient, logger: Logger):
+        self.canvas_client = canvas_client
+        self.extractor = canvas_client.rest_extractor
+        self.logger = logger
+
+    def estimate(self) -> CourseEstimate:
+        """Lists the course's content and projects the cost of loading it"""
+        estimate = CourseEstimate(course_id=self.extractor.get_course_id())
+        requests_made = []
+
+        def count_request(response, *args, **kwargs):
+            requests_made.append(response.url)
+
+        session = self.canvas_client.get_session()
+        session.hooks["response"].append(count_request)
+        try:
+            tabs = self.canvas_client.get_available_tabs()
+            self._estimate_sections(estimate, tabs)
+        finally:
+            session.hooks["response"].remove(count_request)
+
+        # a full load repeats every list request made here
+        estimate.estimate_api_calls = len(requests_made)
+        estimate.api_calls += len(requests_made)
+        if estimate.embedded_media or estimate.media_gallery:
+            # the current user's id, for caption access
+            estimate.api_calls += 1
+        return estimate
+
+    def _estimate_sections(self, estimate: CourseEstimate, tabs: list[str]):
+        file_ids = set()
+        if "Syllabus" in tabs:
+            syllabus = self.extractor.get_syllabus()
+            estimate.item_counts["Syllabus"] = 1 if syllabus else 0
+            self._count_media(estimate, syllabus)
+        if "Announcements" in tabs:
+            self._estimate_html_items(
+                estimate,
+                "Announcements",
+                self.extractor.get_announcements,
+                lambda item: item.message,
+            )
+        if "Pages" in tabs:
+            self._estimate_html_items(
+                estimate, "Pages", self.extractor.get_pages, lambda item: item.body
+            )
+        if "Assignments" in tabs:
+            self._estimate_html_items(
+                estimate,
+                "Assignments",
+                self.extractor.get_assignments,
+                lambda item: item.description,
+            )
+        if "Files" in tabs:
+            file_ids = self._estimate_files(estimate)
+        if "Modules" in tabs:
+            self._estimate_modules(estimate, file_ids)
+        estimate.media_gallery = "Media Gallery" in tabs
+
+    def _estimate_html_items(self, estimate, section: str, list_fn, get_html):
+        count = 0
+        try:
+            for item in list_fn():
+                count += 1
+                self._count_media(estimate, get_html(item))
+        except CanvasException as err:
+            self.logger.logStatement(
+                message=f"Canvas exception listing {section}: {err}", level="WARNING"
+            )
+        estimate.item_counts[section] = count
+
+    def _estimate_files(self, estimate: CourseEstimate) -> set:
+        file_ids = set()
+        try:
+            for file in self.extractor.get_files():
+                file_ids.add(file.id)
+                content_type = getattr(file, "content-type", None) or "unknown"
+                size = getattr(file, "size", 0) or 0
+                estimate.bytes_by_content_type[content_type] = (
+                    estimate.bytes_by_content_type.get(content_type, 0) + size
+                )
+                estimate.files_by_content_type[content_type] = (
+                    estimate.files_by_content_type.get(content_type, 0) + 1
+                )
+                if content_type in LOADED_CONTENT_TYPES:
+                    estimate.downloads += 1
+                    estimate.download_bytes += size
+        except CanvasException as err:
+            self.logger.logStatement(
+                message=f"Canvas exception listing files: {err}", level="WARNING"
+            )
+        estimate.item_counts["Files"] = len(file_ids)
+        return file_ids
+
+    def _estimate_modules(self, estimate: CourseEstimate, file_ids: set):
+        modules = module_items = 0
+        try:
+            for module in self.extractor.get_modules():
+                modules += 1
+                for item in module.get_module_items():
+                    module_items += 1
+                    if item.type in MODULE_ITEM_FETCHES:
+                        estimate.api_calls += 1
+                    if item.type == "File" and item.content_id not in file_ids:
+                        estimate.unsized_downloads += 1
+        except CanvasException as err:
+            self.logger.logStatement(
+                message=f"Canvas exception listing modules: {err}", level="WARNING"
+            )
+        estimate.item_counts["Modules"] = modules
+        estimate.item_counts["Module items"] = module_items
+
+    def _count_media(self, estimate: CourseEstimate, html: str | None):
+        media, lookups = count_embedded_media(html)
+        estimate.embedded_media += media
+        estimate.api_calls += lookups
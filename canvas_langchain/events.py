@@ -0,0 +1,299 @@
+"""Incremental re-indexing driven by Canvas change events.
+
+Events (Canvas Live Events, or anything shaped like them) are read from a
+pluggable `EventSource`. Each one is mapped to the matching section loader's
+single-item path, and only the affected documents are emitted, together with
+the `doc_id` prefixes they replace.
+"""
+
+import json
+import os
+import queue
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from canvas_langchain.base import BaseSectionLoader
+from canvas_langchain.client_getters import CanvasClientGetters
+from canvas_langchain.utils.logging import Logger
+from canvasapi.exceptions import ResourceDoesNotExist
+from langchain.docstore.document import Document
+
+PAGE_EVENTS = {"wiki_page_created", "wiki_page_updated", "wiki_page_deleted"}
+ASSIGNMENT_EVENTS = {"assignment_created", "assignment_updated"}
+FILE_EVENTS = {"attachment_created", "attachment_updated", "attachment_deleted"}
+ANNOUNCEMENT_EVENTS = {"discussion_topic_created", "discussion_topic_updated"}
+SYLLABUS_EVENTS = {"syllabus_updated"}
+FILE_POLL_SECONDS = 0.5
+
+
+@dataclass
+class CanvasEvent:
+    event_name: str
+    body: dict
+    course_id: str | None = None
+
+    @classmethod
+    def from_message(cls, message: dict) -> "CanvasEvent":
+        """Parses a Live Events envelope (`metadata` + `body`) or a flat event dict"""
+        metadata = message.get("metadata", {})
+        course_id = (
+            metadata["context_id"]
+            if metadata.get("context_type") == "Course" and metadata.get("context_id")
+            else message.get("course_id")
+        )
+        return cls(
+            event_name=metadata.get("event_name") or message["event_name"],
+            body=message.get("body", {}),
+            course_id=str(course_id) if course_id is not None else None,
+        )
+
+
+@dataclass
+class IndexUpdate:
+    """Documents to upsert, replacing every stored document whose id starts with a
+    prefix, and every media caption whose `embedded_in` names a replaced item"""
+
+    event: CanvasEvent
+    deleted_id_prefixes: list[str] = field(default_factory=list)
+    deleted_embedded_in: list[str] = field(default_factory=list)
+    documents: list[Document] = field(default_factory=list)
+
+
+class EventSource(ABC):
+    """A queue of Canvas change events"""
+
+    @abstractmethod
+    def get(self, timeout: float | None = None) -> CanvasEvent | None:
+        """Returns the next event, or None if none arrives within `timeout` seconds"""
+        pass
+
+    def ack(self, event: CanvasEvent):
+        """Marks an event as processed"""
+        pass
+
+    def nack(self, event: CanvasEvent):
+        """Returns an event that failed to process, so it is delivered again"""
+        pass
+
+
+class InMemoryEventSource(EventSource):
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, event: CanvasEvent | dict):
+        if isinstance(event, dict):
+            event = CanvasEvent.from_message(event)
+        self._queue.put(event)
+
+    def get(self, timeout: float | None = None) -> CanvasEvent | None:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def nack(self, event: CanvasEvent):
+        self._queue.put(event)
+
+
+class FileEventSource(EventSource):
+    """Reads events from a JSON Lines file, remembering its read offset across restarts"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset_path = f"{path}.offset"
+        self._offset = 0
+        if os.path.exists(self.offset_path):
+            with open(self.offset_path) as offset_file:
+                self._offset = int(offset_file.read() or 0)
+        self._pending_offset = self._offset
+
+    def get(self, timeout: float | None = None) -> CanvasEvent | None:
+        """Polls the file for the next complete line"""
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        while True:
+            line = self._read_line()
+            if line is not None and line.strip():
+                return CanvasEvent.from_message(json.loads(line))
+            if line is None:
+                if give_up_at is not None and time.monotonic() >= give_up_at:
+                    return None
+                time.sleep(FILE_POLL_SECONDS)
+
+    def _read_line(self) -> bytes | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as event_file:
+            event_file.seek(self._pending_offset)
+            line = event_file.readline()
+        # ignore a partially written last line until it is complete
+        if not line.endswith(b"\n"):
+            return None
+        self._pending_offset += len(line)
+        return line
+
+    def ack(self, event: CanvasEvent):
+        self._offset = self._pending_offset
+        temp_path = f"{self.offset_path}.tmp"
+        with open(temp_path, "w") as offset_file:
+            offset_file.write(str(self._offset))
+        os.replace(temp_path, self.offset_path)
+
+    def nack(self, event: CanvasEvent):
+        # read again from the last acknowledged event
+        self._pending_offset = self._offset
+
+
+class CanvasEventProcessor:
+    """Maps change events to single-item loads on the section loaders"""
+
+    def __init__(
+        self,
+        loaders: dict[str, BaseSectionLoader],
+        canvas_client_extractor: CanvasClientGetters,
+        indexed_items: set,
+        logger: Logger,
+    ):
+        self.loaders = loaders
+        self.canvas_client_extractor = canvas_client_extractor
+        self.indexed_items = indexed_items
+        self.logger = logger
+
+    def run(
+        self,
+        source: EventSource,
+        max_events: int | None = None,
+        idle_timeout: float | None = None,
+    ) -> Iterator[IndexUpdate]:
+        """Processes events until `max_events` are handled or none arrive for `idle_timeout`.
+
+        An event is acknowledged only once its update has been consumed. If handling
+        it raises, e.g. on a network error, it is returned to `source` and the error
+        re-raised, so the change is not lost.
+        """
+        handled = 0
+        while max_events is None or handled < max_events:
+            event = source.get(timeout=idle_timeout)
+            if event is None:
+                return
+            try:
+                update = self.handle(event)
+            except Exception:
+                source.nack(event)
+                raise
+            if update is not None:
+                yield update
+            source.ack(event)
+            handled += 1
+
+    def handle(self, event: CanvasEvent) -> IndexUpdate | None:
+        """Loads or deletes the item an event refers to"""
+        course_id = str(self.canvas_client_extractor.get_course_id())
+        if event.course_id is not None and event.course_id != course_id:
+            return None
+        self.logger.logStatement(
+            message=f"Handling Canvas event {event.event_name}", level="DEBUG"
+        )
+        body = event.body
+        try:
+            if event.event_name in PAGE_EVENTS:
+                return self._reload(
+                    event,
+                    kind="page",
+                    item_id=body["wiki_page_id"],
+                    key=f"Page:{body['wiki_page_id']}",
+                    load_fn=lambda: self._load_page(body["wiki_page_id"]),
+                )
+            if event.event_name in ASSIGNMENT_EVENTS:
+                return self._reload(
+                    event,
+                    kind="assignment",
+                    item_id=body["assignment_id"],
+                    key=f"Assignment:{body['assignment_id']}",
+                    load_fn=lambda: self.loaders["Assignments"]._load_item(
+                        self.canvas_client_extractor.get_assignment(
+                            body["assignment_id"]
+                        )
+                    ),
+                )
+            if event.event_name in FILE_EVENTS:
+                return self._reload(
+                    event,
+                    kind="file",
+                    item_id=body["attachment_id"],
+                    key=f"File:{body['attachment_id']}",
+                    load_fn=lambda: self.loaders["Files"]._load_item(
+                        self.canvas_client_extractor.get_file(body["attachment_id"])
+                    ),
+                )
+            if event.event_name in ANNOUNCEMENT_EVENTS and body.get("is_announcement"):
+                return self._reload(
+                    event,
+                    kind="announcement",
+                    item_id=body["discussion_topic_id"],
+                    key=f"Announcement:{body['discussion_topic_id']}",
+                    load_fn=lambda: self.loaders["Announcements"]._load_item(
+                        self.canvas_client_extractor.get_discussion_topic(
+                            body["discussion_topic_id"]
+                        )
+                    ),
+                )
+            if event.event_name in SYLLABUS_EVENTS:
+                return self._reload(
+                    event,
+                    kind="syllabus",
+                    item_id=course_id,
+                    key="Syllabus",
+                    load_fn=self._load_syllabus,
+                )
+        except KeyError as err:
+            # retrying a malformed event cannot help
+            self.logger.logStatement(
+                message=f"Canvas event {event.event_name} is missing {err}",
+                level="WARNING",
+            )
+        except Exception as err:
+            self.logger.logStatement(
+                message=f"Error handling Canvas event {event.event_name}: {err}",
+                level="WARNING",
+            )
+            raise
+        return None
+
+    def _load_page(self, page_id) -> list[Document]:
+        """Loads a page by id; unpublished pages only have their documents deleted"""
+        page = self.canvas_client_extractor.get_page(page_id)
+        if not getattr(page, "published", True):
+            return []
+        return self.loaders["Pages"]._load_item(page)
+
+    def _load_syllabus(self) -> list[Document]:
+        loader = self.loaders["Syllabus"]
+        # refresh the getters the loader reads, which may be the GraphQL ones
+        loader.canvas_client_extractor.refresh_course()
+        return loader._load_item()
+
+    def _reload(
+        self, event: CanvasEvent, kind: str, item_id, key: str, load_fn
+    ) -> IndexUpdate:
+        """Replaces all documents of one item, or only deletes them for delete events
+        and items that no longer exist"""
+        update = IndexUpdate(
+            event=event,
+            deleted_id_prefixes=[f"{kind}:{item_id}:"],
+            deleted_embedded_in=[key],
+        )
+        # the item and the media it embeds may have been indexed earlier in this process
+        self.indexed_items.discard(key)
+        for media_key in [k for k in self.indexed_items if k.startswith("MiVideo:")]:
+            self.indexed_items.discard(media_key)
+        if not event.event_name.endswith("_deleted"):
+            try:
+                update.documents = load_fn()
+            except ResourceDoesNotExist:
+                self.logger.logStatement(
+                    message=f"{key} no longer exists; deleting its documents",
+                    level="DEBUG",
+                )
+        return update
@@ -12,11 +12,13 @@ class AnnouncementLoader(BaseSectionLoader):
         announcement_documents = []
         try:
             announcements = self.canvas_client_extractor.get_announcements()
+            if self.scheduler:
+                announcements = self.scheduler.order_announcements(announcements)
 
-            for announcement in announcements:
-                announcement_documents.extend(
-                    self._load_item(announcement=announcement)
-                )
+            for item_documents in self._load_items(
+                announcements, get_key=lambda item: f"Announcement:{item.id}"
+            ):
+                announcement_documents.extend(item_documents)
 
         except CanvasException as error:
             self.logger.logStatement(
@@ -15,10 +15,11 @@ class AssignmentLoader(BaseSectionLoader):
         assignment_documents = []
         try:
             assignments = self.canvas_client_extractor.get_assignments()
-            for assignment in assignments:
-                if f"Assignment:{assignment.id}" not in self.indexed_items:
-                    self.indexed_items.add(f"Assignment:{assignment.id}")
-                    assignment_documents.extend(self._load_item(assignment, None))
+            for item_documents in self._load_items(
+                self._unindexed(assignments),
+                get_key=lambda item: f"Assignment:{item.id}",
+            ):
+                assignment_documents.extend(item_documents)
 
         except CanvasException as error:
             self.logger.logStatement(
@@ -27,8 +28,14 @@ class AssignmentLoader(BaseSectionLoader):
 
         return assignment_documents
 
+    def _unindexed(self, assignments):
+        """Yields assignments not yet indexed, marking each as indexed"""
+        for assignment in assignments:
+            if self.indexed_items.claim(f"Assignment:{assignment.id}"):
+                yield assignment
+
     def _load_item(
-        self, assignment: Assignment, description: str | None
+        self, assignment: Assignment, description: str | None = None
     ) -> list[Document]:
         """Load and format one assignment"""
         assignment_description = ""
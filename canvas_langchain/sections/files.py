@@ -1,33 +1,80 @@
 import tempfile
-from io import BytesIO
 from urllib.parse import urljoin
 
 from canvas_langchain.base import BaseSectionLoader, BaseSectionLoaderVars
+from canvas_langchain.utils.document_ids import assign_document_ids
+from canvas_langchain.utils.office_pool import OfficeProcessPool
+from canvas_langchain.utils.pdf_backends import EncryptedPdfError, get_pdf_backend
+from canvas_langchain.utils.pdf_probe import (
+    ENCRYPTED,
+    IMAGE_ONLY,
+    SKIPPED_VERDICTS,
+    TEXT,
+    PdfProbe,
+)
+from canvas_langchain.utils.tabular import TabularExtractor
 from canvasapi.exceptions import CanvasException, ResourceDoesNotExist
 from canvasapi.file import File
 from langchain.docstore.document import Document
 from langchain_community.document_loaders import (
-    CSVLoader,
     Docx2txtLoader,
-    UnstructuredExcelLoader,
     UnstructuredMarkdownLoader,
     UnstructuredPowerPointLoader,
 )
-from PyPDF2 import PdfReader, errors
+
+GENERAL_FILE_TYPES = {
+    "text/md": "md",
+    "text/csv": "csv",
+    "application/vnd.ms-excel": "excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "excel",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": "pptx",
+}
+# every content type FileLoader downloads and extracts
+LOADED_CONTENT_TYPES = {
+    "text/plain",
+    "text/rtf",
+    "text/html",
+    "application/pdf",
+    *GENERAL_FILE_TYPES,
+}
 
 
 class FileLoader(BaseSectionLoader):
-    def __init__(self, baseSectionVars: BaseSectionLoaderVars, course_api: str):
+    def __init__(
+        self,
+        baseSectionVars: BaseSectionLoaderVars,
+        course_api: str,
+        office_pool: OfficeProcessPool | None = None,
+        pdf_probe: PdfProbe | None = None,
+    ):
         super().__init__(baseSectionVars)
         self.course_api = course_api
-        self.type_match = {
-            "text/md": "md",
-            "text/csv": "csv",
-            "application/vnd.ms-excel": "excel",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "excel",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
-            "application/vnd.openxmlformats-officedocument.presentationml.presentation": "pptx",
-        }
+        self.office_pool = office_pool
+        self.pdf_probe = pdf_probe
+        self.extract_pdf_pages = get_pdf_backend()
+        self.tabular_extractor = TabularExtractor.from_settings()
+        self.type_match = GENERAL_FILE_TYPES
+        self._listed_files = None
+
+    def plan_downloads(self):
+        """Lets the content budget choose the files to download before any section
+        loads, as modules may reach files before the Files section does"""
+        try:
+            self._listed_files = list(self.canvas_client_extractor.get_files())
+        except CanvasException as error:
+            self.logger.logStatement(
+                message=f"Canvas exception listing files for the budget {error}",
+                level="WARNING",
+            )
+            return
+        self.content_budget.plan_downloads(
+            {
+                f"File:{file.id}": file
+                for file in self._listed_files
+                if getattr(file, "content-type", None) in LOADED_CONTENT_TYPES
+            }
+        )
 
     def load_section(self) -> list[Document]:
         """Loads and formats all files from Canvas course"""
@@ -35,9 +82,13 @@ class FileLoader(BaseSectionLoader):
 
         file_documents = []
         try:
-            files = self.canvas_client_extractor.get_files()
-            for file in files:
-                file_documents.extend(self._load_item(file))
+            files = self._listed_files or self.canvas_client_extractor.get_files()
+            if self.content_budget:
+                files = self.content_budget.order_files(list(files))
+            for item_documents in self._load_items(
+                self._defer_large_files(files), get_key=lambda item: f"File:{item.id}"
+            ):
+                file_documents.extend(item_documents)
 
         except CanvasException as error:
             self.logger.logStatement(
@@ -45,16 +96,46 @@ class FileLoader(BaseSectionLoader):
             )
         return file_documents
 
+    def _defer_large_files(self, files):
+        """Yields files cheap enough to load now, deferring large ones"""
+        for file in files:
+            if not self._defer_if_large(file):
+                yield file
+
+    def _defer_if_large(self, file: File) -> bool:
+        """Moves a large file to the scheduler's expensive lane, sized by file size"""
+        size = getattr(file, "size", 0)
+        if self.scheduler is None or not self.scheduler.is_expensive(size):
+            return False
+        key = f"File:{file.id}"
+        self.scheduler.defer(
+            key=key,
+            cost=size,
+            load_fn=lambda: self._finish_item(key, self._load_item(file)),
+        )
+        return True
+
     def _load_item(self, file: File) -> list[Document]:
         """Loads given file based on extension"""
-        if f"File:{file.id}" not in self.indexed_items:
-            self.indexed_items.add(f"File:{file.id}")
+        if self.indexed_items.claim(f"File:{file.id}"):
             try:
                 content_type = getattr(file, "content-type")
                 self.logger.logStatement(
                     message=f"Loading file: {file.filename}", level="DEBUG"
                 )
 
+                if content_type == "application/pdf" and self._skip_probed_pdf(file):
+                    return []
+
+                if (
+                    content_type in LOADED_CONTENT_TYPES
+                    and self.content_budget
+                    and not self.content_budget.take_download(
+                        f"File:{file.id}", getattr(file, "size", 0) or 0
+                    )
+                ):
+                    return []
+
                 if content_type in ["text/plain", "text/rtf"]:
                     return self._load_rtf_or_text_file(file)
                 elif content_type == "text/html":
@@ -84,11 +165,14 @@ class FileLoader(BaseSectionLoader):
             message=f"Loading file {item.content_id} from module.", level="DEBUG"
         )
         file = self.canvas_client_extractor.get_file(file_id=item.content_id)
+        if self._defer_if_large(file):
+            return []
         return self._load_item(file)
 
     def _load_rtf_or_text_file(self, file: File) -> list[Document]:
         """Loads and formats text and rtf file data"""
-        file_contents = file.get_contents(binary=False)
+        with self._span("download", "download"):
+            file_contents = file.get_contents(binary=False)
         metadata = {
             "content": file_contents,
             "data": {
@@ -102,7 +186,8 @@ class FileLoader(BaseSectionLoader):
 
     def _load_html_file(self, file: File) -> list[Document]:
         """Loads and formats html file data"""
-        file_contents = file.get_contents(binary=False)
+        with self._span("download", "download"):
+            file_contents = file.get_contents(binary=False)
         file_text, embed_urls = self.parse_html(html=file_contents)
         metadata = {
             "content": file_text,
@@ -115,38 +200,76 @@ class FileLoader(BaseSectionLoader):
         }
         return self.process_data(metadata=metadata, embed_urls=embed_urls)
 
+    def _skip_probed_pdf(self, file: File) -> bool:
+        """Skips a pdf that is known or probed to be encrypted or image-only"""
+        if self.pdf_probe is None:
+            return False
+        with self._span("probe_pdf", "download"):
+            verdict = self.pdf_probe.probe(file)
+        if verdict not in SKIPPED_VERDICTS:
+            return False
+        if verdict == ENCRYPTED:
+            self.logger.logStatement(
+                message=f"Error: pdf {file.filename} is encrypted.", level="WARNING"
+            )
+        else:
+            self.logger.logStatement(
+                message=f"Skipping pdf {file.filename}: no extractable text.",
+                level="DEBUG",
+            )
+        return True
+
     def _load_pdf_file(self, file: File) -> list[Document]:
         """Loads given pdf file by page"""
-        file_contents = file.get_contents(binary=True)
+        with self._span("download", "download"):
+            file_contents = file.get_contents(binary=True)
         docs = []
+        verdict = IMAGE_ONLY
+        # one source string shared by the metadata of every page
+        source = urljoin(self.course_api, f"files/{file.id}")
         try:
-            pdf_reader = PdfReader(BytesIO(file_contents))
             # extract info by page
-            for i, page in enumerate(pdf_reader.pages):
-                metadata = {
-                    "content": page.extract_text(),
-                    "data": {
-                        "filename": file.filename,
-                        "source": urljoin(self.course_api, f"files/{file.id}"),
-                        "kind": "file",
-                        "page": i + 1,
-                    },
-                }
-                docs.extend(self.process_data(metadata=metadata))
-        except errors.FileNotDecryptedError:
+            with self._span("extract_pdf", "parse"):
+                for i, page_text in enumerate(self.extract_pdf_pages(file_contents)):
+                    if page_text and page_text.strip():
+                        verdict = TEXT
+                    if self.content_budget and not self.content_budget.take_pdf_page(
+                        f"File:{file.id}", page_number=i + 1
+                    ):
+                        # a partly read file says nothing about the rest
+                        verdict = None
+                        break
+                    metadata = {
+                        "content": page_text,
+                        "data": {
+                            "filename": file.filename,
+                            "source": source,
+                            "kind": "file",
+                            "id": file.id,
+                            "page": i + 1,
+                        },
+                    }
+                    docs.extend(self.process_data(metadata=metadata))
+        except EncryptedPdfError:
+            verdict = ENCRYPTED
             self.logger.logStatement(
                 message=f"Error: pdf {file.filename} is encrypted.", level="WARNING"
             )
         except Exception as err:
+            verdict = None
             self.logger.logStatement(
                 message=f"Error loading pdf {file.filename}. Err: {err}",
                 level="WARNING",
             )
+        # remembered, so later loads skip encrypted and image-only files unread
+        if self.pdf_probe and verdict:
+            self.pdf_probe.record(file, verdict)
         return docs
 
     def _load_file_general(self, file: File, file_type: str) -> list[Document]:
-        """Loads docx, excel, pptx, and md files"""
-        file_contents = file.get_contents(binary=True)
+        """Loads docx, csv, excel, pptx, and md files"""
+        with self._span("download", "download"):
+            file_contents = file.get_contents(binary=True)
         docs = []
         try:
             with tempfile.TemporaryDirectory() as temp_dir:
@@ -156,29 +279,46 @@ class FileLoader(BaseSectionLoader):
                     # Write bytes to file
                     binary_file.write(file_contents)
 
-                match file_type:
-                    case "csv":
-                        loader = CSVLoader(file_path)
-                    case "excel":
-                        loader = UnstructuredExcelLoader(file_path)
-                    case "docx":
-                        loader = Docx2txtLoader(file_path)
-                    case "md":
-                        loader = UnstructuredMarkdownLoader(file_path)
-                    case "pptx":
-                        loader = UnstructuredPowerPointLoader(file_path)
-                if loader:
-                    docs = loader.load()
-                    for i, _ in enumerate(docs):
-                        docs[i].page_content = self._remove_null_bytes(
-                            docs[i].page_content
-                        )
-                        docs[i].metadata["filename"] = file.filename
-                        docs[i].metadata["source"] = urljoin(
-                            self.course_api, f"files/{file.id}"
-                        )
-        except Exception:
+                with self._span(f"parse_{file_type}", "parse"):
+                    if file_type in ("csv", "excel"):
+                        docs = self._load_tabular(file_type, file_path)
+                    elif self.office_pool and self.office_pool.handles(file_type):
+                        # CPU-heavy Unstructured parsing runs in a worker process
+                        docs = self.office_pool.parse(file_type, file_path)
+                    elif loader := self._get_file_loader(file_type, file_path):
+                        docs = loader.load()
+                for i, _ in enumerate(docs):
+                    docs[i].page_content = self.normalize_text(docs[i].page_content)
+                    docs[i].metadata["filename"] = file.filename
+                    docs[i].metadata["source"] = urljoin(
+                        self.course_api, f"files/{file.id}"
+                    )
+                assign_document_ids(docs, kind="file", item_id=file.id)
+        except Exception as err:
             self.logger.logStatement(
-                message=f"Error loading {file.filename}", level="WARNING"
+                message=f"Error loading {file.filename}: {err}", level="WARNING"
             )
         return docs
+
+    def _load_tabular(self, file_type: str, file_path: str) -> list[Document]:
+        """Streams a csv or spreadsheet into documents of a fixed number of rows"""
+        docs = []
+        for chunk in self.tabular_extractor.extract(file_path, file_type):
+            metadata = {"first_row": chunk.first_row, "last_row": chunk.last_row}
+            # csv files have no sheets
+            if chunk.sheet is not None:
+                metadata["sheet"] = chunk.sheet
+            docs.append(Document(page_content=chunk.text, metadata=metadata))
+        return docs
+
+    def _get_file_loader(self, file_type: str, file_path: str):
+        """Returns the in-process loader for a general file type"""
+        loader = None
+        match file_type:
+            case "docx":
+                loader = Docx2txtLoader(file_path)
+            case "md":
+                loader = UnstructuredMarkdownLoader(file_path)
+            case "pptx":
+                loader = UnstructuredPowerPointLoader(file_path)
+        return loader
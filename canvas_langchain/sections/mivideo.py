@@ -1,8 +1,10 @@
+from contextlib import nullcontext
 from typing import List
 
+from canvas_langchain.utils.document_ids import get_document_id, set_document_id
+from canvas_langchain.utils.mivideo_client import MiVideoClientPool, get_client_pool
 from langchain.docstore.document import Document
 from LangChainKaltura.KalturaCaptionLoader import KalturaCaptionLoader
-from LangChainKaltura.MiVideoAPI import MiVideoAPI
 from requests import HTTPError
 
 # compatible with isolated and integrated testing
@@ -14,17 +16,34 @@ except ImportError:
 
 
 class MiVideoLoader:
-    def __init__(self, canvas_content_extractor, indexed_items, logger):
+    def __init__(
+        self,
+        canvas_content_extractor,
+        indexed_items,
+        logger,
+        deadline=None,
+        profiler=None,
+        client_pool: MiVideoClientPool | None = None,
+        content_budget=None,
+    ):
         self.canvas_content_extractor = canvas_content_extractor
         self.indexed_items = indexed_items
         self.logger = logger
+        self.deadline = deadline
+        self.profiler = profiler
+        self.content_budget = content_budget
         self.caption_loader = None
-        self.mivideo_api = MiVideoAPI(
-            host=settings.MIVIDEO_API_HOST,
-            authId=settings.MIVIDEO_API_AUTH_ID,
-            authSecret=settings.MIVIDEO_API_AUTH_SECRET,
+        self._caption_api = None
+        # looked up once, not on every rebuild of the caption loader
+        self._user_id = None
+        # authenticated clients and 401s are shared by every course in the process
+        self.client_pool = client_pool or get_client_pool()
+
+    @property
+    def mivideo_authorized(self) -> bool:
+        return self.client_pool.is_authorized(
+            self.canvas_content_extractor.get_course_id()
         )
-        self.mivideo_authorized = True
 
     def load_section(self, mivideo_id: str | None = None) -> List[Document]:
         """Load MiVideo media captions"""
@@ -38,14 +57,24 @@ class MiVideoLoader:
                 level="INFO",
             )
             return []
-        if not self.caption_loader:
-            self.caption_loader = self._get_caption_loader()
         try:
-            if mivideo_id is None:
+            api = self.client_pool.get_api()
+            if not self.caption_loader or self._caption_api is not api:
+                # rebuilt whenever the pool replaces an expired client
+                self._caption_api = api
+                self.caption_loader = self._get_caption_loader()
+            if mivideo_id is None and self.deadline:
+                # the gallery is one opaque call, bounded only by the overall budget
+                mivideo_documents = self.deadline.run(
+                    "MiVideo:gallery", self._load_gallery, per_item=False
+                )
+            elif mivideo_id is None:
                 mivideo_documents = self._load_gallery()
             else:
                 mivideo_documents = self._load_video(mivideo_id)
 
+            if self.content_budget:
+                mivideo_documents = self._apply_caption_budget(mivideo_documents)
             mivideo_documents = self._format_document_urls(mivideo_documents)
 
         # don't attempt to load MiVideo again if user is unauthorized
@@ -55,7 +84,10 @@ class MiVideoLoader:
                 level="INFO",
             )
             if ex.response.status_code == 401:
-                self.mivideo_authorized = False
+                self.client_pool.mark_unauthorized(
+                    self.canvas_content_extractor.get_course_id()
+                )
+                self.caption_loader = None
                 self.logger.logStatement(
                     message="MiVideo caption request unauthorized. Skipping subsequent requests.",
                     level="INFO",
@@ -67,64 +99,108 @@ class MiVideoLoader:
 
         return mivideo_documents
 
-    def _get_caption_loader(self) -> KalturaCaptionLoader:
+    def _get_caption_loader(self) -> KalturaCaptionLoader | None:
         try:
-            languages = KalturaCaptionLoader.LANGUAGES_DEFAULT
-            caption_loader = KalturaCaptionLoader(
-                apiClient=self.mivideo_api,
-                courseId=str(int(self.canvas_content_extractor.get_course_id())),
-                userId=str(
-                    int(
-                        getattr(
-                            settings,
-                            "MIVIDEO_CANVAS_USER_ID_OVERRIDE_DEV_ONLY",
-                            self.canvas_content_extractor.get_user_id(),
-                        )
-                    )
-                ),
-                languages=languages,
-                urlTemplate=getattr(settings, "MIVIDEO_SOURCE_URL_TEMPLATE"),
-                chunkSeconds=int(
-                    getattr(
-                        settings,
-                        "MIVIDEO_CHUNK_SECONDS",
-                        KalturaCaptionLoader.CHUNK_SECONDS_DEFAULT,
-                    )
-                ),
+            return self.client_pool.get_caption_loader(
+                course_id=self.canvas_content_extractor.get_course_id(),
+                user_id=self._get_user_id(),
             )
         except Exception as e:
             self.logger.logStatement(
                 message=f"Error initializing Kaltura Caption Loader: {e}",
                 level="WARNING",
             )
-        return caption_loader
+            return None
+
+    def _get_user_id(self) -> int:
+        if self._user_id is None:
+            self._user_id = getattr(
+                settings, "MIVIDEO_CANVAS_USER_ID_OVERRIDE_DEV_ONLY", None
+            )
+        if self._user_id is None:
+            self._user_id = self.canvas_content_extractor.get_user_id()
+        return self._user_id
 
     def _load_gallery(self) -> List[Document]:
         """Load all media in the gallery"""
         self.logger.logStatement(
             message="Loading MiVideo Media Gallery\n", level="INFO"
         )
-        return self.caption_loader.load()
+        with self._span("caption_gallery"):
+            docs = self.caption_loader.load()
+        for doc in docs:
+            doc.metadata["embedded_in"] = "MediaGallery"
+        return docs
 
     def _load_video(self, mivideo_id: str) -> List[Document]:
         """Load a single media post by ID if not already indexed"""
-        if f"MiVideo:{mivideo_id}" in self.indexed_items:
+        if not self.indexed_items.claim(f"MiVideo:{mivideo_id}"):
             return []
         self.logger.logStatement(message=f"Loading MiVideo: {mivideo_id}", level="INFO")
-        return self.caption_loader.fetchMediaCaption(
-            {"id": mivideo_id, "name": "unidentified embedded media"}
+        try:
+            with self._span(f"caption:{mivideo_id}"):
+                return self.caption_loader.fetchMediaCaption(
+                    {"id": mivideo_id, "name": "unidentified embedded media"}
+                )
+        except Exception:
+            self.indexed_items.release(f"MiVideo:{mivideo_id}")
+            raise
+
+    def _apply_caption_budget(self, docs: List[Document]) -> List[Document]:
+        """Drops caption chunks past the per-media or course caption minutes"""
+        chunk_minutes = (
+            int(
+                getattr(
+                    settings,
+                    "MIVIDEO_CHUNK_SECONDS",
+                    KalturaCaptionLoader.CHUNK_SECONDS_DEFAULT,
+                )
+            )
+            / 60
         )
+        chunk_counts = {}
+        kept = []
+        for doc in docs:
+            media_id = doc.metadata["media_id"]
+            chunk_counts[media_id] = chunk_counts.get(media_id, 0) + 1
+            if self.content_budget.take_caption_minutes(
+                f"MiVideo:{media_id}",
+                minutes=chunk_minutes,
+                item_minutes=chunk_counts[media_id] * chunk_minutes,
+            ):
+                kept.append(doc)
+        return kept
+
+    def _span(self, name: str):
+        """Times a caption fetch when profiling is enabled"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name, "caption")
 
     def _format_document_urls(
         self, mivideo_docuements: List[Document]
     ) -> List[Document]:
         course_url_template = settings.CANVAS_COURSE_URL_TEMPLATE
+        # formatted once and shared by every chunk of every video
+        course_context = (
+            course_url_template.format(
+                courseId=self.canvas_content_extractor.get_course_id()
+            )
+            if course_url_template
+            else None
+        )
+        chunk_counts = {}
         for doc in mivideo_docuements:
             # add formatted course source url for this video
-            if course_url_template:
-                doc.metadata["course_context"] = course_url_template.format(
-                    courseId=self.canvas_content_extractor.get_course_id()
-                )
+            if course_context:
+                doc.metadata["course_context"] = course_context
+
+            media_id = doc.metadata["media_id"]
+            if media_id not in chunk_counts:
+                self.indexed_items.add("MiVideo:" + media_id)
 
-            self.indexed_items.add("MiVideo:" + doc.metadata["media_id"])
+            # caption chunks are numbered per media entry, in load order
+            chunk_index = chunk_counts.get(media_id, 0)
+            chunk_counts[media_id] = chunk_index + 1
+            set_document_id(doc, get_document_id("mivideo", media_id, chunk_index))
         return mivideo_docuements
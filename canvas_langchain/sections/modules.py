@@ -1,6 +1,9 @@
 from datetime import datetime, timezone
+from functools import partial
 
 from canvas_langchain.base import BaseSectionLoader, BaseSectionLoaderVars
+from canvas_langchain.sinks import SinkError
+from canvas_langchain.utils.document_ids import assign_document_ids
 from canvasapi.exceptions import CanvasException
 from canvasapi.module import ModuleItem
 from langchain.docstore.document import Document
@@ -24,8 +27,16 @@ class ModuleLoader(BaseSectionLoader):
         module_documents = []
         try:
             modules = self.canvas_client_extractor.get_modules()
-            for module in modules:
-                module_documents.extend(self._load_item(module))
+            # module items are timed, run concurrently and checkpointed, so modules
+            # themselves are not; sequential modules keep streamed documents in order
+            for item_documents in self._load_items(
+                modules,
+                get_key=lambda item: f"Module:{item.id}",
+                per_item_timeout=False,
+                max_workers=1,
+                checkpoint_items=False,
+            ):
+                module_documents.extend(item_documents)
 
         except CanvasException as ex:
             self.logger.logStatement(
@@ -41,23 +52,28 @@ class ModuleLoader(BaseSectionLoader):
         module_items = module.get_module_items()
         module_docs = []
         try:
-            for item in module_items:
-                if item.type in ["Page", "File", "Assignment"]:
-                    module_docs.extend(
-                        self.loaders[f"{item.type}s"].load_from_module(
-                            item=item,
-                            module_name=module.name,
-                            locked=locked,
-                            formatted_datetime=formatted_datetime,
-                        )
-                    )
-                elif item.type == "ExternalUrl" and self.index_external_urls:
-                    module_docs.extend(self._load_external_url(item))
+            item_loads = (
+                (
+                    f"ModuleItem:{item.id}",
+                    partial(
+                        self._load_module_item,
+                        item=item,
+                        module_name=module.name,
+                        locked=locked,
+                        formatted_datetime=formatted_datetime,
+                    ),
+                )
+                for item in module_items
+            )
+            for item_documents in self._run_items(item_loads):
+                module_docs.extend(item_documents)
         except CanvasException as ex:
             self.logger.logStatement(
                 message=f"Canvas exception loading module items. Error: {ex}",
                 level="WARNING",
             )
+        except SinkError:
+            raise
         except Exception as ex:
             self.logger.logStatement(
                 message=f"Error loading module items. Error: {ex}", level="WARNING"
@@ -65,6 +81,25 @@ class ModuleLoader(BaseSectionLoader):
 
         return module_docs
 
+    def _load_module_item(
+        self,
+        item: ModuleItem,
+        module_name: str,
+        locked: bool,
+        formatted_datetime: datetime | str,
+    ) -> list[Document]:
+        """Loads a single module item with the loader for its type"""
+        if item.type in ["Page", "File", "Assignment"]:
+            return self.loaders[f"{item.type}s"].load_from_module(
+                item=item,
+                module_name=module_name,
+                locked=locked,
+                formatted_datetime=formatted_datetime,
+            )
+        elif item.type == "ExternalUrl" and self.index_external_urls:
+            return self._load_external_url(item)
+        return []
+
     def _get_module_metadata(self, unlock_time: str) -> tuple[bool, datetime | str]:
         """Returns if module is locked and corresponding unlock time ("" if unlocked)"""
         locked = False
@@ -82,9 +117,8 @@ class ModuleLoader(BaseSectionLoader):
 
     def _load_external_url(self, item: ModuleItem) -> list[Document]:
         """Loads external URL from module item"""
-        if (
-            item.external_url
-            and f"ExtUrl:{item.external_url}" not in self.indexed_items
+        if item.external_url and self.indexed_items.claim(
+            f"ExtUrl:{item.external_url}"
         ):
             self.logger.logStatement(
                 message=f"Loading external url {item.external_url} from module.",
@@ -92,7 +126,12 @@ class ModuleLoader(BaseSectionLoader):
             )
             url_loader = UnstructuredURLLoader(urls=[item.external_url])
             docs = url_loader.load()
+            for doc in docs:
+                doc.page_content = self.normalize_text(doc.page_content)
             if docs:
-                self.indexed_items.add(f"ExtUrl:{item.external_url}")
-                return docs
+                return assign_document_ids(
+                    docs, kind="external_url", item_id=item.external_url
+                )
+            # nothing was loaded, so the URL may be tried again from another module
+            self.indexed_items.release(f"ExtUrl:{item.external_url}")
         return []
@@ -17,8 +17,10 @@ class PageLoader(BaseSectionLoader):
 
         try:
             pages = self.canvas_client_extractor.get_pages()
-            for page in pages:
-                page_documents.extend(self._load_item(page))
+            for item_documents in self._load_items(
+                pages, get_key=lambda item: f"Page:{item.page_id}"
+            ):
+                page_documents.extend(item_documents)
 
         except CanvasException:
             self.logger.logStatement(
@@ -33,12 +35,11 @@ class PageLoader(BaseSectionLoader):
             if (
                 not page.locked_for_user
                 and page.body
-                and f"Page:{page.page_id}" not in self.indexed_items
+                and self.indexed_items.claim(f"Page:{page.page_id}")
             ):
                 self.logger.logStatement(
                     message=f"Loading page: {page.title}", level="DEBUG"
                 )
-                self.indexed_items.add(f"Page:{page.page_id}")
 
                 page_body, embed_urls = self.parse_html(html=page.body)
 
@@ -11,6 +11,10 @@ class SyllabusLoader(BaseSectionLoader):
 
     def load_section(self) -> list[Document]:
         self.logger.logStatement(message="Loading syllabus...\n", level="INFO")
+        return self._run_item(key="Syllabus", load_fn=self._load_item)
+
+    def _load_item(self) -> list[Document]:
+        """Loads and formats the course syllabus"""
         try:
             syllabus_body = self.canvas_client_extractor.get_syllabus()
             if syllabus_body:
@@ -23,6 +27,7 @@ class SyllabusLoader(BaseSectionLoader):
                         "filename": "Course Syllabus",
                         "source": syllabus_url,
                         "kind": "syllabus",
+                        "id": self.canvas_client_extractor.get_course_id(),
                     },
                 }
                 return self.process_data(metadata=metadata, embed_urls=embed_urls)
@@ -0,0 +1,263 @@
+"""Course content loaded once and shared by every user of the course.
+
+With `CANVAS_ADMIN_API_KEY` configured, all users of a course load the same
+content under the same token. `SharedCourseStore` keeps that content as one
+snapshot per course, written by the first load and reused until it is older
+than its maximum age. Each user's documents are then picked from it by a
+`VisibilityFilter`, built from list calls made with the user's own token:
+only items the user can list, that are published and not locked for them
+(directly, by a module's `unlock_at` or state, or by sequential progress), are
+kept. An item the user's own listing marks locked or unpublished stays hidden
+even when a module lists it.
+"""
+
+import fcntl
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from canvas_langchain.client import CanvasClient
+from canvas_langchain.snapshot import read_snapshot, write_snapshot
+from canvas_langchain.utils.document_ids import ITEM_KEY_PREFIXES, get_item_key
+from canvas_langchain.utils.logging import Logger
+from canvasapi.exceptions import CanvasException
+from langchain.docstore.document import Document
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+MAX_AGE_SECONDS_DEFAULT = 60 * 60
+LOCK_POLL_SECONDS = 0.1
+
+
+class SharedCourseStore:
+    def __init__(self, directory: str, max_age: float = MAX_AGE_SECONDS_DEFAULT):
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, directory: str) -> "SharedCourseStore":
+        return cls(
+            directory,
+            max_age=getattr(
+                settings, "CANVAS_SHARED_STORE_MAX_AGE_SECONDS", MAX_AGE_SECONDS_DEFAULT
+            ),
+        )
+
+    def get_path(self, course_id: int, variant: str = "") -> str:
+        """`variant` separates content loaded with different loader options"""
+        name = f"course-{course_id}-{variant}" if variant else f"course-{course_id}"
+        return os.path.join(self.directory, f"{name}.jsonl.gz")
+
+    def get(self, course_id: int, variant: str = "") -> list[Document] | None:
+        """The course's stored documents, or None if missing or too old"""
+        path = self.get_path(course_id, variant)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.max_age:
+                return None
+        except OSError:
+            return None
+        return self._read(path)
+
+    def get_or_load(
+        self,
+        course_id: int,
+        load_fn: Callable[[], tuple[list[Document], bool]],
+        variant: str = "",
+        time_budget: float | None = None,
+    ) -> list[Document]:
+        """Returns the stored documents, loading and storing them first if needed.
+
+        `load_fn` returns the documents and whether they are complete enough to
+        share. Concurrent callers for the same course wait for the first load, for
+        at most `time_budget` seconds. After that they get the stored documents
+        even if too old, or, with none stored, call `load_fn` without storing.
+        """
+        docs = self.get(course_id, variant)
+        if docs is not None:
+            return docs
+        path = self.get_path(course_id, variant)
+        expires_at = time.monotonic() + time_budget if time_budget is not None else None
+        with open(f"{path}.lock", "w") as lock_file:
+            if not _lock(lock_file, expires_at):
+                docs = self._read(path)
+                if docs is not None:
+                    return docs
+                docs, _ = load_fn()
+                return docs
+            try:
+                # another process may have loaded the course while we waited
+                docs = self.get(course_id, variant)
+                if docs is not None:
+                    return docs
+                docs, shareable = load_fn()
+                if shareable:
+                    self._write(self.get_path(course_id, variant), course_id, docs)
+                return docs
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def invalidate(self, course_id: int, variant: str = ""):
+        """Forgets the stored content, so the next load crawls the course again"""
+        try:
+            os.remove(self.get_path(course_id, variant))
+        except FileNotFoundError:
+            pass
+
+    def _read(self, path: str) -> list[Document] | None:
+        try:
+            return list(read_snapshot(path))
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: str, course_id: int, docs: list[Document]):
+        # readers never see a half-written snapshot
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        write_snapshot(temp_path, docs, course_id=course_id, append=False)
+        os.replace(temp_path, path)
+
+
+class VisibilityFilter:
+    """The course items one user may see, from that user's cheap list calls"""
+
+    def __init__(self, visible_keys: set[str]):
+        self.visible_keys = visible_keys
+
+    @classmethod
+    def from_client(cls, canvas_client: CanvasClient, logger: Logger):
+        """Lists tabs, pages, assignments, announcements, files and modules as the
+        client's user, without fetching page bodies or downloading files"""
+        extractor = canvas_client.rest_extractor
+        tabs = canvas_client.get_available_tabs()
+        keys = set()
+        # items the user's own listings mark locked or unpublished
+        denied_keys = set()
+        if "Syllabus" in tabs:
+            keys.add("Syllabus")
+        if "Media Gallery" in tabs:
+            keys.add("MediaGallery")
+        # each listing yields (key, available) pairs
+        listings = {
+            "Announcements": lambda: (
+                (f"Announcement:{announcement.id}", True)
+                for announcement in extractor.get_announcements()
+            ),
+            "Pages": lambda: (
+                (key, _is_available(page))
+                for page in extractor.get_page_list()
+                for key in (f"Page:{page.page_id}", f"PageUrl:{page.url}")
+            ),
+            "Assignments": lambda: (
+                (f"Assignment:{assignment.id}", _is_available(assignment))
+                for assignment in extractor.get_assignments()
+            ),
+            "Files": lambda: (
+                (f"File:{file.id}", _is_available(file))
+                for file in extractor.get_files()
+            ),
+            "Modules": lambda: (
+                (key, True) for key in _get_module_keys(extractor.get_modules())
+            ),
+        }
+        for tab_name, list_keys in listings.items():
+            if tab_name not in tabs:
+                continue
+            try:
+                for key, available in list_keys():
+                    (keys if available else denied_keys).add(key)
+            except CanvasException as err:
+                # whatever the user cannot list stays hidden
+                logger.logStatement(
+                    message=f"Canvas exception listing {tab_name}: {err}",
+                    level="WARNING",
+                )
+        # a module listing an item does not unlock it
+        return cls(keys - denied_keys)
+
+    def apply(self, docs: list[Document]) -> list[Document]:
+        """Keeps the documents of visible items, in their original order"""
+        return [
+            doc
+            for doc in docs
+            if any(key in self.visible_keys for key in _get_item_keys(doc))
+        ]
+
+
+def _lock(lock_file, expires_at: float | None) -> bool:
+    """Takes the exclusive lock, polling until `expires_at` if one is given"""
+    if expires_at is None:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return True
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= expires_at:
+                return False
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+def _is_available(item) -> bool:
+    return getattr(item, "published", True) is not False and not getattr(
+        item, "locked_for_user", False
+    )
+
+
+def _get_module_keys(modules):
+    """Keys of the module items the user can open: in published, unlocked modules,
+    not locked for the user and not behind an unmet sequential requirement"""
+    now = datetime.now(timezone.utc)
+    for module in modules:
+        if getattr(module, "published", True) is False:
+            continue
+        # `state` is only reported for students; "locked" covers prerequisites
+        if getattr(module, "state", None) == "locked":
+            continue
+        unlock_at = getattr(module, "unlock_at", None)
+        if unlock_at and now < datetime.strptime(
+            unlock_at, "%Y-%m-%dT%H:%M:%SZ"
+        ).replace(tzinfo=timezone.utc):
+            continue
+        sequential = getattr(module, "require_sequential_progress", False)
+        for item in module.get_module_items(include=["content_details"]):
+            if getattr(item, "published", True) is False:
+                continue
+            content_details = getattr(item, "content_details", None) or {}
+            if content_details.get("locked_for_user"):
+                continue
+            if item.type == "Page":
+                yield f"PageUrl:{item.page_url}"
+            elif item.type in ("File", "Assignment"):
+                yield f"{item.type}:{item.content_id}"
+            elif item.type == "ExternalUrl":
+                yield f"ExtUrl:{item.external_url}"
+            requirement = getattr(item, "completion_requirement", None) or {}
+            if sequential and requirement and not requirement.get("completed"):
+                # later items open only once this requirement is met
+                break
+
+
+def _get_item_keys(doc: Document) -> list[str]:
+    """Visibility keys of the item a document came from, or of the item embedding
+    a media caption. Captions with no recorded parent get none, so stay hidden."""
+    kind, _, rest = doc.metadata.get("doc_id", "").partition(":")
+    if kind == "mivideo":
+        item_key = doc.metadata.get("embedded_in")
+        source = doc.metadata.get("course_context", "")
+    elif kind == "syllabus" or kind in ITEM_KEY_PREFIXES:
+        item_key = get_item_key(kind, rest.rpartition(":")[0])
+        source = doc.metadata.get("source", "")
+    else:
+        return []
+    if not item_key:
+        return []
+    if item_key.startswith("Page:"):
+        # module items name pages by url rather than id
+        return [item_key, f"PageUrl:{source.rpartition('/pages/')[2]}"]
+    return [item_key]
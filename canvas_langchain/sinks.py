@@ -0,0 +1,155 @@
+"""Streaming output of loaded documents to a downstream consumer.
+
+`CanvasLoader.load_to_sink` hands each item's documents to a `SinkWriter` as
+soon as the item is loaded. The writer groups them into batches and delivers
+them to the sink on a background thread through a bounded queue: when the sink
+falls behind and the queue is full, the crawl blocks until there is room. Once
+the sink fails, the next handoff raises `SinkError`, which ends the load.
+"""
+
+import json
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from langchain.docstore.document import Document
+
+BATCH_SIZE_DEFAULT = 100
+MAX_PENDING_BATCHES_DEFAULT = 4
+
+
+class SinkError(Exception):
+    """A sink failed to consume documents; ends the load instead of a single item"""
+
+
+class DocumentSink(ABC):
+    """A consumer of loaded documents, e.g. a file writer or vector store upserter"""
+
+    @abstractmethod
+    def write(self, documents: list[Document]):
+        """Consumes one batch of documents"""
+        pass
+
+    def close(self):
+        """Called once after the last batch"""
+        pass
+
+
+class JSONLSink(DocumentSink):
+    """Appends documents to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, documents: list[Document]):
+        for doc in documents:
+            record = {"page_content": doc.page_content, "metadata": doc.metadata}
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class QueueSink(DocumentSink):
+    """Puts each batch on a queue; a bounded queue adds its own backpressure"""
+
+    def __init__(self, output_queue: queue.Queue):
+        self.output_queue = output_queue
+
+    def write(self, documents: list[Document]):
+        self.output_queue.put(documents)
+
+
+class CallableSink(DocumentSink):
+    """Passes each batch to a function, e.g. a vector store's `add_documents`"""
+
+    def __init__(self, write_fn: Callable[[list[Document]], object]):
+        self.write_fn = write_fn
+
+    def write(self, documents: list[Document]):
+        self.write_fn(documents)
+
+
+class SinkWriter:
+    """Batches documents and feeds them to a sink from a background thread"""
+
+    def __init__(
+        self,
+        sink: DocumentSink,
+        batch_size: int = BATCH_SIZE_DEFAULT,
+        max_pending_batches: int = MAX_PENDING_BATCHES_DEFAULT,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.documents_written = 0
+        self._batch = []
+        self._pending = queue.Queue(maxsize=max_pending_batches)
+        self._lock = threading.Lock()
+        self._closed = False
+        # producers handing batches to the queue outside the lock
+        self._putting = 0
+        self._puts_done = threading.Condition(self._lock)
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._drain, name="canvas-sink", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, documents: list[Document]):
+        """Adds documents, blocking while the sink is `max_pending_batches` behind"""
+        self._raise_sink_error()
+        full_batches = []
+        with self._lock:
+            # items abandoned by a timeout may still finish after the load has ended
+            if self._closed:
+                return
+            self._batch.extend(documents)
+            while len(self._batch) >= self.batch_size:
+                full_batches.append(self._batch[: self.batch_size])
+                self._batch = self._batch[self.batch_size :]
+            if not full_batches:
+                return
+            self._putting += 1
+        # other producers keep batching while this one waits for the sink
+        try:
+            for batch in full_batches:
+                self._pending.put(batch)
+        finally:
+            with self._lock:
+                self._putting -= 1
+                self._puts_done.notify_all()
+
+    def close(self):
+        """Flushes the last partial batch, waits for the sink, then closes it"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # batches already taken by producers go ahead of the end marker
+            self._puts_done.wait_for(lambda: self._putting == 0)
+            last_batch, self._batch = self._batch, []
+        if last_batch:
+            self._pending.put(last_batch)
+        self._pending.put(None)
+        self._thread.join()
+        self.sink.close()
+        self._raise_sink_error()
+
+    def _drain(self):
+        while (batch := self._pending.get()) is not None:
+            if self._error is not None:
+                # keep emptying the queue so producers never block on a failed sink
+                continue
+            try:
+                self.sink.write(batch)
+                self.documents_written += len(batch)
+            except Exception as err:
+                self._error = err
+
+    def _raise_sink_error(self):
+        if self._error is not None:
+            raise SinkError(f"Document sink failed: {self._error}") from self._error
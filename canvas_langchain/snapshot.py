@@ -0,0 +1,113 @@
+"""Compressed, append-friendly on-disk snapshots of a course's loaded documents.
+
+A snapshot is JSON Lines compressed with zstd (`.zst`, requires the optional
+`zstandard` package) or gzip (any other extension). Every write appends a new
+compressed frame, so a snapshot can be built up section by section and read
+back as one stream without network access.
+"""
+
+import gzip
+import io
+import itertools
+import json
+import mmap
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from langchain.docstore.document import Document
+from langchain.document_loaders.base import BaseLoader
+
+SNAPSHOT_FORMAT = "canvas_langchain.snapshot"
+SNAPSHOT_VERSION = 1
+WRITE_BATCH_SIZE = 1000
+
+
+def _is_zstd(path: str) -> bool:
+    return str(path).endswith(".zst")
+
+
+def _compressed_writer(path: str, raw_file):
+    if _is_zstd(path):
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(raw_file, closefd=False)
+    return gzip.GzipFile(fileobj=raw_file, mode="wb")
+
+
+def _decompressed_reader(path: str, raw_file):
+    if _is_zstd(path):
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(
+            raw_file, read_across_frames=True
+        )
+    return gzip.GzipFile(fileobj=raw_file, mode="rb")
+
+
+def write_snapshot(
+    path: str,
+    documents: Iterable[Document],
+    course_id: int | None = None,
+    append: bool = True,
+) -> int:
+    """Writes documents to a snapshot, appending by default; returns the count written"""
+    is_new = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+    count = 0
+    with open(path, "ab" if append else "wb") as raw_file:
+        with _compressed_writer(path, raw_file) as writer:
+            if is_new:
+                header = {
+                    "format": SNAPSHOT_FORMAT,
+                    "version": SNAPSHOT_VERSION,
+                    "course_id": course_id,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                }
+                writer.write((json.dumps(header) + "\n").encode("utf-8"))
+
+            documents = iter(documents)
+            while batch := list(itertools.islice(documents, WRITE_BATCH_SIZE)):
+                lines = [
+                    json.dumps(
+                        {"page_content": doc.page_content, "metadata": doc.metadata},
+                        ensure_ascii=False,
+                        default=str,
+                    )
+                    for doc in batch
+                ]
+                writer.write(("\n".join(lines) + "\n").encode("utf-8"))
+                count += len(batch)
+    return count
+
+
+def read_snapshot(path: str) -> Iterator[Document]:
+    """Streams documents from a memory-mapped snapshot"""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as raw_file, mmap.mmap(
+        raw_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        reader = _decompressed_reader(path, mapped)
+        for line in io.TextIOWrapper(reader, encoding="utf-8"):
+            record = json.loads(line)
+            if "format" in record:
+                continue
+            doc = Document(
+                page_content=record["page_content"], metadata=record["metadata"]
+            )
+            if hasattr(doc, "id"):
+                doc.id = record["metadata"].get("doc_id")
+            yield doc
+
+
+class CanvasSnapshotLoader(BaseLoader):
+    """Loads documents from a snapshot written by `CanvasLoader.export_snapshot`"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def lazy_load(self) -> Iterator[Document]:
+        return read_snapshot(self.path)
+
+    def load(self) -> list[Document]:
+        return list(self.lazy_load())
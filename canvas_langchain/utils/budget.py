@@ -0,0 +1,204 @@
+"""Per-course and per-item limits on how much content a load downloads and emits"""
+
+import threading
+from typing import Literal
+
+from langchain.docstore.document import Document
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+KeepPolicy = Literal["most_recent", "smallest_first"]
+
+
+class ContentBudget:
+    """Tracks what a course load has used and decides what still fits.
+
+    With a download limit, the files that fit are chosen up front from the
+    course's file listing in `keep` order (most recently updated or smallest
+    first), so the same files are kept whether they are reached through Files,
+    a module or the expensive lane. PDF pages, caption minutes, documents and
+    characters are admitted in load order. Everything cut is recorded in
+    `truncated_items`.
+    """
+
+    def __init__(
+        self,
+        max_download_bytes: int | None = None,
+        max_pdf_pages: int | None = None,
+        max_caption_minutes: float | None = None,
+        max_documents: int | None = None,
+        max_characters: int | None = None,
+        max_item_bytes: int | None = None,
+        max_item_pdf_pages: int | None = None,
+        max_item_caption_minutes: float | None = None,
+        max_item_documents: int | None = None,
+        keep: KeepPolicy = "most_recent",
+    ):
+        if keep not in ("most_recent", "smallest_first"):
+            raise ValueError(f"Unknown keep policy {keep!r}")
+        self.max_download_bytes = max_download_bytes
+        self.max_pdf_pages = max_pdf_pages
+        self.max_caption_minutes = max_caption_minutes
+        self.max_documents = max_documents
+        self.max_characters = max_characters
+        self.max_item_bytes = max_item_bytes
+        self.max_item_pdf_pages = max_item_pdf_pages
+        self.max_item_caption_minutes = max_item_caption_minutes
+        self.max_item_documents = max_item_documents
+        self.keep = keep
+        self.download_bytes = 0
+        self.pdf_pages = 0
+        self.caption_minutes = 0.0
+        self.documents = 0
+        self.characters = 0
+        self.truncated_items = []
+        # download sizes of the listed files that fit, until they are downloaded
+        self._planned_downloads: dict[str, int] | None = None
+        self._listed_keys = set()
+        # downloads already charged, so a retried item is not charged twice
+        self._taken = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ContentBudget | None":
+        """Builds a budget from the optional CANVAS_CONTENT_BUDGET settings dict"""
+        limits = getattr(settings, "CANVAS_CONTENT_BUDGET", None)
+        return cls(**limits) if limits else None
+
+    def order_files(self, files: list) -> list:
+        """Sorts files by the keep policy, so the ones kept come first"""
+        if self.keep == "smallest_first":
+            return sorted(files, key=lambda file: getattr(file, "size", 0) or 0)
+        return sorted(
+            files,
+            key=lambda file: getattr(file, "updated_at", None) or "",
+            reverse=True,
+        )
+
+    def plan_downloads(self, files: dict[str, object]):
+        """Chooses which of the course's listed files, keyed by item key, fit the
+        download budget, taking them in keep order"""
+        if self.max_download_bytes is None:
+            return
+        keys = {id(file): key for key, file in files.items()}
+        planned = {}
+        planned_bytes = 0
+        for file in self.order_files(list(files.values())):
+            size = getattr(file, "size", 0) or 0
+            if self.max_item_bytes is not None and size > self.max_item_bytes:
+                continue
+            if planned_bytes + size <= self.max_download_bytes:
+                planned[keys[id(file)]] = size
+                planned_bytes += size
+        with self._lock:
+            self._planned_downloads = planned
+            self._listed_keys = set(files)
+
+    def take_download(self, key: str, size: int) -> bool:
+        """Reserves `size` bytes for a download, or records the item as truncated"""
+        with self._lock:
+            if key in self._taken:
+                return True
+            if self.max_item_bytes is not None and size > self.max_item_bytes:
+                self._truncate(key, "max_item_bytes")
+                return False
+            if key in self._listed_keys:
+                if key not in self._planned_downloads:
+                    self._truncate(key, "max_download_bytes")
+                    return False
+                self._planned_downloads.pop(key)
+                self._taken.add(key)
+                self.download_bytes += size
+                return True
+            # unlisted files only get what the planned ones leave over
+            reserved = sum((self._planned_downloads or {}).values())
+            if (
+                self.max_download_bytes is not None
+                and self.download_bytes + reserved + size > self.max_download_bytes
+            ):
+                self._truncate(key, "max_download_bytes")
+                return False
+            self._taken.add(key)
+            self.download_bytes += size
+            return True
+
+    def take_pdf_page(self, key: str, page_number: int) -> bool:
+        """Reserves one page of a PDF; False once the item or course is out of pages"""
+        with self._lock:
+            if (
+                self.max_item_pdf_pages is not None
+                and page_number > self.max_item_pdf_pages
+            ):
+                self._truncate(key, "max_item_pdf_pages")
+                return False
+            if self.max_pdf_pages is not None and self.pdf_pages >= self.max_pdf_pages:
+                self._truncate(key, "max_pdf_pages")
+                return False
+            self.pdf_pages += 1
+            return True
+
+    def take_caption_minutes(
+        self, key: str, minutes: float, item_minutes: float
+    ) -> bool:
+        """Reserves one caption chunk, `item_minutes` into its media entry"""
+        with self._lock:
+            if (
+                self.max_item_caption_minutes is not None
+                and item_minutes > self.max_item_caption_minutes
+            ):
+                self._truncate(key, "max_item_caption_minutes")
+                return False
+            if (
+                self.max_caption_minutes is not None
+                and self.caption_minutes + minutes > self.max_caption_minutes
+            ):
+                self._truncate(key, "max_caption_minutes")
+                return False
+            self.caption_minutes += minutes
+            return True
+
+    def limit_item_documents(self, key: str, docs: list[Document]) -> list[Document]:
+        """Keeps the first `max_item_documents` documents of one item, including
+        the captions of media it embeds"""
+        if self.max_item_documents is None or len(docs) <= self.max_item_documents:
+            return docs
+        with self._lock:
+            self._truncate(key, "max_item_documents")
+        return docs[: self.max_item_documents]
+
+    def admit(self, docs: list[Document]) -> list[Document]:
+        """Passes documents through until the document or character budget runs out"""
+        if self.max_documents is None and self.max_characters is None:
+            return docs
+        admitted = []
+        with self._lock:
+            for doc in docs:
+                if (
+                    self.max_documents is not None
+                    and self.documents >= self.max_documents
+                ):
+                    self._truncate(self._get_doc_key(doc), "max_documents")
+                    continue
+                if (
+                    self.max_characters is not None
+                    and self.characters + len(doc.page_content) > self.max_characters
+                ):
+                    self._truncate(self._get_doc_key(doc), "max_characters")
+                    continue
+                self.documents += 1
+                self.characters += len(doc.page_content)
+                admitted.append(doc)
+        return admitted
+
+    def _get_doc_key(self, doc: Document) -> str:
+        return doc.metadata.get("doc_id") or doc.metadata.get("source", "")
+
+    def _truncate(self, key: str, reason: str):
+        # consecutive cuts of the same item for the same reason are reported once
+        entry = {"key": key, "reason": reason}
+        if entry not in self.truncated_items[-1:]:
+            self.truncated_items.append(entry)
@@ -0,0 +1,147 @@
+"""Records of which Canvas items have been indexed, safe to share between workers"""
+
+import sqlite3
+import threading
+
+_current = threading.local()
+
+
+class ClaimScope:
+    """The claims made on one thread while it loads one item.
+
+    `LoadDeadline` opens a scope around each item it runs. When the item is
+    abandoned, `cancel` releases what it claimed, and the still-running thread
+    can claim nothing more, so it loads no further files, media or links.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._claims = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ClaimScope":
+        _current.scope = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _current.scope = None
+
+    def claim(self, claims, key: str) -> bool:
+        """Claims `key` from `claims` for this item, unless it was abandoned"""
+        with self._lock:
+            if self.cancelled or not claims._claim(key):
+                return False
+            self._claims.append((claims, key))
+            return True
+
+    def cancel(self, claims=None, item_key: str | None = None):
+        """Releases the item's claims, and `item_key` if the section claimed it"""
+        with self._lock:
+            self.cancelled = True
+            released, self._claims = self._claims, []
+        for owner, key in released:
+            owner.release(key)
+        if claims is not None and item_key:
+            claims.release(item_key)
+
+
+def get_current_scope() -> ClaimScope | None:
+    """The claim scope of the item loading on this thread, if any"""
+    return getattr(_current, "scope", None)
+
+
+class ClaimSet(set):
+    """A set of item keys that concurrent workers claim atomically, so each item loads once"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> bool:
+        """Adds `key` and returns True, or returns False if it was already present"""
+        scope = get_current_scope()
+        if scope is not None:
+            return scope.claim(self, key)
+        return self._claim(key)
+
+    def _claim(self, key: str) -> bool:
+        with self._lock:
+            if key in self:
+                return False
+            self.add(key)
+            return True
+
+    def release(self, key: str):
+        """Gives up a claim, e.g. after a failed load, so the item can be retried"""
+        with self._lock:
+            self.discard(key)
+
+
+class SQLiteClaimStore:
+    """Claims shared by every process using the same SQLite file, e.g. queue workers.
+
+    A claim belongs to the `owner` that made it, normally the work item being
+    loaded, so the same work item can claim its keys again when it is retried.
+    """
+
+    def __init__(self, path: str, course_id: int, timeout: float = 30):
+        self.course_id = course_id
+        self.owner = ""
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS claims ("
+            "course_id INTEGER, key TEXT, owner TEXT, PRIMARY KEY (course_id, key))"
+        )
+        self._connection.commit()
+
+    def claim(self, key: str) -> bool:
+        """Claims `key`, or returns False if another owner already holds it"""
+        scope = get_current_scope()
+        if scope is not None:
+            return scope.claim(self, key)
+        return self._claim(key)
+
+    def _claim(self, key: str) -> bool:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO claims VALUES (?, ?, ?)",
+                (self.course_id, key, self.owner),
+            )
+            (owner,) = self._connection.execute(
+                "SELECT owner FROM claims WHERE course_id = ? AND key = ?",
+                (self.course_id, key),
+            ).fetchone()
+        return owner == self.owner
+
+    def release(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM claims WHERE course_id = ? AND key = ?",
+                (self.course_id, key),
+            )
+
+    def add(self, key: str):
+        self.claim(key)
+
+    def discard(self, key: str):
+        self.release(key)
+
+    def update(self, keys):
+        for key in keys:
+            self.claim(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT 1 FROM claims WHERE course_id = ? AND key = ?",
+                    (self.course_id, key),
+                ).fetchone()
+                is not None
+            )
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,91 @@
+"""Compact storage for documents held until the end of a course load.
+
+Every page of a PDF and every caption chunk of a video becomes its own
+LangChain `Document`, with its own metadata dict repeating the item's
+filename, source and kind. `CompactItem` keeps one item's documents as their
+texts, one metadata dict shared by all of them, and a tuple per document with
+only the values that differ (page, doc_id, content_hash, ...). `Document`s
+are rebuilt when the load hands its output over.
+
+Mutable metadata values (lists, dicts) are copied when an item is stored, so
+later changes to the original documents cannot reach the store, and again for
+each rebuilt document, so no two documents share one object.
+"""
+
+import copy
+from collections import deque
+from typing import Iterator
+
+from langchain.docstore.document import Document
+
+# marks a per-document key that one document of an item does not have
+_MISSING = object()
+_MUTABLE_TYPES = (list, dict, set)
+
+
+def _copy_value(value):
+    """Copies mutable metadata values; scalars are shared as they are"""
+    if isinstance(value, _MUTABLE_TYPES):
+        return copy.deepcopy(value)
+    return value
+
+
+class CompactItem:
+    __slots__ = ("texts", "shared", "keys", "rows")
+
+    def __init__(self, docs: list[Document]):
+        self.texts = [doc.page_content for doc in docs]
+        first = docs[0].metadata if docs else {}
+        self.shared = {
+            key: _copy_value(value)
+            for key, value in first.items()
+            if all(key in doc.metadata and doc.metadata[key] == value for doc in docs)
+        }
+        keys = {}
+        for doc in docs:
+            keys.update(dict.fromkeys(k for k in doc.metadata if k not in self.shared))
+        self.keys = tuple(keys)
+        self.rows = [
+            tuple(_copy_value(doc.metadata.get(key, _MISSING)) for key in self.keys)
+            for doc in docs
+        ]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[Document]:
+        for text, row in zip(self.texts, self.rows):
+            metadata = {key: _copy_value(value) for key, value in self.shared.items()}
+            metadata.update(
+                (key, _copy_value(value))
+                for key, value in zip(self.keys, row)
+                if value is not _MISSING
+            )
+            doc = Document(page_content=text, metadata=metadata)
+            if hasattr(doc, "id") and "doc_id" in metadata:
+                doc.id = metadata["doc_id"]
+            yield doc
+
+
+class CompactDocumentStore:
+    """Documents of a course load, kept compactly per item in load order"""
+
+    def __init__(self):
+        self._items = deque()
+        self._count = 0
+
+    def append(self, docs: list[Document]):
+        """Stores one item's documents; the `Document` objects can then be freed"""
+        if docs:
+            self._items.append(CompactItem(docs))
+            self._count += len(docs)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def drain(self) -> Iterator[Document]:
+        """Rebuilds the documents in order, releasing each item once rebuilt"""
+        while self._items:
+            item = self._items.popleft()
+            self._count -= len(item)
+            yield from item
@@ -0,0 +1,117 @@
+"""Overall time budget and per-item timeouts for a course load"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable
+
+from canvas_langchain.utils.claims import ClaimScope, get_current_scope
+from langchain.docstore.document import Document
+
+MAX_WORKERS_DEFAULT = 16
+
+
+class LoadDeadline:
+    """Runs item loads against an overall time budget, recording what was skipped.
+
+    Items run on a shared thread pool. Python threads cannot be killed, so an
+    item that times out is abandoned: its result is discarded, its claims are
+    released so another listing of the item may load it, and it can claim
+    nothing more while it winds down. Call `close` when the load ends.
+    """
+
+    def __init__(
+        self,
+        time_budget: float | None = None,
+        item_timeout: float | None = None,
+        max_workers: int = MAX_WORKERS_DEFAULT,
+    ):
+        self.expires_at = (
+            time.monotonic() + time_budget if time_budget is not None else None
+        )
+        self.item_timeout = item_timeout
+        self.max_workers = max_workers
+        self.skipped_items = []
+        self.skipped_keys = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float | None:
+        """Seconds left in the time budget, or None when there is no budget"""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0)
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cancelled(self) -> bool:
+        """Whether the item loading on this thread has been abandoned"""
+        scope = get_current_scope()
+        return scope is not None and scope.cancelled
+
+    def skip(self, key: str, reason: str):
+        """Records an item that was not loaded"""
+        with self._lock:
+            self.skipped_items.append({"key": key, "reason": reason})
+            self.skipped_keys.add(key)
+
+    def run(
+        self,
+        key: str,
+        load_fn: Callable[[], list[Document]],
+        per_item: bool = True,
+        claims=None,
+    ) -> list[Document]:
+        """Runs `load_fn` until it finishes, its timeout passes or the budget runs out.
+
+        `claims` is the claim set holding `key`, if the item was claimed before it
+        ran; the claim is released when the item is abandoned.
+        """
+        if self.expired():
+            self.skip(key, "time_budget_exhausted")
+            return []
+        if self.remaining() is None and not (per_item and self.item_timeout):
+            return load_fn()
+
+        scope = ClaimScope()
+        started = threading.Event()
+
+        def target():
+            started.set()
+            if scope.cancelled:
+                return []
+            with scope:
+                return load_fn()
+
+        future = self._get_executor().submit(target)
+        # the item's own timeout starts once a pool thread picks it up
+        if started.wait(self.remaining()):
+            timeouts = [self.remaining()]
+            if per_item:
+                timeouts.append(self.item_timeout)
+            timeout = min(timeout for timeout in timeouts if timeout is not None)
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError:
+                pass
+        future.cancel()
+        scope.cancel(claims, key)
+        self.skip(key, "time_budget_exhausted" if self.expired() else "item_timeout")
+        return []
+
+    def close(self):
+        """Stops taking items; abandoned ones finish in the background"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="canvas-load"
+                )
+            return self._executor
@@ -0,0 +1,77 @@
+"""Content-hash deduplication of documents across course sections"""
+
+import threading
+
+from canvas_langchain.utils.document_ids import get_content_hash
+from langchain.docstore.document import Document
+
+
+class ContentDeduplicator:
+    """Emits one document per unique content, recording the sources of dropped copies.
+
+    Documents are never modified, as emitted ones may already be serialized or
+    stored. Other locations of a kept document are listed in `duplicate_sources`,
+    keyed by its `doc_id`.
+
+    With `claims`, a claim store shared with other processes (e.g. queue
+    workers), content is also claimed there, so a copy emitted by another
+    process is dropped too. Its source is then not recorded, as the kept copy
+    is not known here.
+    """
+
+    def __init__(self, claims=None):
+        # content hash -> doc_id and source of the copy that was kept
+        self._seen: dict[str, tuple[str, str | None]] = {}
+        self.claims = claims
+        self._lock = threading.Lock()
+        self.duplicate_sources: dict[str, list[str]] = {}
+        self.duplicate_count = 0
+
+    def seed(self, docs: list[Document]):
+        """Records documents emitted by an earlier load, e.g. replayed from a
+        checkpoint, so their content is not emitted again"""
+        with self._lock:
+            for doc in docs:
+                self._seen.setdefault(
+                    self._get_hash(doc),
+                    (
+                        doc.metadata.get("doc_id", self._get_hash(doc)),
+                        doc.metadata.get("source"),
+                    ),
+                )
+
+    def filter(self, docs: list[Document]) -> list[Document]:
+        """Returns documents whose content has not been emitted before"""
+        unique_docs = []
+        with self._lock:
+            for doc in docs:
+                content_hash = self._get_hash(doc)
+                doc_id = doc.metadata.get("doc_id", content_hash)
+                source = doc.metadata.get("source")
+                if (
+                    self.claims is not None
+                    and content_hash not in self._seen
+                    and not self.claims.claim(f"Content:{content_hash}")
+                ):
+                    # emitted by another process
+                    self.duplicate_count += 1
+                    continue
+                kept_id, kept_source = self._seen.setdefault(
+                    content_hash, (doc_id, source)
+                )
+                # the kept copy itself may pass more than once, e.g. via a module
+                if kept_id == doc_id:
+                    unique_docs.append(doc)
+                    continue
+
+                self.duplicate_count += 1
+                if (
+                    source
+                    and source != kept_source
+                    and source not in self.duplicate_sources.get(kept_id, [])
+                ):
+                    self.duplicate_sources.setdefault(kept_id, []).append(source)
+        return unique_docs
+
+    def _get_hash(self, doc: Document) -> str:
+        return doc.metadata.get("content_hash") or get_content_hash(doc.page_content)
@@ -0,0 +1,50 @@
+"""Utility functions to assign stable ids and content hashes to documents"""
+
+import hashlib
+
+from langchain.docstore.document import Document
+
+# document kinds mapped to the key prefix of the Canvas item they came from
+ITEM_KEY_PREFIXES = {
+    "file": "File",
+    "page": "Page",
+    "assignment": "Assignment",
+    "announcement": "Announcement",
+    "external_url": "ExtUrl",
+}
+
+
+def get_document_id(kind: str, item_id, index: int = 0) -> str:
+    """Builds a deterministic document id from item kind, Canvas id and page/chunk index"""
+    return f"{kind}:{item_id}:{index}"
+
+
+def get_item_key(kind: str, item_id) -> str:
+    """Names the Canvas item a document came from, e.g. `Page:12` or `Syllabus`"""
+    if kind == "syllabus":
+        return "Syllabus"
+    return f"{ITEM_KEY_PREFIXES[kind]}:{item_id}"
+
+
+def get_content_hash(text: str) -> str:
+    """Returns the SHA-256 hex digest of document text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def assign_document_ids(
+    docs: list[Document], kind: str, item_id, start_index: int = 0
+) -> list[Document]:
+    """Adds `doc_id` and `content_hash` metadata to documents of a single item"""
+    for index, doc in enumerate(docs, start=start_index):
+        set_document_id(doc, get_document_id(kind, item_id, index))
+    return docs
+
+
+def set_document_id(doc: Document, doc_id: str) -> Document:
+    """Sets id and content hash on one document"""
+    doc.metadata["doc_id"] = doc_id
+    doc.metadata["content_hash"] = get_content_hash(doc.page_content)
+    # newer langchain versions support a first-class id used by vector store upserts
+    if hasattr(doc, "id"):
+        doc.id = doc_id
+    return doc
@@ -67,3 +67,21 @@ def _get_embed_url_direct(url: str) -> str | None:
     if netloc_matches and path_starts_correctly and path_ends_correctly:
         return parse_qs(parsed_url.query).get("url", [None]).pop()
     return None
+
+
+def count_embedded_media(html: str | None) -> tuple[int, int]:
+    """Counts embedded media iframes without resolving them.
+
+    Returns (embedded media, UUID lookups a full load would make to resolve them).
+    """
+    if not html:
+        return 0, 0
+    media = lookups = 0
+    for iframe in BeautifulSoup(html, "lxml").find_all("iframe"):
+        src = iframe.get("src") or ""
+        if parse_qs(urlparse(src).query).get("resource_link_lookup_uuid"):
+            media += 1
+            lookups += 1
+        elif _get_embed_url_direct(src):
+            media += 1
+    return media, lookups
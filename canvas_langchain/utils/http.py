@@ -0,0 +1,16 @@
+"""HTTP transport adapters mounted on the Canvas requester session"""
+
+from requests.adapters import HTTPAdapter
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """Applies a default timeout to requests that do not set their own"""
+
+    def __init__(self, timeout: float | None, *args, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None and self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
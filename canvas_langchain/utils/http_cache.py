@@ -0,0 +1,199 @@
+"""On-disk, revalidating cache for Canvas API GET responses.
+
+`CachingHTTPAdapter` is mounted on the Canvas requester's session. Responses
+from the REST API (not file downloads) are stored on disk per access token and
+URL. A cached response with an `ETag` or `Last-Modified` validator is
+revalidated with a conditional GET, and a 304 is answered from the stored body;
+one without validators is reused until its TTL passes. The least recently used
+entries are evicted once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from canvas_langchain.utils.http import TimeoutHTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+TTL_SECONDS_DEFAULT = 5 * 60
+MAX_BYTES_DEFAULT = 512 * 1024 * 1024
+# headers replayed from a cached response; Link carries pagination
+STORED_HEADERS = ("Content-Type", "Link", "ETag", "Last-Modified")
+
+
+class CachingHTTPAdapter(TimeoutHTTPAdapter):
+    def __init__(
+        self,
+        cache_dir: str,
+        base_url: str,
+        ttl: float = TTL_SECONDS_DEFAULT,
+        max_bytes: int = MAX_BYTES_DEFAULT,
+        timeout: float | None = None,
+        *args,
+        **kwargs,
+    ):
+        """Caches GET responses for URLs under `base_url`, the REST API root"""
+        super().__init__(timeout, *args, **kwargs)
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(cache_dir) if entry.is_file()
+        )
+
+    @classmethod
+    def from_settings(
+        cls, cache_dir: str, base_url: str, timeout: float | None = None
+    ) -> "CachingHTTPAdapter":
+        return cls(
+            cache_dir=cache_dir,
+            base_url=base_url,
+            ttl=getattr(
+                settings, "CANVAS_RESPONSE_CACHE_TTL_SECONDS", TTL_SECONDS_DEFAULT
+            ),
+            max_bytes=getattr(
+                settings, "CANVAS_RESPONSE_CACHE_MAX_BYTES", MAX_BYTES_DEFAULT
+            ),
+            timeout=timeout,
+        )
+
+    def send(self, request, **kwargs):
+        if request.method != "GET" or not request.url.startswith(self.base_url):
+            return super().send(request, **kwargs)
+
+        key = self._get_key(request)
+        entry = self._read(key)
+        if entry is not None:
+            meta, body = entry
+            if not (meta.get("etag") or meta.get("last_modified")):
+                if time.time() - meta["stored_at"] < self.ttl:
+                    self.hits += 1
+                    self._touch(key)
+                    return self._build_cached_response(request, meta, body)
+            else:
+                if meta.get("etag"):
+                    request.headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    request.headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            self._touch(key)
+            return self._build_cached_response(request, entry[0], entry[1])
+
+        self.misses += 1
+        if response.status_code == 200 and not kwargs.get("stream"):
+            cache_control = response.headers.get("Cache-Control", "")
+            if "no-store" not in cache_control:
+                self._write(key, response)
+        return response
+
+    def _get_key(self, request) -> str:
+        """Scoped per access token, so users never see each other's responses"""
+        token = request.headers.get("Authorization", "")
+        return hashlib.sha256(f"{token}\n{request.url}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+
+    def _read(self, key: str) -> tuple[dict, bytes] | None:
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            with open(body_path, "rb") as body_file:
+                return meta, body_file.read()
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, response: Response):
+        meta = {
+            "url": response.url,
+            "headers": {
+                name: response.headers[name]
+                for name in STORED_HEADERS
+                if name in response.headers
+            },
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        meta_path, body_path = self._paths(key)
+        body = response.content
+        with self._lock:
+            previous_size = sum(
+                os.path.getsize(path)
+                for path in (meta_path, body_path)
+                if os.path.exists(path)
+            )
+            # write the body first; an entry only counts once its metadata exists
+            for path, data, mode in (
+                (body_path, body, "wb"),
+                (meta_path, json.dumps(meta), "w"),
+            ):
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, mode) as temp_file:
+                    temp_file.write(data)
+                os.replace(temp_path, path)
+            self._total_bytes += os.path.getsize(meta_path) + len(body) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _touch(self, key: str):
+        """Marks an entry as recently used, for eviction order"""
+        meta_path, body_path = self._paths(key)
+        try:
+            for path in (meta_path, body_path):
+                os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Deletes least recently used entries until the cache is 90% of its limit"""
+        entries = {}
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                key = entry.name.rsplit(".", 1)[0]
+                stat = entry.stat()
+                used_at, size = entries.get(key, (0, 0))
+                entries[key] = (max(used_at, stat.st_mtime), size + stat.st_size)
+        target = self.max_bytes * 0.9
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if self._total_bytes <= target:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes -= size
+
+    def _build_cached_response(self, request, meta: dict, body: bytes) -> Response:
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
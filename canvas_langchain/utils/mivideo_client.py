@@ -0,0 +1,154 @@
+"""Process-wide pool of authenticated MiVideo API clients.
+
+Creating a `MiVideoAPI` authenticates against the MiVideo API, so clients are
+kept per API host and credentials and reused by every course loaded in the
+process until their token is due to expire. When the client's access token is
+a JWT, its `exp` claim decides when that is; otherwise the client is replaced
+after `client_ttl`. A 401 response drops the shared client and pauses caption
+requests for the course that received it until a cooldown has passed.
+"""
+
+import base64
+import json
+import threading
+import time
+
+from LangChainKaltura.KalturaCaptionLoader import KalturaCaptionLoader
+from LangChainKaltura.MiVideoAPI import MiVideoAPI
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+
+except ImportError:
+    import settings
+
+CLIENT_TTL_SECONDS_DEFAULT = 55 * 60
+UNAUTHORIZED_RETRY_SECONDS_DEFAULT = 5 * 60
+# a client is replaced this long before its token expires
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+TOKEN_ATTRIBUTES = ("authToken", "accessToken", "access_token", "token")
+
+
+class MiVideoClientPool:
+    def __init__(
+        self,
+        client_ttl: float = CLIENT_TTL_SECONDS_DEFAULT,
+        unauthorized_retry: float = UNAUTHORIZED_RETRY_SECONDS_DEFAULT,
+    ):
+        """`client_ttl` is the client lifetime used when its token's expiry is unknown"""
+        self.client_ttl = client_ttl
+        self.unauthorized_retry = unauthorized_retry
+        self._clients = {}
+        self._unauthorized_until = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "MiVideoClientPool":
+        return cls(
+            client_ttl=getattr(
+                settings, "MIVIDEO_CLIENT_TTL_SECONDS", CLIENT_TTL_SECONDS_DEFAULT
+            ),
+            unauthorized_retry=getattr(
+                settings,
+                "MIVIDEO_UNAUTHORIZED_RETRY_SECONDS",
+                UNAUTHORIZED_RETRY_SECONDS_DEFAULT,
+            ),
+        )
+
+    def get_api(self) -> MiVideoAPI:
+        """Returns the cached client for the configured credentials, creating it if needed"""
+        key = self._get_key()
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached is None or time.monotonic() >= cached[1]:
+                api = MiVideoAPI(
+                    host=settings.MIVIDEO_API_HOST,
+                    authId=settings.MIVIDEO_API_AUTH_ID,
+                    authSecret=settings.MIVIDEO_API_AUTH_SECRET,
+                )
+                cached = (api, self._get_replace_at(api))
+                self._clients[key] = cached
+            return cached[0]
+
+    def get_caption_loader(self, course_id: int, user_id: int) -> KalturaCaptionLoader:
+        """Builds a course's caption loader around the shared client"""
+        return KalturaCaptionLoader(
+            apiClient=self.get_api(),
+            courseId=str(int(course_id)),
+            userId=str(int(user_id)),
+            languages=KalturaCaptionLoader.LANGUAGES_DEFAULT,
+            urlTemplate=getattr(settings, "MIVIDEO_SOURCE_URL_TEMPLATE"),
+            chunkSeconds=int(
+                getattr(
+                    settings,
+                    "MIVIDEO_CHUNK_SECONDS",
+                    KalturaCaptionLoader.CHUNK_SECONDS_DEFAULT,
+                )
+            ),
+        )
+
+    def is_authorized(self, course_id: int) -> bool:
+        """False while a recent 401 for the course is still cooling down"""
+        with self._lock:
+            return time.monotonic() >= self._unauthorized_until.get(
+                (*self._get_key(), course_id), 0
+            )
+
+    def mark_unauthorized(self, course_id: int):
+        """Drops the client, whose token may be stale, and pauses the course's requests"""
+        key = self._get_key()
+        with self._lock:
+            self._clients.pop(key, None)
+            self._unauthorized_until[(*key, course_id)] = (
+                time.monotonic() + self.unauthorized_retry
+            )
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._unauthorized_until.clear()
+
+    def _get_key(self) -> tuple:
+        return (settings.MIVIDEO_API_HOST, settings.MIVIDEO_API_AUTH_ID)
+
+    def _get_replace_at(self, api: MiVideoAPI) -> float:
+        """The monotonic time at which to replace a new client"""
+        expires_at = _get_token_expiry(api)
+        if expires_at is None:
+            return time.monotonic() + self.client_ttl
+        lifetime = expires_at - time.time() - TOKEN_EXPIRY_MARGIN_SECONDS
+        return time.monotonic() + max(lifetime, 0)
+
+
+def _get_token_expiry(api: MiVideoAPI) -> float | None:
+    """The Unix time at which the client's access token expires, read from the
+    `exp` claim of a JWT token, or None if unknown"""
+    for attribute in TOKEN_ATTRIBUTES:
+        token = getattr(api, attribute, None)
+        if isinstance(token, str) and token.count(".") == 2:
+            break
+    else:
+        return None
+    payload = token.split(".")[1]
+    try:
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+    except ValueError:
+        return None
+    expires_at = claims.get("exp") if isinstance(claims, dict) else None
+    return float(expires_at) if isinstance(expires_at, (int, float)) else None
+
+
+_client_pool = None
+_client_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> MiVideoClientPool:
+    """The process-wide pool, created from settings on first use"""
+    global _client_pool
+    with _client_pool_lock:
+        if _client_pool is None:
+            _client_pool = MiVideoClientPool.from_settings()
+        return _client_pool
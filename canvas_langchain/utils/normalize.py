@@ -0,0 +1,99 @@
+"""Single-pass text normalization applied to all document text"""
+
+import re
+import threading
+import unicodedata
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+# word broken across a line end by a hyphen, e.g. "calcu-\nlation"; the word
+# before the break may itself be hyphenated, e.g. "state-of-the-\nart"
+_HYPHENATED_LINE_BREAK = re.compile(
+    r"(?<![\w-])(?P<word>[^\W\d_]+(?:-[^\W\d_]+)*)-[ \t]*\n[ \t]*(?P<next>[^\W\d_])"
+)
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    """Keeps paragraph and line breaks, collapses everything else to one space"""
+    newlines = match.group().count("\n")
+    if newlines > 1:
+        return "\n\n"
+    if newlines == 1:
+        return "\n"
+    return " "
+
+
+def _join_hyphenated_line_break(match: re.Match) -> str:
+    """Joins a lowercase continuation, keeping the hyphen of compound words"""
+    word, next_char = match.group("word"), match.group("next")
+    if not next_char.islower():
+        # "Anglo-\nSaxon", or a list item starting a new line
+        return match.group()
+    if "-" in word:
+        return f"{word}-{next_char}"
+    return f"{word}{next_char}"
+
+
+class TextNormalizer:
+    """Removes NUL bytes, applies Unicode NFC, joins hyphenated line breaks and collapses whitespace.
+
+    NUL bytes are always removed, as documents containing them cannot be stored.
+    """
+
+    def __init__(
+        self,
+        unicode_nfc: bool = True,
+        dehyphenate: bool = True,
+        collapse_whitespace: bool = True,
+    ):
+        self.unicode_nfc = unicode_nfc
+        self.dehyphenate = dehyphenate
+        self.collapse_whitespace = collapse_whitespace
+        self.chars_in = 0
+        self.chars_out = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "TextNormalizer":
+        """Builds a normalizer from the optional CANVAS_TEXT_NORMALIZATION settings dict"""
+        return cls(**getattr(settings, "CANVAS_TEXT_NORMALIZATION", {}))
+
+    def normalize(self, text: str) -> str:
+        """Normalizes one document's text"""
+        normalized = text
+        if "\x00" in normalized:
+            normalized = normalized.replace("\x00", "")
+        if self.unicode_nfc and not unicodedata.is_normalized("NFC", normalized):
+            normalized = unicodedata.normalize("NFC", normalized)
+        if self.dehyphenate:
+            normalized = _HYPHENATED_LINE_BREAK.sub(
+                _join_hyphenated_line_break, normalized
+            )
+        if self.collapse_whitespace:
+            normalized = _WHITESPACE_RUN.sub(_collapse_whitespace, normalized)
+        normalized = normalized.strip()
+
+        with self._lock:
+            self.chars_in += len(text)
+            self.chars_out += len(normalized)
+        return normalized
+
+    def reset_counts(self):
+        """Starts counting characters afresh, e.g. at the start of a load"""
+        with self._lock:
+            self.chars_in = 0
+            self.chars_out = 0
+
+    def get_summary(self) -> str:
+        """Describes the character reduction since the counts were last reset"""
+        saved = self.chars_in - self.chars_out
+        percent = 100 * saved / self.chars_in if self.chars_in else 0
+        return (
+            f"Text normalization reduced {self.chars_in} characters "
+            f"to {self.chars_out} ({percent:.1f}% smaller)"
+        )
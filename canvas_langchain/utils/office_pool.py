@@ -0,0 +1,193 @@
+"""Worker-process pool for CPU-heavy Unstructured office document parsing.
+
+Each worker process runs one task at a time over its own pipe. A task's timeout
+starts once its worker reports that parsing began, and a task that runs over its time kills
+only the worker running it. Other parses in flight are unaffected. A worker that
+does not report within its start timeout is killed the same way.
+"""
+
+import multiprocessing
+import os
+import threading
+
+from langchain.docstore.document import Document
+from langchain_community.document_loaders import (
+    UnstructuredMarkdownLoader,
+    UnstructuredPowerPointLoader,
+)
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+POOL_LOADERS = {
+    "md": UnstructuredMarkdownLoader,
+    "pptx": UnstructuredPowerPointLoader,
+}
+TASK_TIMEOUT_SECONDS_DEFAULT = 300
+START_TIMEOUT_SECONDS_DEFAULT = 120
+TASK_MAX_MEMORY_BYTES_DEFAULT = 2 * 1024 * 1024 * 1024
+TASKS_PER_WORKER = 20
+
+
+class OfficeParseError(Exception):
+    """Raised when a worker times out, runs out of memory or dies while parsing"""
+
+
+def _limit_worker_memory(max_memory_bytes: int | None):
+    """Caps the address space of a worker process so one file cannot exhaust the host"""
+    if max_memory_bytes:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+
+
+def _parse_file(file_type: str, file_path: str) -> list[tuple[str, dict]]:
+    """Runs in a worker: parses one file and returns picklable (text, metadata) pairs"""
+    docs = POOL_LOADERS[file_type](file_path).load()
+    return [(doc.page_content, doc.metadata) for doc in docs]
+
+
+def _run_worker(connection, max_memory_bytes: int | None):
+    """A worker process's loop: parses files sent over `connection` until told to stop"""
+    _limit_worker_memory(max_memory_bytes)
+    while (task := connection.recv()) is not None:
+        connection.send(("started", None))
+        try:
+            connection.send(("ok", _parse_file(*task)))
+        except MemoryError:
+            connection.send(("memory", None))
+        except Exception as err:
+            connection.send(("error", f"{type(err).__name__}: {err}"))
+
+
+class _Worker:
+    def __init__(self, context, max_memory_bytes: int | None):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_run_worker,
+            args=(child_connection, max_memory_bytes),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.tasks = 0
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class OfficeProcessPool:
+    """Parses office documents in worker processes with per-task time and memory limits"""
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        task_timeout: float = TASK_TIMEOUT_SECONDS_DEFAULT,
+        max_memory_bytes: int | None = TASK_MAX_MEMORY_BYTES_DEFAULT,
+        start_timeout: float = START_TIMEOUT_SECONDS_DEFAULT,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.task_timeout = task_timeout
+        self.max_memory_bytes = max_memory_bytes
+        self.start_timeout = start_timeout
+        self._context = multiprocessing.get_context("spawn")
+        # bounds the parses running at once; callers beyond it wait untimed
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self._idle_workers: list[_Worker] = []
+
+    @classmethod
+    def from_settings(cls) -> "OfficeProcessPool":
+        return cls(
+            max_workers=getattr(settings, "CANVAS_OFFICE_POOL_WORKERS", None),
+            task_timeout=getattr(
+                settings,
+                "CANVAS_OFFICE_TASK_TIMEOUT_SECONDS",
+                TASK_TIMEOUT_SECONDS_DEFAULT,
+            ),
+            max_memory_bytes=getattr(
+                settings,
+                "CANVAS_OFFICE_TASK_MAX_MEMORY_BYTES",
+                TASK_MAX_MEMORY_BYTES_DEFAULT,
+            ),
+            start_timeout=getattr(
+                settings,
+                "CANVAS_OFFICE_START_TIMEOUT_SECONDS",
+                START_TIMEOUT_SECONDS_DEFAULT,
+            ),
+        )
+
+    def handles(self, file_type: str) -> bool:
+        return file_type in POOL_LOADERS
+
+    def parse(self, file_type: str, file_path: str) -> list[Document]:
+        """Parses a file in a worker process and rebuilds the documents"""
+        with self._slots:
+            worker = self._get_worker()
+            try:
+                worker.connection.send((file_type, file_path))
+                # a new worker first imports its loaders; the timeout starts after
+                if not worker.connection.poll(self.start_timeout):
+                    raise OfficeParseError(
+                        f"Worker did not start {file_path} within "
+                        f"{self.start_timeout} seconds"
+                    )
+                worker.connection.recv()
+                if not worker.connection.poll(self.task_timeout):
+                    raise OfficeParseError(
+                        f"Parsing {file_path} exceeded {self.task_timeout} seconds"
+                    )
+                status, result = worker.connection.recv()
+            except (EOFError, OSError) as err:
+                worker.kill()
+                raise OfficeParseError(f"Worker died parsing {file_path}: {err}")
+            except BaseException:
+                worker.kill()
+                raise
+            self._return_worker(worker, healthy=status != "memory")
+        if status == "memory":
+            raise OfficeParseError(
+                f"Parsing {file_path} exceeded {self.max_memory_bytes} bytes"
+            )
+        if status == "error":
+            raise OfficeParseError(f"Error parsing {file_path}: {result}")
+        return [
+            Document(page_content=page_content, metadata=metadata)
+            for page_content, metadata in result
+        ]
+
+    def close(self):
+        with self._lock:
+            workers, self._idle_workers = self._idle_workers, []
+        for worker in workers:
+            worker.stop()
+
+    def _get_worker(self) -> _Worker:
+        with self._lock:
+            if self._idle_workers:
+                return self._idle_workers.pop()
+        return _Worker(self._context, self.max_memory_bytes)
+
+    def _return_worker(self, worker: _Worker, healthy: bool = True):
+        """Keeps a worker for the next task, or retires it after TASKS_PER_WORKER
+        tasks (Unstructured leaks memory) or a MemoryError"""
+        worker.tasks += 1
+        if not healthy or worker.tasks >= TASKS_PER_WORKER:
+            worker.stop()
+            return
+        with self._lock:
+            self._idle_workers.append(worker)
@@ -0,0 +1,223 @@
+"""Classifies PDFs from a few kilobytes, before downloading the whole file.
+
+`PdfProbe` fetches the start and end of a PDF with HTTP range requests, and
+the cross-reference section if `startxref` points outside the fetched tail.
+A trailer or cross-reference stream naming `/Encrypt` marks the file as
+encrypted. When no font appears in the fetched bytes, the fetched bytes hold
+every page counted by the page tree, and those pages draw only images, the file
+is taken to be image-only (e.g. a scanned handout), with no text to extract.
+Anything less certain is left for the full download.
+
+Verdicts are cached per file id and `modified_at`, optionally on disk, and the
+outcome of a full download is recorded too, so later loads skip the file
+without any request.
+"""
+
+import re
+import sqlite3
+import threading
+
+from canvasapi.file import File
+from requests import RequestException, Session
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+PROBE_BYTES_DEFAULT = 64 * 1024
+XREF_BYTES = 4096
+
+TEXT = "text"
+ENCRYPTED = "encrypted"
+IMAGE_ONLY = "image_only"
+UNKNOWN = "unknown"
+# verdicts for which the full download is skipped
+SKIPPED_VERDICTS = {ENCRYPTED, IMAGE_ONLY}
+
+ENCRYPT_ENTRY = re.compile(rb"/Encrypt\s*(?:\d+\s+\d+\s+R|<<)")
+STARTXREF = re.compile(rb"startxref\s+(\d+)")
+PAGE_OBJECT = re.compile(
+    rb"(\d+)\s+(\d+)\s+obj\s*<<(?:(?!endobj).)*?/Type\s*/Page\b", re.DOTALL
+)
+PAGE_TREE_OBJECT = re.compile(
+    rb"\d+\s+\d+\s+obj\s*<<(?:(?!endobj).)*?/Type\s*/Pages\b", re.DOTALL
+)
+# a direct page count; one held in another object is not followed
+PAGE_COUNT = re.compile(rb"/Count\s+(\d+)(?!\s+\d+\s+R)")
+RESOURCES_REFERENCE = re.compile(rb"/Resources\s+(\d+)\s+(\d+)\s+R")
+IMAGE_XOBJECT = re.compile(rb"/Subtype\s*/Image\b")
+
+
+def classify_pdf(sample: bytes) -> str:
+    """Classifies a PDF from bytes taken from its start, end and xref section.
+
+    Image-only is a judgement on the page objects in the sample: none of the
+    sampled bytes may mention a font, the sample must hold as many pages as the
+    root of the page tree counts, and each page must draw images.
+    """
+    if ENCRYPT_ENTRY.search(sample):
+        return ENCRYPTED
+    if b"/Font" in sample:
+        return TEXT
+    # fonts packed into compressed object streams would not show up above
+    if b"/ObjStm" in sample or not IMAGE_XOBJECT.search(sample):
+        return UNKNOWN
+    # an object rewritten by an incremental update counts once, as its last copy
+    pages = {
+        match.groups(): sample[match.start() : sample.find(b"endobj", match.end())]
+        for match in PAGE_OBJECT.finditer(sample)
+    }
+    page_count = _get_page_count(sample)
+    if not pages or page_count is None or len(pages) < page_count:
+        return UNKNOWN
+    for page in pages.values():
+        if reference := RESOURCES_REFERENCE.search(page):
+            number, generation = reference.groups()
+            start = sample.find(b"%s %s obj" % (number, generation))
+            if start == -1:
+                return UNKNOWN
+            page = sample[start : sample.find(b"endobj", start)]
+        if b"/XObject" not in page:
+            return UNKNOWN
+    return IMAGE_ONLY
+
+
+def _get_page_count(sample: bytes) -> int | None:
+    """The page count of the last page tree root in the sample, if any"""
+    page_count = None
+    for match in PAGE_TREE_OBJECT.finditer(sample):
+        tree = sample[match.start() : sample.find(b"endobj", match.end())]
+        # intermediate nodes of the tree name their parent
+        if b"/Parent" in tree:
+            continue
+        count = PAGE_COUNT.search(tree)
+        page_count = int(count.group(1)) if count else None
+    return page_count
+
+
+class PdfProbe:
+    def __init__(
+        self,
+        session: Session,
+        access_token: str,
+        cache_path: str | None = None,
+        probe_bytes: int = PROBE_BYTES_DEFAULT,
+    ):
+        """Probes PDF downloads with `session`; `cache_path` keeps verdicts on disk"""
+        self.session = session
+        self.access_token = access_token
+        self.probe_bytes = probe_bytes
+        self.probes = 0
+        self._verdicts = {}
+        self._lock = threading.Lock()
+        self._connection = None
+        if cache_path:
+            self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS pdf_verdicts ("
+                "file_id INTEGER, modified_at TEXT, verdict TEXT, "
+                "PRIMARY KEY (file_id, modified_at))"
+            )
+            self._connection.commit()
+
+    @classmethod
+    def from_settings(cls, session: Session, access_token: str) -> "PdfProbe":
+        return cls(
+            session,
+            access_token,
+            cache_path=getattr(settings, "CANVAS_PDF_PROBE_CACHE_PATH", None),
+            probe_bytes=getattr(
+                settings, "CANVAS_PDF_PROBE_BYTES", PROBE_BYTES_DEFAULT
+            ),
+        )
+
+    def probe(self, file: File) -> str:
+        """Returns the cached verdict for `file`, probing it on a cache miss"""
+        verdict = self.get_verdict(file)
+        if verdict is not None:
+            return verdict
+        size = getattr(file, "size", 0) or 0
+        # small files cost about as much to download as to probe
+        if size <= 2 * self.probe_bytes:
+            return UNKNOWN
+        try:
+            verdict = self._probe(file.url, size)
+        except RequestException:
+            return UNKNOWN
+        if verdict != UNKNOWN:
+            self.record(file, verdict)
+        return verdict
+
+    def get_verdict(self, file: File) -> str | None:
+        key = self._get_key(file)
+        with self._lock:
+            if key in self._verdicts:
+                return self._verdicts[key]
+            if self._connection is None:
+                return None
+            row = self._connection.execute(
+                "SELECT verdict FROM pdf_verdicts WHERE file_id = ? AND modified_at = ?",
+                key,
+            ).fetchone()
+            if row:
+                self._verdicts[key] = row[0]
+                return row[0]
+        return None
+
+    def record(self, file: File, verdict: str):
+        """Caches a verdict, e.g. one learned from a full download"""
+        key = self._get_key(file)
+        with self._lock:
+            self._verdicts[key] = verdict
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO pdf_verdicts VALUES (?, ?, ?)",
+                    (*key, verdict),
+                )
+                self._connection.commit()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _probe(self, url: str, size: int) -> str:
+        self.probes += 1
+        head = self._read_range(url, f"bytes=0-{self.probe_bytes - 1}")
+        if head is None or b"%PDF-" not in head[:1024]:
+            return UNKNOWN
+        tail = self._read_range(url, f"bytes=-{self.probe_bytes}")
+        if tail is None:
+            return UNKNOWN
+        sample = head + tail
+        startxref = STARTXREF.findall(tail)
+        if startxref:
+            offset = int(startxref[-1])
+            if self.probe_bytes <= offset < size - self.probe_bytes:
+                xref = self._read_range(
+                    url, f"bytes={offset}-{offset + XREF_BYTES - 1}"
+                )
+                sample += xref or b""
+        return classify_pdf(sample)
+
+    def _read_range(self, url: str, byte_range: str) -> bytes | None:
+        """Fetches a byte range, or None if the server ignores range requests"""
+        with self.session.get(
+            url,
+            headers={
+                "Range": byte_range,
+                "Authorization": f"Bearer {self.access_token}",
+            },
+            stream=True,
+        ) as response:
+            if response.status_code != 206:
+                return None
+            return response.raw.read(self.probe_bytes + XREF_BYTES, decode_content=True)
+
+    def _get_key(self, file: File) -> tuple[int, str]:
+        modified_at = getattr(file, "modified_at", None) or getattr(
+            file, "updated_at", ""
+        )
+        return file.id, str(modified_at)
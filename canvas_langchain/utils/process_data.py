@@ -3,6 +3,7 @@
 from urllib.parse import urlparse
 
 from canvas_langchain.sections.mivideo import MiVideoLoader
+from canvas_langchain.utils.document_ids import get_item_key
 from canvas_langchain.utils.logging import Logger
 from langchain.docstore.document import Document
 
@@ -26,13 +27,15 @@ def load_embed_urls(
         if mivideo_media_id := get_media_id(url, logger=mivideo_loader.logger):
             docs.extend(mivideo_loader.load_section(mivideo_id=mivideo_media_id))
 
+    # built once and shared by every caption chunk
+    embedding_item = {
+        "filename": str(metadata["data"]["filename"]),
+        "course_context": str(metadata["data"]["source"]),
+        # captions are visible to whoever can see the item embedding them
+        "embedded_in": get_item_key(metadata["data"]["kind"], metadata["data"]["id"]),
+    }
     for doc in docs:
-        doc.metadata.update(
-            {
-                "filename": str(metadata["data"]["filename"]),
-                "course_context": str(metadata["data"]["source"]),
-            }
-        )
+        doc.metadata.update(embedding_item)
     return docs
 
 
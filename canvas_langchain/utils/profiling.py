@@ -0,0 +1,163 @@
+"""Opt-in profiling of a course load as a tree of timed spans.
+
+Spans nest section -> item -> download/parse/caption. The tree can be exported
+as a Chrome trace (chrome://tracing, Perfetto, speedscope) or as collapsed
+stacks for flamegraph.pl, and a sample of items can also be run under cProfile.
+"""
+
+import cProfile
+import itertools
+import json
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class Span:
+    __slots__ = ("name", "category", "parent", "start", "end", "thread_id")
+
+    def __init__(self, name: str, category: str, parent: "Span | None"):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def path(self) -> list[str]:
+        names = []
+        span = self
+        while span is not None:
+            names.append(span.name)
+            span = span.parent
+        return names[::-1]
+
+
+class LoadProfiler:
+    def __init__(self, cprofile_sample_rate: float = 0.0):
+        """`cprofile_sample_rate` is the fraction of items also run under cProfile"""
+        self.spans: list[Span] = []
+        self.cprofile_every = (
+            round(1 / cprofile_sample_rate) if cprofile_sample_rate else 0
+        )
+        self.cprofile_stats = None
+        self._item_counter = itertools.count()
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[Span]:
+        """Times a block as a child of the current span on this thread"""
+        parent = getattr(self._local, "current", None)
+        span = Span(name, category, parent)
+        with self._lock:
+            self.spans.append(span)
+        self._local.current = span
+        profile = self._start_cprofile() if category == "item" else None
+        try:
+            yield span
+        finally:
+            if profile is not None:
+                self._stop_cprofile(profile)
+            span.end = time.perf_counter()
+            self._local.current = parent
+
+    def wrap(self, name: str, category: str, fn: Callable) -> Callable:
+        """Wraps `fn` in a span that nests under the current span even when `fn`
+        runs on another thread (e.g. an item running under a timeout)"""
+        parent = getattr(self._local, "current", None)
+
+        def run_in_span(*args, **kwargs):
+            previous = getattr(self._local, "current", None)
+            self._local.current = parent
+            try:
+                with self.span(name, category):
+                    return fn(*args, **kwargs)
+            finally:
+                self._local.current = previous
+
+        return run_in_span
+
+    def top_items(self, count: int = 10) -> list[tuple[str, float]]:
+        """The slowest items as (key, seconds) pairs"""
+        items = [span for span in self.spans if span.category == "item"]
+        items.sort(key=lambda span: span.duration, reverse=True)
+        return [(span.name, span.duration) for span in items[:count]]
+
+    def to_chrome_trace(self) -> dict:
+        """Trace Event Format, readable by chrome://tracing, Perfetto and speedscope"""
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start - self._origin) * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": 1,
+                    "tid": span.thread_id,
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def to_collapsed_stacks(self) -> str:
+        """Brendan Gregg's collapsed stack format, weighted by self time in microseconds"""
+        child_time = {}
+        for span in self.spans:
+            if span.parent is not None:
+                child_time[id(span.parent)] = (
+                    child_time.get(id(span.parent), 0) + span.duration
+                )
+        weights = {}
+        for span in self.spans:
+            stack = ";".join(name.replace(";", ",") for name in span.path())
+            self_time = max(span.duration - child_time.get(id(span), 0), 0)
+            weights[stack] = weights.get(stack, 0) + self_time
+        return "\n".join(
+            f"{stack} {int(seconds * 1e6)}" for stack, seconds in weights.items()
+        )
+
+    def export(self, path: str):
+        """Writes a Chrome trace (`.json`) or collapsed stacks (any other extension)"""
+        with open(path, "w") as export_file:
+            if path.endswith(".json"):
+                json.dump(self.to_chrome_trace(), export_file)
+            else:
+                export_file.write(self.to_collapsed_stacks())
+
+    def export_cprofile(self, path: str):
+        """Writes the sampled cProfile data, e.g. for snakeviz or flameprof"""
+        if self.cprofile_stats is not None:
+            self.cprofile_stats.dump_stats(path)
+
+    def _start_cprofile(self) -> cProfile.Profile | None:
+        # only one profiler can run per thread, so nested items are not sampled
+        if not self.cprofile_every or getattr(self._local, "profiling", False):
+            return None
+        if next(self._item_counter) % self.cprofile_every:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        self._local.profiling = True
+        return profile
+
+    def _stop_cprofile(self, profile: cProfile.Profile):
+        profile.disable()
+        self._local.profiling = False
+        with self._lock:
+            if self.cprofile_stats is None:
+                self.cprofile_stats = pstats.Stats(profile)
+            else:
+                self.cprofile_stats.add(profile)
@@ -0,0 +1,101 @@
+"""Orders course loading so cheap, high-value content is emitted first"""
+
+import heapq
+import itertools
+import threading
+from typing import Callable, Iterator
+
+from langchain.docstore.document import Document
+
+# compatible with isolated and integrated testing
+try:
+    from django.conf import settings
+except ImportError:
+    import settings
+
+# lower loads first; tabs not listed here load last, in Canvas order
+SECTION_PRIORITIES = {
+    "Syllabus": 0,
+    "Announcements": 1,
+    "Pages": 2,
+    "Assignments": 3,
+    "Modules": 4,
+    "Files": 5,
+    "Media Gallery": 6,
+}
+LARGE_ITEM_BYTES_DEFAULT = 10 * 1024 * 1024
+EMBEDDED_MEDIA_COST_BYTES_DEFAULT = 20 * 1024 * 1024
+
+
+def order_tabs(tab_names: list[str]) -> list[str]:
+    """Sorts Canvas tabs by section priority"""
+    return sorted(
+        tab_names,
+        key=lambda name: SECTION_PRIORITIES.get(name, len(SECTION_PRIORITIES)),
+    )
+
+
+class WorkScheduler:
+    """Orders items by value, and holds a separate lane of expensive item loads,
+    run smallest first after everything else"""
+
+    def __init__(
+        self,
+        large_item_bytes: int | None = LARGE_ITEM_BYTES_DEFAULT,
+        embedded_media_cost: int = EMBEDDED_MEDIA_COST_BYTES_DEFAULT,
+        defer_expensive: bool = True,
+    ):
+        self.large_item_bytes = large_item_bytes
+        self.embedded_media_cost = embedded_media_cost
+        self.defer_expensive = defer_expensive
+        self._lane = []
+        self._deferred_keys = set()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, defer_expensive: bool = True) -> "WorkScheduler":
+        return cls(
+            defer_expensive=defer_expensive,
+            large_item_bytes=getattr(
+                settings, "CANVAS_LARGE_ITEM_BYTES", LARGE_ITEM_BYTES_DEFAULT
+            ),
+            embedded_media_cost=getattr(
+                settings,
+                "CANVAS_EMBEDDED_MEDIA_COST_BYTES",
+                EMBEDDED_MEDIA_COST_BYTES_DEFAULT,
+            ),
+        )
+
+    def is_expensive(self, cost: int | None) -> bool:
+        """True when an item of this expected cost (in bytes) belongs in the expensive lane"""
+        return (
+            self.defer_expensive
+            and self.large_item_bytes is not None
+            and (cost or 0) > self.large_item_bytes
+        )
+
+    def order_announcements(self, announcements) -> list:
+        """Sorts announcements newest first; undated ones go last"""
+        return sorted(
+            announcements,
+            key=lambda announcement: getattr(announcement, "posted_at", None) or "",
+            reverse=True,
+        )
+
+    def defer(self, key: str, cost: int, load_fn: Callable[[], list[Document]]):
+        """Queues an item load in the expensive lane; keys already queued are ignored"""
+        with self._lock:
+            if key in self._deferred_keys:
+                return
+            self._deferred_keys.add(key)
+            heapq.heappush(self._lane, (cost, next(self._counter), key, load_fn))
+
+    def drain(self) -> Iterator[tuple[str, Callable[[], list[Document]]]]:
+        """Yields deferred (key, load_fn) pairs, cheapest first"""
+        while True:
+            with self._lock:
+                if not self._lane:
+                    return
+                _, _, key, load_fn = heapq.heappop(self._lane)
+            yield key, load_fn
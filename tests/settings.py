@@ -0,0 +1,7 @@
+"""Settings for running the tests without Django"""
+
+CANVAS_COURSE_URL_TEMPLATE = "https://canvas.example.edu/courses/{courseId}"
+MIVIDEO_API_HOST = "mivideo.example.edu"
+MIVIDEO_API_AUTH_ID = "test"
+MIVIDEO_API_AUTH_SECRET = "test"
+MIVIDEO_SOURCE_URL_TEMPLATE = "https://mivideo.example.edu/media/{mediaId}"
@@ -0,0 +1,45 @@
+"""Content budget: files kept by the keep policy wherever they are loaded from"""
+
+from types import SimpleNamespace
+
+from canvas_langchain.utils.budget import ContentBudget
+
+
+def get_files() -> dict[str, SimpleNamespace]:
+    return {
+        "File:1": SimpleNamespace(size=60, updated_at="2024-01-01T00:00:00Z"),
+        "File:2": SimpleNamespace(size=50, updated_at="2024-03-01T00:00:00Z"),
+        "File:3": SimpleNamespace(size=30, updated_at="2024-02-01T00:00:00Z"),
+    }
+
+
+def test_most_recent_files_are_kept_in_any_load_order():
+    budget = ContentBudget(max_download_bytes=100)
+    budget.plan_downloads(get_files())
+
+    # File:1 is reached first, e.g. through a module, but is the oldest
+    assert not budget.take_download("File:1", 60)
+    assert budget.take_download("File:3", 30)
+    assert budget.take_download("File:2", 50)
+    assert budget.truncated_items == [{"key": "File:1", "reason": "max_download_bytes"}]
+
+
+def test_unlisted_files_get_what_planned_files_leave():
+    budget = ContentBudget(max_download_bytes=100, keep="smallest_first")
+    budget.plan_downloads(get_files())
+
+    assert not budget.take_download("File:9", 25)
+    assert budget.take_download("File:9", 20)
+
+
+def test_retried_download_is_not_charged_again():
+    budget = ContentBudget(max_download_bytes=100)
+    budget.plan_downloads(get_files())
+
+    assert budget.take_download("File:2", 50)
+    # a retry after the first attempt timed out
+    assert budget.take_download("File:2", 50)
+    assert budget.take_download("File:9", 20)
+    assert budget.take_download("File:9", 20)
+    assert budget.download_bytes == 70
+    assert budget.truncated_items == []
@@ -0,0 +1,74 @@
+"""GraphQL getters and the page loader against recorded Canvas responses"""
+
+import os
+from types import SimpleNamespace
+
+from canvas_langchain.base import BaseSectionLoaderVars
+from canvas_langchain.client_graphql import (
+    CanvasGraphQLGetters,
+    RecordedGraphQLTransport,
+)
+from canvas_langchain.sections.pages import PageLoader
+from canvas_langchain.utils.claims import ClaimSet
+from canvas_langchain.utils.logging import Logger
+
+RECORDING = os.path.join(os.path.dirname(__file__), "fixtures", "graphql_course.json")
+COURSE_API = "https://canvas.example.edu/api/v1/courses/101/"
+
+
+def get_getters() -> CanvasGraphQLGetters:
+    return CanvasGraphQLGetters(
+        canvas=None,
+        course=SimpleNamespace(id=101),
+        logger=Logger(),
+        transport=RecordedGraphQLTransport(RECORDING),
+    )
+
+
+def test_pages_carry_lock_state_and_skip_unpublished():
+    pages = get_getters().get_pages()
+
+    assert [(page.url, page.locked_for_user) for page in pages] == [
+        ("welcome", False),
+        ("answers", True),
+    ]
+
+
+def test_modules_follow_cursors():
+    getters = get_getters()
+    modules = getters.get_modules()
+
+    assert [module.name for module in modules] == ["Week 1", "Week 2"]
+    assert modules[1].unlock_at == "2030-01-01T10:00:00Z"
+    assert [(item.type, item.content_id) for item in modules[1].get_module_items()] == [
+        ("File", 30),
+        ("ExternalUrl", 53),
+    ]
+    assert modules[1].get_module_items()[1].external_url == "https://docs.example.edu"
+    assert getters.graphql_requests == 2
+
+
+def test_assignments_use_rest_shapes():
+    assignment = get_getters().get_assignment(20)
+
+    assert assignment.name == "Essay"
+    assert assignment.due_at == "2024-03-02T04:59:00Z"
+
+
+def test_page_loader_skips_locked_pages():
+    getters = get_getters()
+    loader = PageLoader(
+        BaseSectionLoaderVars(
+            canvas_client_extractor=getters,
+            indexed_items=ClaimSet(),
+            logger=getters.logger,
+            mivideo_loader=None,
+            should_load_mivideo=False,
+        ),
+        course_api=COURSE_API,
+    )
+
+    docs = loader.load_section()
+
+    assert [doc.metadata["doc_id"] for doc in docs] == ["page:10:0"]
+    assert docs[0].metadata["source"] == f"{COURSE_API}pages/welcome"
@@ -0,0 +1,62 @@
+"""Compact per-item document storage"""
+
+from canvas_langchain.utils.compact import CompactDocumentStore, CompactItem
+from langchain.docstore.document import Document
+
+
+def get_pages() -> list[Document]:
+    docs = [
+        Document(
+            page_content=f"page {page}",
+            metadata={
+                "filename": "notes.pdf",
+                "source": "https://x/courses/1/files/4",
+                "kind": "file",
+                "page": page,
+                "doc_id": f"file:4:{page}",
+                "headings": ["Week 1"],
+            },
+        )
+        for page in range(3)
+    ]
+    # a key only one page has
+    docs[1].metadata["embedded_in"] = "File:4"
+    return docs
+
+
+def test_item_round_trips_texts_metadata_and_ids():
+    docs = get_pages()
+
+    rebuilt = list(CompactItem(docs))
+
+    assert [doc.page_content for doc in rebuilt] == [doc.page_content for doc in docs]
+    assert [doc.metadata for doc in rebuilt] == [doc.metadata for doc in docs]
+    if hasattr(rebuilt[0], "id"):
+        assert [doc.id for doc in rebuilt] == ["file:4:0", "file:4:1", "file:4:2"]
+
+
+def test_rebuilt_documents_do_not_share_mutable_metadata():
+    docs = get_pages()
+    item = CompactItem(docs)
+    docs[0].metadata["headings"].append("changed")
+
+    first, second, _ = item
+
+    assert first.metadata["headings"] == ["Week 1"]
+    assert first.metadata["headings"] is not second.metadata["headings"]
+
+
+def test_store_drains_items_in_order():
+    store = CompactDocumentStore()
+    store.append(get_pages())
+    store.append([])
+    store.append([Document(page_content="syllabus", metadata={"doc_id": "syllabus"})])
+
+    assert len(store) == 4
+    assert [doc.page_content for doc in store.drain()] == [
+        "page 0",
+        "page 1",
+        "page 2",
+        "syllabus",
+    ]
+    assert len(store) == 0
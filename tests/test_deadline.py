@@ -0,0 +1,42 @@
+"""Load deadline: timeouts, abandoned items and empty budgets"""
+
+import threading
+
+from canvas_langchain.utils.claims import ClaimSet
+from canvas_langchain.utils.deadline import LoadDeadline
+
+
+def test_zero_budget_skips_everything():
+    deadline = LoadDeadline(time_budget=0)
+
+    assert deadline.run("Page:1", lambda: ["loaded"]) == []
+    assert deadline.skipped_items == [
+        {"key": "Page:1", "reason": "time_budget_exhausted"}
+    ]
+
+
+def test_abandoned_item_releases_and_stops_claiming():
+    claims = ClaimSet({"Assignment:1"})
+    release = threading.Event()
+    later_claims = []
+
+    def load():
+        claims.claim("MiVideo:0_abc")
+        release.wait(5)
+        later_claims.append(claims.claim("File:2"))
+        return ["loaded"]
+
+    deadline = LoadDeadline(item_timeout=0.05, max_workers=1)
+    try:
+        assert deadline.run("Assignment:1", load, claims=claims) == []
+        assert claims == set()
+        assert deadline.skipped_items == [
+            {"key": "Assignment:1", "reason": "item_timeout"}
+        ]
+        release.set()
+        # the next item waits for the pool's only thread, so for the first to end
+        assert deadline.run("Page:3", lambda: ["page"]) == ["page"]
+    finally:
+        deadline.close()
+    assert later_claims == [False]
+    assert claims == set()
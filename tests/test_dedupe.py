@@ -0,0 +1,20 @@
+"""Content deduplication across sections and resumed loads"""
+
+from canvas_langchain.utils.dedupe import ContentDeduplicator
+from langchain.docstore.document import Document
+
+
+def get_doc(doc_id: str, source: str) -> Document:
+    return Document(
+        page_content="hello world", metadata={"doc_id": doc_id, "source": source}
+    )
+
+
+def test_seeded_content_is_not_emitted_again():
+    deduplicator = ContentDeduplicator()
+    deduplicator.seed([get_doc("file:4:0", "https://x/files/4")])
+
+    assert deduplicator.filter([get_doc("announcement:30:0", "https://x/n/30")]) == []
+    assert deduplicator.duplicate_sources == {"file:4:0": ["https://x/n/30"]}
+    # the replayed document itself stays emittable
+    assert len(deduplicator.filter([get_doc("file:4:0", "https://x/files/4")])) == 1
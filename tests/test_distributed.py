@@ -0,0 +1,123 @@
+"""Distributed loading through a local SQLite work queue"""
+
+import threading
+from types import SimpleNamespace
+
+from canvas_langchain.distributed import (
+    CourseCoordinator,
+    QueueWorker,
+    SQLiteWorkQueue,
+    WorkItem,
+)
+from canvas_langchain.utils.claims import SQLiteClaimStore
+from canvas_langchain.utils.dedupe import ContentDeduplicator
+from canvas_langchain.utils.logging import Logger
+from langchain.docstore.document import Document
+
+COURSE_ID = 101
+PAGES = [
+    SimpleNamespace(page_id=page_id, url=f"page-{page_id}") for page_id in range(4)
+]
+
+
+def get_worker(path: str, worker_id: str, loaded: list) -> QueueWorker:
+    def load_page(page):
+        loaded.append((worker_id, page.url))
+        return [Document(page_content=page.url, metadata={"doc_id": page.url})]
+
+    extractor = SimpleNamespace(
+        get_page=lambda url: next(page for page in PAGES if page.url == url)
+    )
+    return QueueWorker(
+        work_queue=SQLiteWorkQueue(path),
+        course_id=COURSE_ID,
+        loaders={
+            "Pages": SimpleNamespace(_load_item=load_page),
+            "Syllabus": SimpleNamespace(
+                _load_item=lambda: [Document(page_content="syllabus")]
+            ),
+        },
+        canvas_client=SimpleNamespace(rest_extractor=extractor),
+        claim_store=SQLiteClaimStore(path, COURSE_ID),
+        logger=Logger(),
+        worker_id=worker_id,
+    )
+
+
+def enqueue(path: str) -> int:
+    canvas_client = SimpleNamespace(
+        content_extractor=SimpleNamespace(get_pages=lambda: PAGES),
+        get_available_tabs=lambda: ["Syllabus", "Pages"],
+    )
+    coordinator = CourseCoordinator(canvas_client, Logger())
+    return SQLiteWorkQueue(path).put(COURSE_ID, coordinator.get_work_items())
+
+
+def test_two_workers_drain_the_queue_once(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    assert enqueue(path) == 5
+    # a second coordinator adds nothing
+    assert enqueue(path) == 0
+
+    loaded = []
+    workers = [get_worker(path, worker_id, loaded) for worker_id in ("a", "b")]
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    queue = SQLiteWorkQueue(path)
+    assert queue.counts(COURSE_ID) == {
+        "pending": 0,
+        "claimed": 0,
+        "done": 5,
+        "failed": 0,
+    }
+    assert sorted(url for _, url in loaded) == [page.url for page in PAGES]
+    assert [doc.page_content for doc in queue.documents(COURSE_ID)] == [
+        "syllabus",
+        *(page.url for page in PAGES),
+    ]
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    queue = SQLiteWorkQueue(path, lease_seconds=0)
+    queue.put(
+        COURSE_ID, [WorkItem(key="Page:0", kind="page", payload={"url": "page-0"})]
+    )
+    # this worker dies without completing its item
+    assert queue.claim(COURSE_ID, "dead").attempts == 1
+
+    loaded = []
+    assert get_worker(path, "alive", loaded).run() == 1
+
+    assert loaded == [("alive", "page-0")]
+    assert queue.counts(COURSE_ID)["done"] == 1
+
+
+def test_claims_belong_to_their_work_item(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    first, second = (SQLiteClaimStore(path, COURSE_ID) for _ in range(2))
+    first.owner, second.owner = "Page:0", "Page:1"
+
+    assert first.claim("File:3")
+    assert not second.claim("File:3")
+    # a retry of the same work item may claim its keys again
+    assert first.claim("File:3")
+    first.release("File:3")
+    assert second.claim("File:3")
+
+
+def test_content_is_deduplicated_across_workers(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    stores = [SQLiteClaimStore(path, COURSE_ID) for _ in range(2)]
+    stores[0].owner, stores[1].owner = "File:4", "Announcement:30"
+    doc = Document(page_content="hello world", metadata={"doc_id": "file:4:0"})
+    copy = Document(
+        page_content="hello world", metadata={"doc_id": "announcement:30:0"}
+    )
+
+    assert ContentDeduplicator(claims=stores[0]).filter([doc]) == [doc]
+    assert ContentDeduplicator(claims=stores[1]).filter([copy]) == []
@@ -0,0 +1,41 @@
+"""Stable document ids and the item keys they map back to"""
+
+from canvas_langchain.utils.document_ids import (
+    assign_document_ids,
+    get_content_hash,
+    get_document_id,
+    get_item_key,
+)
+from langchain.docstore.document import Document
+
+
+def test_ids_number_an_item_s_documents():
+    docs = [Document(page_content=text, metadata={}) for text in ("one", "two")]
+
+    assign_document_ids(docs, kind="file", item_id=4, start_index=3)
+
+    assert [doc.metadata["doc_id"] for doc in docs] == ["file:4:3", "file:4:4"]
+    assert docs[0].metadata["content_hash"] == get_content_hash("one")
+    if hasattr(docs[0], "id"):
+        assert [doc.id for doc in docs] == ["file:4:3", "file:4:4"]
+
+
+def test_ids_are_stable_across_loads():
+    first = assign_document_ids(
+        [Document(page_content="same", metadata={})], "page", 12
+    )
+    second = assign_document_ids(
+        [Document(page_content="same", metadata={})], "page", 12
+    )
+
+    assert first[0].metadata == second[0].metadata
+    assert get_content_hash("same") != get_content_hash("same ")
+
+
+def test_item_keys_name_the_canvas_item():
+    assert (
+        get_document_id("external_url", "https://x/a") == "external_url:https://x/a:0"
+    )
+    assert get_item_key("external_url", "https://x/a") == "ExtUrl:https://x/a"
+    assert get_item_key("assignment", 20) == "Assignment:20"
+    assert get_item_key("syllabus", "") == "Syllabus"
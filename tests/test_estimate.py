@@ -0,0 +1,101 @@
+"""Dry-run course estimates from list calls"""
+
+from types import SimpleNamespace
+
+from canvas_langchain.estimate import CourseEstimator
+
+LOGGER = SimpleNamespace(logStatement=lambda **kwargs: None)
+MEDIA_IFRAME = (
+    '<iframe src="https://x/courses/1/external_tools/retrieve'
+    '?resource_link_lookup_uuid=abc"></iframe>'
+)
+
+
+def get_client(tabs: set[str]):
+    session = SimpleNamespace(hooks={"response": []})
+
+    def listing(url: str, items):
+        """Stands in for a list request, reporting it to the response hooks"""
+
+        def list_fn():
+            for hook in session.hooks["response"]:
+                hook(SimpleNamespace(url=url))
+            return items
+
+        return list_fn
+
+    def get_file(file_id: int, content_type: str, size: int):
+        return SimpleNamespace(id=file_id, size=size, **{"content-type": content_type})
+
+    module_items = [
+        SimpleNamespace(type="Page", content_id=None),
+        SimpleNamespace(type="File", content_id=1),
+        # not in the file list, e.g. a file hidden from the Files tab
+        SimpleNamespace(type="File", content_id=3),
+        SimpleNamespace(type="ExternalUrl", content_id=None),
+    ]
+    extractor = SimpleNamespace(
+        get_course_id=lambda: 1,
+        get_syllabus=listing("syllabus", "<p>Welcome</p>"),
+        get_announcements=listing(
+            "announcements",
+            [SimpleNamespace(message=MEDIA_IFRAME), SimpleNamespace(message="")],
+        ),
+        get_pages=listing("pages", [SimpleNamespace(body=None)]),
+        get_assignments=listing("assignments", [SimpleNamespace(description="Do")]),
+        get_files=listing(
+            "files",
+            [get_file(1, "application/pdf", 100), get_file(2, "video/mp4", 5000)],
+        ),
+        get_modules=listing(
+            "modules",
+            [SimpleNamespace(get_module_items=listing("items", module_items))],
+        ),
+    )
+    return SimpleNamespace(
+        rest_extractor=extractor,
+        get_session=lambda: session,
+        get_available_tabs=lambda: tabs,
+    )
+
+
+def test_estimate_counts_items_downloads_and_api_calls():
+    client = get_client(
+        {
+            "Syllabus",
+            "Announcements",
+            "Pages",
+            "Assignments",
+            "Files",
+            "Modules",
+            "Media Gallery",
+        }
+    )
+
+    estimate = CourseEstimator(client, LOGGER).estimate()
+
+    assert estimate.item_counts == {
+        "Syllabus": 1,
+        "Announcements": 2,
+        "Pages": 1,
+        "Assignments": 1,
+        "Files": 2,
+        "Modules": 1,
+        "Module items": 4,
+    }
+    assert estimate.files_by_content_type == {"application/pdf": 1, "video/mp4": 1}
+    assert estimate.bytes_by_content_type == {"application/pdf": 100, "video/mp4": 5000}
+    # only loadable content types are downloaded
+    assert (estimate.downloads, estimate.download_bytes) == (1, 100)
+    assert estimate.unsized_downloads == 1
+    assert (estimate.embedded_media, estimate.media_gallery) == (1, True)
+    # 7 listings, 1 media lookup, 3 module items fetched by id and the user id
+    assert estimate.estimate_api_calls == 7
+    assert estimate.api_calls == 12
+
+
+def test_hidden_tabs_are_not_listed():
+    estimate = CourseEstimator(get_client({"Pages"}), LOGGER).estimate()
+
+    assert estimate.item_counts == {"Pages": 1}
+    assert (estimate.api_calls, estimate.media_gallery) == (1, False)
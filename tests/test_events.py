@@ -0,0 +1,98 @@
+"""Event processing: acknowledgement, deletions and caption replacement"""
+
+from types import SimpleNamespace
+
+import pytest
+from canvas_langchain.events import (
+    CanvasEventProcessor,
+    InMemoryEventSource,
+)
+from canvas_langchain.utils.claims import ClaimSet
+from canvas_langchain.utils.logging import Logger
+from canvasapi.exceptions import CanvasException, ResourceDoesNotExist
+
+
+class RecordingSource(InMemoryEventSource):
+    def __init__(self):
+        super().__init__()
+        self.acked = []
+
+    def ack(self, event):
+        self.acked.append(event)
+
+
+def get_processor(get_assignment, indexed_items=None) -> CanvasEventProcessor:
+    extractor = SimpleNamespace(
+        get_course_id=lambda: 101, get_assignment=get_assignment
+    )
+    loaders = {"Assignments": SimpleNamespace(_load_item=lambda assignment: [])}
+    return CanvasEventProcessor(
+        loaders=loaders,
+        canvas_client_extractor=extractor,
+        indexed_items=indexed_items if indexed_items is not None else ClaimSet(),
+        logger=Logger(),
+    )
+
+
+def assignment_event(source: RecordingSource, course_id="101"):
+    source.put(
+        {
+            "event_name": "assignment_updated",
+            "course_id": course_id,
+            "body": {"assignment_id": 20},
+        }
+    )
+
+
+def test_failed_event_is_returned_to_the_source():
+    def get_assignment(assignment_id):
+        raise CanvasException("connection reset")
+
+    source = RecordingSource()
+    assignment_event(source)
+
+    with pytest.raises(CanvasException):
+        list(get_processor(get_assignment).run(source, idle_timeout=0))
+
+    assert source.acked == []
+    assert source.get(timeout=0).body == {"assignment_id": 20}
+
+
+def test_missing_item_deletes_its_documents():
+    def get_assignment(assignment_id):
+        raise ResourceDoesNotExist("Not Found")
+
+    source = RecordingSource()
+    assignment_event(source)
+
+    (update,) = get_processor(get_assignment).run(source, idle_timeout=0)
+
+    assert update.deleted_id_prefixes == ["assignment:20:"]
+    assert update.deleted_embedded_in == ["Assignment:20"]
+    assert update.documents == []
+    assert len(source.acked) == 1
+
+
+def test_reload_releases_embedded_media_claims():
+    indexed_items = ClaimSet({"Assignment:20", "MiVideo:0_abc", "File:3"})
+    source = RecordingSource()
+    assignment_event(source)
+
+    list(
+        get_processor(lambda assignment_id: None, indexed_items).run(
+            source, idle_timeout=0
+        )
+    )
+
+    assert indexed_items == {"File:3"}
+
+
+def test_integer_course_id_is_handled():
+    loaded = []
+    source = RecordingSource()
+    assignment_event(source, course_id=101)
+
+    (update,) = get_processor(loaded.append).run(source, idle_timeout=0)
+
+    assert loaded == [20]
+    assert update.event.course_id == "101"
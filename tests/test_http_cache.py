@@ -0,0 +1,125 @@
+"""Canvas API response cache: revalidation, expiry, eviction and token scoping"""
+
+import os
+
+import pytest
+from canvas_langchain.utils.http_cache import CachingHTTPAdapter
+from requests import Request
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+
+BASE_URL = "https://canvas.test/api/v1/"
+
+
+class FakeCanvas:
+    """Answers requests in place of the network, recording what was sent"""
+
+    def __init__(self):
+        self.requests = []
+        self.not_modified = False
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        if self.not_modified and (
+            "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+        ):
+            response.status_code = 304
+            response._content = b""
+            return response
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        headers = request.headers.get("X-Validators", "")
+        if "etag" in headers:
+            response.headers["ETag"] = '"v1"'
+        if "last-modified" in headers:
+            response.headers["Last-Modified"] = "Tue, 01 Sep 2026 00:00:00 GMT"
+        token = request.headers.get("Authorization", "")
+        response._content = f'{{"url": "{request.url}", "token": "{token}"}}'.encode()
+        return response
+
+
+@pytest.fixture
+def canvas(monkeypatch):
+    fake = FakeCanvas()
+    monkeypatch.setattr(
+        HTTPAdapter, "send", lambda adapter, request, **kwargs: fake.send(request)
+    )
+    return fake
+
+
+def get_request(path, token="user-a", validators=""):
+    return Request(
+        "GET",
+        BASE_URL + path,
+        headers={"Authorization": f"Bearer {token}", "X-Validators": validators},
+    ).prepare()
+
+
+def get(adapter, path, token="user-a", validators=""):
+    return adapter.send(get_request(path, token, validators))
+
+
+@pytest.mark.parametrize(
+    "validators,conditional_header",
+    [("etag", "If-None-Match"), ("last-modified", "If-Modified-Since")],
+)
+def test_not_modified_is_answered_from_the_cache(
+    tmp_path, canvas, validators, conditional_header
+):
+    adapter = CachingHTTPAdapter(str(tmp_path), BASE_URL)
+    first = get(adapter, "courses/1/pages", validators=validators)
+    canvas.not_modified = True
+
+    second = get(adapter, "courses/1/pages", validators=validators)
+
+    assert conditional_header in canvas.requests[1].headers
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert adapter.revalidated == 1
+
+
+def test_response_without_validators_is_reused_until_its_ttl_passes(tmp_path, canvas):
+    adapter = CachingHTTPAdapter(str(tmp_path), BASE_URL, ttl=60)
+    get(adapter, "courses/1/pages")
+
+    get(adapter, "courses/1/pages")
+    assert len(canvas.requests) == 1 and adapter.hits == 1
+
+    adapter.ttl = 0
+    get(adapter, "courses/1/pages")
+    assert len(canvas.requests) == 2
+
+
+def test_least_recently_used_entries_are_evicted_past_the_size_limit(tmp_path, canvas):
+    adapter = CachingHTTPAdapter(str(tmp_path), BASE_URL, ttl=60)
+    get(adapter, "courses/1/pages/a")
+    entry_size = adapter._total_bytes
+    adapter.max_bytes = int(entry_size * 2.5)
+    get(adapter, "courses/1/pages/b")
+    for path, used_at in (("a", 1000), ("b", 2000)):
+        key = adapter._get_key(get_request(f"courses/1/pages/{path}"))
+        for cache_path in adapter._paths(key):
+            os.utime(cache_path, (used_at, used_at))
+    # reading a makes b the least recently used
+    get(adapter, "courses/1/pages/a")
+
+    get(adapter, "courses/1/pages/c")
+
+    assert adapter._total_bytes <= adapter.max_bytes
+    get(adapter, "courses/1/pages/a")
+    assert len(canvas.requests) == 3
+    get(adapter, "courses/1/pages/b")
+    assert len(canvas.requests) == 4
+
+
+def test_responses_are_not_shared_between_tokens(tmp_path, canvas):
+    adapter = CachingHTTPAdapter(str(tmp_path), BASE_URL, ttl=60)
+    get(adapter, "courses/1/pages", token="user-a")
+
+    response = get(adapter, "courses/1/pages", token="user-b")
+
+    assert len(canvas.requests) == 2
+    assert response.json()["token"] == "Bearer user-b"
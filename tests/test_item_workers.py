@@ -0,0 +1,115 @@
+"""Loading a section's items on several threads"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from canvas_langchain.base import BaseSectionLoader, BaseSectionLoaderVars
+from canvas_langchain.utils.claims import ClaimSet
+from canvas_langchain.utils.deadline import LoadDeadline
+from langchain.docstore.document import Document
+
+LOGGER = SimpleNamespace(logStatement=lambda **kwargs: None)
+
+
+class ItemLoader(BaseSectionLoader):
+    """Loads {"key", "delay"} items, claiming each key like the section loaders"""
+
+    def __init__(self, item_workers: int = 4, **kwargs):
+        super().__init__(
+            BaseSectionLoaderVars(
+                canvas_client_extractor=None,
+                indexed_items=ClaimSet(),
+                logger=LOGGER,
+                mivideo_loader=None,
+                should_load_mivideo=False,
+                item_workers=item_workers,
+                **kwargs,
+            )
+        )
+        self.load_threads = []
+
+    def load_section(self) -> list[Document]:
+        return self.load([])
+
+    def load(self, items) -> list[Document]:
+        return [
+            doc
+            for docs in self._load_items(items, get_key=lambda item: item["key"])
+            for doc in docs
+        ]
+
+    def _load_item(self, item) -> list[Document]:
+        self.load_threads.append(threading.current_thread())
+        time.sleep(item.get("delay", 0))
+        if not self.indexed_items.claim(item["key"]):
+            return []
+        return [
+            Document(
+                page_content=item["key"],
+                metadata={"doc_id": item["key"], "source": item["key"]},
+            )
+        ]
+
+
+def test_items_are_yielded_in_listing_order():
+    items = [
+        {"key": f"File:{index}", "delay": delay}
+        for index, delay in enumerate([0.3, 0.2, 0.1, 0])
+    ]
+
+    docs = ItemLoader().load(items)
+
+    assert [doc.page_content for doc in docs] == [item["key"] for item in items]
+
+
+def test_duplicate_keys_are_claimed_once_across_threads():
+    items = [{"key": "File:1", "delay": 0.05} for _ in range(8)]
+    items.append({"key": "File:2"})
+
+    docs = ItemLoader().load(items)
+
+    assert [doc.page_content for doc in docs] == ["File:1", "File:2"]
+
+
+def test_expired_budget_stops_submitting_items():
+    listed = []
+
+    def list_items():
+        for index in range(5):
+            time.sleep(0.3)
+            listed.append(index)
+            yield {"key": f"File:{index}"}
+
+    loader = ItemLoader(deadline=LoadDeadline(time_budget=0.45))
+    docs = loader.load(list_items())
+    loader.deadline.close()
+
+    assert [doc.page_content for doc in docs] == ["File:0"]
+    assert loader.deadline.skipped_items == [
+        {"key": "File:1", "reason": "time_budget_exhausted"}
+    ]
+    assert listed == [0, 1]
+
+
+def test_checkpoint_and_deduplication_run_on_the_section_thread():
+    threads = []
+
+    def record(result):
+        def recorder(*args):
+            threads.append(threading.current_thread())
+            return result(*args)
+
+        return recorder
+
+    checkpoint = SimpleNamespace(
+        is_completed=lambda key: False, complete_item=record(lambda key, docs: None)
+    )
+    deduplicator = SimpleNamespace(filter=record(lambda docs: docs))
+    loader = ItemLoader(checkpoint=checkpoint, deduplicator=deduplicator)
+
+    loader.load([{"key": f"File:{index}", "delay": 0.05} for index in range(4)])
+
+    assert len(threads) == 8
+    assert set(threads) == {threading.current_thread()}
+    assert threading.current_thread() not in loader.load_threads
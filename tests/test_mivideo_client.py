@@ -0,0 +1,46 @@
+"""Shared MiVideo clients: token expiry and per-course 401 cooldowns"""
+
+import base64
+import json
+import time
+
+from canvas_langchain.utils import mivideo_client
+from canvas_langchain.utils.mivideo_client import MiVideoClientPool
+
+
+def get_jwt(expires_at: float) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": expires_at}).encode())
+    return f"header.{payload.decode().rstrip('=')}.signature"
+
+
+class FakeMiVideoAPI:
+    expires_in = 3600
+
+    def __init__(self, **credentials):
+        self.authToken = get_jwt(time.time() + self.expires_in)
+
+
+def test_client_is_replaced_when_its_token_expires(monkeypatch):
+    monkeypatch.setattr(mivideo_client, "MiVideoAPI", FakeMiVideoAPI)
+    pool = MiVideoClientPool(client_ttl=3600)
+
+    api = pool.get_api()
+    assert pool.get_api() is api
+
+    # a token within the expiry margin is replaced on the next call
+    monkeypatch.setattr(FakeMiVideoAPI, "expires_in", 30)
+    pool.clear()
+    api = pool.get_api()
+    assert pool.get_api() is not api
+
+
+def test_unauthorized_pauses_only_that_course(monkeypatch):
+    monkeypatch.setattr(mivideo_client, "MiVideoAPI", FakeMiVideoAPI)
+    pool = MiVideoClientPool()
+    api = pool.get_api()
+
+    pool.mark_unauthorized(101)
+
+    assert not pool.is_authorized(101)
+    assert pool.is_authorized(202)
+    assert pool.get_api() is not api
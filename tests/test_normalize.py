@@ -0,0 +1,29 @@
+"""Text normalization: NUL removal and joining hyphenated line breaks"""
+
+from canvas_langchain.utils.normalize import TextNormalizer
+
+
+def test_lowercase_continuations_are_joined():
+    text = "a calcu-\nlation and a state-of-the-\nart result"
+
+    assert (
+        TextNormalizer().normalize(text)
+        == "a calculation and a state-of-the-art result"
+    )
+
+
+def test_other_line_breaks_keep_their_hyphen():
+    text = "Anglo-\nSaxon\nsee 3-\nway and item-\n- next"
+
+    assert TextNormalizer().normalize(text) == text
+
+
+def test_nul_bytes_are_removed_with_every_step_off():
+    normalizer = TextNormalizer(
+        unicode_nfc=False, dehyphenate=False, collapse_whitespace=False
+    )
+
+    assert normalizer.normalize("a\x00b") == "ab"
+    assert (normalizer.chars_in, normalizer.chars_out) == (3, 2)
+    normalizer.reset_counts()
+    assert (normalizer.chars_in, normalizer.chars_out) == (0, 0)
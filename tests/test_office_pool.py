@@ -0,0 +1,41 @@
+"""Office parsing pool: workers that run over their time are replaced"""
+
+import multiprocessing
+import time
+
+import pytest
+from canvas_langchain.utils import office_pool
+from canvas_langchain.utils.office_pool import OfficeParseError, OfficeProcessPool
+
+
+def run_test_worker(connection, max_memory_bytes):
+    """Echoes the file path, or hangs before or after reporting it started"""
+    while (task := connection.recv()) is not None:
+        file_type, file_path = task
+        if file_type == "hang_on_start":
+            time.sleep(60)
+        connection.send(("started", None))
+        if file_type == "hang_on_parse":
+            time.sleep(60)
+        connection.send(("ok", [(file_path, {"source": file_path})]))
+
+
+@pytest.mark.parametrize("file_type", ["hang_on_start", "hang_on_parse"])
+def test_worker_over_its_time_is_killed_and_replaced(monkeypatch, file_type):
+    monkeypatch.setattr(office_pool, "_run_worker", run_test_worker)
+    pool = OfficeProcessPool(
+        max_workers=1, task_timeout=60, start_timeout=60, max_memory_bytes=None
+    )
+    try:
+        # start the worker with room to import, then tighten the limits
+        assert pool.parse("md", "first.md")[0].page_content == "first.md"
+        pool.task_timeout = pool.start_timeout = 0.5
+
+        with pytest.raises(OfficeParseError):
+            pool.parse(file_type, "stuck.md")
+
+        assert multiprocessing.active_children() == []
+        pool.task_timeout = pool.start_timeout = 60
+        assert pool.parse("md", "next.md")[0].page_content == "next.md"
+    finally:
+        pool.close()
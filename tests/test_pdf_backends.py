@@ -0,0 +1,88 @@
+"""PDF backend selection"""
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+from canvas_langchain.utils import pdf_backends
+from canvas_langchain.utils.pdf_backends import get_pdf_backend
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_pdf_backend("pdfminer")
+
+
+def test_backend_without_its_package_is_rejected(monkeypatch):
+    monkeypatch.setitem(pdf_backends.PDF_BACKEND_PACKAGES, "pypdf", "not_installed")
+
+    with pytest.raises(ImportError):
+        get_pdf_backend("pypdf")
+
+
+class FakePdfium:
+    """Stands in for pypdfium2, recording the pages and text pages left open"""
+
+    PdfiumError = Exception
+
+    def __init__(self, texts: list):
+        self.texts = texts
+        self.open = set()
+        fake = self
+
+        class PdfDocument:
+            def __init__(self, file_contents):
+                fake.open.add("pdf")
+
+            def __iter__(self):
+                return (fake.get_page(index) for index in range(len(fake.texts)))
+
+            def close(self):
+                fake.open.discard("pdf")
+
+        self.PdfDocument = PdfDocument
+
+    def get_page(self, index: int):
+        text = self.texts[index]
+
+        def get_text_range():
+            if isinstance(text, Exception):
+                raise text
+            return text
+
+        def get_textpage():
+            self.open.add(f"text:{index}")
+            return SimpleNamespace(
+                get_text_range=get_text_range,
+                close=lambda: self.open.discard(f"text:{index}"),
+            )
+
+        self.open.add(f"page:{index}")
+        return SimpleNamespace(
+            get_textpage=get_textpage, close=lambda: self.open.discard(f"page:{index}")
+        )
+
+
+@pytest.fixture
+def pdfium(monkeypatch):
+    fake = FakePdfium(["one", "two", ValueError("bad text")])
+    monkeypatch.setitem(sys.modules, "pypdfium2", fake)
+    return fake
+
+
+def test_pypdfium2_closes_pages_when_the_caller_stops_early(pdfium):
+    pages = pdf_backends._extract_pypdfium2(b"%PDF")
+
+    assert next(pages) == "one"
+    pages.close()
+
+    assert pdfium.open == set()
+
+
+def test_pypdfium2_closes_pages_when_extraction_fails(pdfium):
+    pages = pdf_backends._extract_pypdfium2(b"%PDF")
+
+    with pytest.raises(ValueError):
+        list(pages)
+
+    assert pdfium.open == set()
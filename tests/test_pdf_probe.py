@@ -0,0 +1,41 @@
+"""PDF classification from sampled bytes"""
+
+from canvas_langchain.utils.pdf_probe import IMAGE_ONLY, TEXT, UNKNOWN, classify_pdf
+
+
+def get_sample(
+    page_count: int, sampled_pages: int, count: bytes | None = None
+) -> bytes:
+    """An image-only PDF with `page_count` pages, of which the first
+    `sampled_pages` page objects are in the sample"""
+    kids = b" ".join(b"%d 0 R" % (10 + page) for page in range(page_count))
+    count = count if count is not None else b"%d" % page_count
+    objects = [
+        b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n",
+        b"2 0 obj\n<< /Type /Pages /Kids [%s] /Count %s >>\nendobj\n" % (kids, count),
+        b"3 0 obj\n<< /Type /XObject /Subtype /Image /Width 1 /Height 1 >>\nendobj\n",
+    ]
+    for page in range(sampled_pages):
+        objects.append(
+            b"%d 0 obj\n<< /Type /Page /Parent 2 0 R "
+            b"/Resources << /XObject << /Im0 3 0 R >> >> >>\nendobj\n" % (10 + page)
+        )
+    return b"%PDF-1.4\n" + b"".join(objects)
+
+
+def test_image_only_when_every_page_is_sampled():
+    assert classify_pdf(get_sample(page_count=3, sampled_pages=3)) == IMAGE_ONLY
+
+
+def test_unknown_when_pages_are_missing_from_the_sample():
+    assert classify_pdf(get_sample(page_count=3, sampled_pages=2)) == UNKNOWN
+
+
+def test_unknown_when_the_page_count_is_indirect():
+    sample = get_sample(page_count=1, sampled_pages=1, count=b"7 0 R")
+
+    assert classify_pdf(sample) == UNKNOWN
+
+
+def test_fonts_mean_text():
+    assert classify_pdf(get_sample(1, 1) + b"/Font << /F1 4 0 R >>") == TEXT
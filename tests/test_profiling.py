@@ -0,0 +1,70 @@
+"""Load profiling: span nesting and trace exports"""
+
+import json
+import threading
+
+from canvas_langchain.utils.profiling import LoadProfiler
+
+
+def get_profiler() -> LoadProfiler:
+    """section (10s) > item (6s) > download (4s), with exact times"""
+    profiler = LoadProfiler()
+
+    def download():
+        with profiler.span("download", "download"):
+            pass
+
+    with profiler.span("Files", "section"):
+        # the item runs on another thread, as under a timeout
+        thread = threading.Thread(target=profiler.wrap("File:4", "item", download))
+        thread.start()
+        thread.join()
+    profiler._origin = 0.0
+    for span, start, end in zip(profiler.spans, (0, 1, 2), (10, 7, 6)):
+        span.start, span.end = float(start), float(end)
+    return profiler
+
+
+def test_wrapped_item_nests_under_the_span_that_wrapped_it():
+    profiler = get_profiler()
+    section, item, download = profiler.spans
+
+    assert item.parent is section
+    assert download.parent is item
+    assert item.thread_id != section.thread_id
+    assert profiler.top_items() == [("File:4", 6)]
+
+
+def test_chrome_trace_has_one_complete_event_per_span(tmp_path):
+    profiler = get_profiler()
+    path = str(tmp_path / "trace.json")
+
+    profiler.export(path)
+    with open(path) as trace_file:
+        events = json.load(trace_file)["traceEvents"]
+
+    assert [(event["name"], event["cat"], event["ph"]) for event in events] == [
+        ("Files", "section", "X"),
+        ("File:4", "item", "X"),
+        ("download", "download", "X"),
+    ]
+    assert [(event["ts"], event["dur"]) for event in events] == [
+        (0, 10e6),
+        (1e6, 6e6),
+        (2e6, 4e6),
+    ]
+
+
+def test_collapsed_stacks_weigh_each_stack_by_self_time(tmp_path):
+    profiler = get_profiler()
+    path = str(tmp_path / "load.folded")
+
+    profiler.export(path)
+    with open(path) as stacks_file:
+        lines = stacks_file.read().splitlines()
+
+    assert lines == [
+        "Files 4000000",
+        "Files;File:4 2000000",
+        "Files;File:4;download 4000000",
+    ]
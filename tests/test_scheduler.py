@@ -0,0 +1,43 @@
+"""Load order: section priorities and the expensive lane"""
+
+from canvas_langchain.utils.scheduler import WorkScheduler, order_tabs
+
+
+def test_tabs_load_by_priority_with_unknown_tabs_last():
+    tabs = ["Files", "Grades", "Pages", "Modules", "People", "Syllabus"]
+
+    assert order_tabs(tabs) == [
+        "Syllabus",
+        "Pages",
+        "Modules",
+        "Files",
+        "Grades",
+        "People",
+    ]
+
+
+def test_expensive_lane_drains_cheapest_first_once_per_key():
+    scheduler = WorkScheduler()
+    for key, cost in (("File:1", 300), ("File:2", 100), ("File:3", 200)):
+        scheduler.defer(key, cost, lambda key=key: [key])
+    scheduler.defer("File:2", 1, lambda: ["again"])
+
+    drained = [(key, load_fn()) for key, load_fn in scheduler.drain()]
+
+    assert drained == [
+        ("File:2", ["File:2"]),
+        ("File:3", ["File:3"]),
+        ("File:1", ["File:1"]),
+    ]
+    assert list(scheduler.drain()) == []
+
+
+def test_items_over_the_size_threshold_are_expensive():
+    scheduler = WorkScheduler(large_item_bytes=1000)
+
+    assert scheduler.is_expensive(1001)
+    assert not scheduler.is_expensive(1000)
+    assert not scheduler.is_expensive(None)
+    assert not WorkScheduler(large_item_bytes=1000, defer_expensive=False).is_expensive(
+        5000
+    )
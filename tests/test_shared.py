@@ -0,0 +1,143 @@
+"""Per-user visibility of shared course content"""
+
+import fcntl
+import os
+import time
+from types import SimpleNamespace
+
+from canvas_langchain.shared import SharedCourseStore, VisibilityFilter
+from langchain.docstore.document import Document
+
+LOGGER = SimpleNamespace(logStatement=lambda **kwargs: None)
+
+
+def get_doc(doc_id: str, source: str) -> Document:
+    return Document(page_content="text", metadata={"doc_id": doc_id, "source": source})
+
+
+def get_module(items, **attributes):
+    return SimpleNamespace(get_module_items=lambda **kwargs: items, **attributes)
+
+
+def get_item(type, **attributes):
+    return SimpleNamespace(type=type, **attributes)
+
+
+def get_client(modules, pages=(), assignments=(), files=()):
+    extractor = SimpleNamespace(
+        get_announcements=lambda: [],
+        get_page_list=lambda: list(pages),
+        get_assignments=lambda: list(assignments),
+        get_files=lambda: list(files),
+        get_modules=lambda: modules,
+    )
+    return SimpleNamespace(
+        rest_extractor=extractor,
+        get_available_tabs=lambda: {"Pages", "Assignments", "Files", "Modules"},
+    )
+
+
+DOCS = [
+    get_doc("assignment:7:0", "https://x/courses/1/assignments/7"),
+    get_doc("page:5:0", "https://x/courses/1/pages/secret"),
+    get_doc("file:9:0", "https://x/courses/1/files/9"),
+]
+
+
+def test_module_does_not_unlock_items_locked_in_their_listing():
+    module = get_module(
+        [
+            get_item("Assignment", content_id=7),
+            get_item("Page", page_url="secret"),
+            get_item("File", content_id=9),
+        ]
+    )
+    client = get_client(
+        [module],
+        pages=[SimpleNamespace(page_id=5, url="secret", locked_for_user=True)],
+        assignments=[SimpleNamespace(id=7, locked_for_user=True)],
+        files=[SimpleNamespace(id=9, published=False)],
+    )
+
+    assert VisibilityFilter.from_client(client, LOGGER).apply(DOCS) == []
+
+
+def test_module_admits_items_the_user_cannot_list():
+    module = get_module(
+        [get_item("Assignment", content_id=7), get_item("File", content_id=9)]
+    )
+
+    visibility = VisibilityFilter.from_client(get_client([module]), LOGGER)
+
+    assert [doc.metadata["doc_id"] for doc in visibility.apply(DOCS)] == [
+        "assignment:7:0",
+        "file:9:0",
+    ]
+
+
+def test_module_items_locked_for_the_user_stay_hidden():
+    locked_module = get_module([get_item("File", content_id=9)], state="locked")
+    module = get_module(
+        [
+            get_item(
+                "Assignment",
+                content_id=7,
+                content_details={"locked_for_user": True},
+            ),
+            get_item("Page", page_url="secret"),
+        ]
+    )
+
+    visibility = VisibilityFilter.from_client(
+        get_client([locked_module, module]), LOGGER
+    )
+
+    assert [doc.metadata["doc_id"] for doc in visibility.apply(DOCS)] == ["page:5:0"]
+
+
+def test_sequential_module_stops_at_the_first_unmet_requirement():
+    module = get_module(
+        [
+            get_item("Page", page_url="secret", completion_requirement={}),
+            get_item(
+                "Assignment",
+                content_id=7,
+                completion_requirement={"type": "must_submit", "completed": False},
+            ),
+            get_item("File", content_id=9),
+        ],
+        require_sequential_progress=True,
+    )
+
+    visibility = VisibilityFilter.from_client(get_client([module]), LOGGER)
+
+    assert [doc.metadata["doc_id"] for doc in visibility.apply(DOCS)] == [
+        "assignment:7:0",
+        "page:5:0",
+    ]
+
+
+def test_waiting_for_another_load_stops_at_the_time_budget(tmp_path):
+    store = SharedCourseStore(str(tmp_path), max_age=0)
+    store._write(store.get_path(1), 1, DOCS[:1])
+    loads = []
+
+    def load_course():
+        loads.append(True)
+        return DOCS, True
+
+    with open(f"{store.get_path(1)}.lock", "w") as lock_file:
+        # another worker is crawling the course
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        started = time.monotonic()
+        stale_docs = store.get_or_load(1, load_course, time_budget=0.2)
+        waited = time.monotonic() - started
+        os.remove(store.get_path(1))
+        loaded_docs = store.get_or_load(1, load_course, time_budget=0.2)
+
+    # the expired snapshot is served rather than waiting for the crawl
+    assert waited < 1
+    assert [doc.metadata["doc_id"] for doc in stale_docs] == ["assignment:7:0"]
+    # with nothing stored the course is loaded directly, and not stored
+    assert loaded_docs == DOCS and loads == [True]
+    assert not os.path.exists(store.get_path(1))
@@ -0,0 +1,36 @@
+"""Batched delivery to sinks and propagation of sink failures"""
+
+import pytest
+from canvas_langchain.sinks import CallableSink, SinkError, SinkWriter
+from langchain.docstore.document import Document
+
+
+def get_docs(count: int) -> list[Document]:
+    return [Document(page_content=str(i)) for i in range(count)]
+
+
+def test_documents_arrive_in_order_in_batches():
+    batches = []
+    writer = SinkWriter(CallableSink(batches.append), batch_size=2)
+    writer.put(get_docs(3))
+    writer.put(get_docs(2))
+    writer.close()
+
+    assert [[doc.page_content for doc in batch] for batch in batches] == [
+        ["0", "1"],
+        ["2", "0"],
+        ["1"],
+    ]
+    assert writer.documents_written == 5
+
+
+def test_sink_failure_is_raised_as_sink_error():
+    def fail(documents):
+        raise RuntimeError("sink down")
+
+    writer = SinkWriter(CallableSink(fail), batch_size=1)
+    writer.put(get_docs(1))
+
+    with pytest.raises(SinkError) as error:
+        writer.close()
+    assert isinstance(error.value.__cause__, RuntimeError)
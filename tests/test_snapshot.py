@@ -0,0 +1,73 @@
+"""Snapshot files: compression, appended frames and memory-mapped reads"""
+
+import gzip
+import json
+
+import pytest
+from canvas_langchain.snapshot import (
+    SNAPSHOT_FORMAT,
+    CanvasSnapshotLoader,
+    read_snapshot,
+    write_snapshot,
+)
+from langchain.docstore.document import Document
+
+DOCS = [
+    Document(
+        page_content=f"café {index}\nsecond line",
+        metadata={"doc_id": f"page:{index}:0", "source": "https://x", "page": index},
+    )
+    for index in range(5)
+]
+
+
+@pytest.fixture(params=["jsonl.gz", "jsonl.zst"])
+def snapshot_path(request, tmp_path):
+    if request.param.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    return str(tmp_path / f"course.{request.param}")
+
+
+def as_tuples(docs) -> list[tuple]:
+    return [(doc.page_content, doc.metadata) for doc in docs]
+
+
+def test_snapshot_round_trips_documents(snapshot_path):
+    assert write_snapshot(snapshot_path, DOCS, course_id=1, append=False) == 5
+
+    docs = list(read_snapshot(snapshot_path))
+
+    assert as_tuples(docs) == as_tuples(DOCS)
+    if hasattr(docs[0], "id"):
+        assert [doc.id for doc in docs] == [f"page:{index}:0" for index in range(5)]
+
+
+def test_appended_frames_read_back_as_one_stream(snapshot_path):
+    write_snapshot(snapshot_path, DOCS[:2], course_id=1)
+    write_snapshot(snapshot_path, DOCS[2:4])
+    write_snapshot(snapshot_path, [])
+    write_snapshot(snapshot_path, DOCS[4:])
+
+    assert as_tuples(read_snapshot(snapshot_path)) == as_tuples(DOCS)
+    assert as_tuples(CanvasSnapshotLoader(snapshot_path).load()) == as_tuples(DOCS)
+
+
+def test_snapshot_has_one_header(tmp_path):
+    path = str(tmp_path / "course.jsonl.gz")
+    write_snapshot(path, DOCS[:1], course_id=1)
+    write_snapshot(path, DOCS[1:])
+
+    with gzip.open(path, "rt", encoding="utf-8") as snapshot_file:
+        records = [json.loads(line) for line in snapshot_file]
+
+    assert [record.get("format") for record in records] == [SNAPSHOT_FORMAT] + [
+        None
+    ] * 5
+    assert records[0]["course_id"] == 1
+
+
+def test_empty_snapshot_reads_no_documents(tmp_path):
+    path = tmp_path / "course.jsonl.gz"
+    path.touch()
+
+    assert list(read_snapshot(str(path))) == []
@@ -0,0 +1,25 @@
+"""Row-chunked extraction of CSV files"""
+
+from canvas_langchain.utils.tabular import TabularExtractor
+
+
+def test_row_numbers_count_physical_rows(tmp_path):
+    path = tmp_path / "grades.csv"
+    path.write_text("name,score\n\nada,90\nbob,85\n,\ncy,70\n")
+
+    chunks = list(TabularExtractor(rows_per_chunk=2).extract(str(path), "csv"))
+
+    assert [(chunk.first_row, chunk.last_row) for chunk in chunks] == [(3, 4), (6, 6)]
+    assert chunks[0].text == "name | score\nada | 90\nbob | 85"
+    assert chunks[0].sheet is None
+
+
+def test_max_rows_counts_data_rows(tmp_path):
+    path = tmp_path / "grades.csv"
+    path.write_text("name,score\nada,90\n\n\nbob,85\ncy,70\n")
+
+    chunks = list(TabularExtractor(max_rows=2).extract(str(path), "csv"))
+
+    assert [(chunk.first_row, chunk.last_row, chunk.row_count) for chunk in chunks] == [
+        (2, 5, 2)
+    ]